@@ -0,0 +1,254 @@
+"""
+Cascading Failure Module
+
+This module propagates a disruption through the flows of a supply chain
+network. When a node or route fails, the flow it carried is pushed onto the
+remaining routes of its upstream node, while downstream nodes lose supply.
+Elements pushed over capacity fail in turn, and the cascade repeats until no
+new element fails.
+
+Flows are kept as NumPy arrays over the edge list. Each rebalancing pass
+only moves flow at nodes whose inflow and outflow no longer match (the
+frontier) and only touches the routes leaving them, so a cascade step costs
+O(nodes + edges) array work plus the routes moved by its passes.
+"""
+
+import numpy as np
+import networkx as nx
+from typing import Dict, List, Tuple, Any, Optional
+
+# Elements with a disruption impact at or above this level have no capacity left
+FAILURE_IMPACT = 1.0
+
+# Default spare capacity of elements without a declared capacity, as a fraction of their flow
+DEFAULT_TOLERANCE = 0.2
+
+# Flow imbalances below this are considered settled
+_FLOW_EPSILON = 1e-9
+
+
+class CascadeEngine:
+    """
+    Simulates cascading failures driven by flow redistribution.
+
+    Each node has a fixed supply (outflow exceeding inflow) and demand
+    (inflow exceeding outflow) taken from the initial flows. Transit flow is
+    split over a node's working outbound routes in proportion to their
+    current flow.
+    """
+
+    def __init__(self, network_graph: nx.DiGraph, flows: Optional[Dict] = None,
+                 tolerance: float = DEFAULT_TOLERANCE):
+        """
+        Initialize the engine with the undisrupted flows.
+
+        Args:
+            network_graph: Network graph
+            flows: Initial flow per route, keyed by route_id or (origin,
+                destination), e.g. the route_flows of NetworkFlowEngine.optimize().
+                Defaults to the 'flow' edge attribute.
+            tolerance: Spare capacity, as a fraction of initial flow, for nodes
+                and routes without a 'capacity' attribute. Elements without a
+                capacity that carry no initial flow are unconstrained.
+        """
+        self.graph = network_graph
+        self.tolerance = tolerance
+        self.node_ids = list(network_graph.nodes())
+        self.node_index = {node_id: i for i, node_id in enumerate(self.node_ids)}
+        self.edges = list(network_graph.edges())
+        self.edge_index = {edge: e for e, edge in enumerate(self.edges)}
+
+        num_nodes, num_edges = len(self.node_ids), len(self.edges)
+        self.src = np.fromiter((self.node_index[u] for u, _ in self.edges), dtype=np.int64, count=num_edges)
+        self.dst = np.fromiter((self.node_index[v] for _, v in self.edges), dtype=np.int64, count=num_edges)
+        # Outbound routes of node i are out_edges[out_ptr[i]:out_ptr[i + 1]]
+        self.out_edges = np.argsort(self.src, kind="stable")
+        self.out_ptr = np.concatenate([[0], np.cumsum(np.bincount(self.src, minlength=num_nodes))])
+
+        flow = np.zeros(num_edges)
+        edge_capacity = np.full(num_edges, np.nan)
+        for e, (u, v, data) in enumerate(network_graph.edges(data=True)):
+            if flows is not None:
+                flow[e] = flows.get(data.get('route_id'), flows.get((u, v), 0.0))
+            else:
+                flow[e] = data.get('flow', 0.0) or 0.0
+            if data.get('capacity') is not None:
+                edge_capacity[e] = data['capacity']
+        self.initial_flow = flow
+
+        inflow = np.bincount(self.dst, weights=flow, minlength=num_nodes)
+        outflow = np.bincount(self.src, weights=flow, minlength=num_nodes)
+        self.supply = np.maximum(outflow - inflow, 0)
+        self.demand = np.maximum(inflow - outflow, 0)
+        self.initial_throughput = np.maximum(inflow, outflow)
+
+        node_capacity = np.array([
+            np.nan if data.get('capacity') is None else data['capacity']
+            for _, data in network_graph.nodes(data=True)
+        ], dtype=float)
+
+        self.edge_capacity = self._fill_capacity(edge_capacity, flow)
+        self.node_capacity = self._fill_capacity(node_capacity, self.initial_throughput)
+
+    def _fill_capacity(self, capacity: np.ndarray, load: np.ndarray) -> np.ndarray:
+        """Default missing capacities to (1 + tolerance) x load, or unlimited without load."""
+        default = np.where(load > 0, load * (1 + self.tolerance), np.inf)
+        return np.where(np.isnan(capacity), default, capacity)
+
+    def run(self, disruption: Any = None, max_steps: int = 50,
+            max_rebalance_passes: Optional[int] = None) -> Dict:
+        """
+        Run a cascade.
+
+        Args:
+            disruption: DisruptionOverlay on the engine's graph (reduced
+                capacities and failed elements), or None to start from the
+                undisrupted network
+            max_steps: Maximum number of failure rounds
+            max_rebalance_passes: Maximum frontier passes per round (defaults
+                to the number of nodes, enough for any acyclic network); each
+                pass only touches the routes leaving the frontier
+
+        Returns:
+            Dictionary with failed node and route IDs, per-step statistics,
+            served demand and final flows per edge
+        """
+        num_nodes = len(self.node_ids)
+        passes = max_rebalance_passes or max(num_nodes, 1)
+        node_capacity = self.node_capacity.copy()
+        edge_capacity = self.edge_capacity.copy()
+        node_failed = np.zeros(num_nodes, dtype=bool)
+        edge_failed = np.zeros(len(self.edges), dtype=bool)
+
+        if disruption is not None:
+            for node_id, changes in disruption.node_changes.items():
+                i = self.node_index[node_id]
+                node_failed[i] = self._apply_changes(node_capacity, i, changes)
+            for edge, changes in disruption.edge_changes.items():
+                e = self.edge_index[edge]
+                edge_failed[e] = self._apply_changes(edge_capacity, e, changes)
+
+        flow = self.initial_flow.copy()
+        total_demand = float(self.demand.sum())
+        steps = []
+        converged = False
+
+        newly_failed_nodes = np.flatnonzero(node_failed)
+        newly_failed_edges = np.flatnonzero(edge_failed)
+        for step in range(max_steps):
+            served = self._fail_and_rebalance(flow, edge_failed, node_failed, passes)
+            steps.append({
+                "step": step,
+                "failed_nodes": len(newly_failed_nodes),
+                "failed_edges": len(newly_failed_edges),
+                "demand_served": float(served.sum())
+            })
+
+            # Elements pushed over capacity fail in the next step
+            inflow = np.bincount(self.dst, weights=flow, minlength=num_nodes)
+            outflow = np.bincount(self.src, weights=flow, minlength=num_nodes)
+            throughput = np.maximum(inflow + np.where(node_failed, 0, self.supply), outflow)
+            overloaded_nodes = ~node_failed & (throughput > node_capacity * (1 + _FLOW_EPSILON) + _FLOW_EPSILON)
+            overloaded_edges = ~edge_failed & (flow > edge_capacity * (1 + _FLOW_EPSILON) + _FLOW_EPSILON)
+
+            newly_failed_nodes = np.flatnonzero(overloaded_nodes)
+            newly_failed_edges = np.flatnonzero(overloaded_edges)
+            if len(newly_failed_nodes) == 0 and len(newly_failed_edges) == 0:
+                converged = True
+                break
+            node_failed |= overloaded_nodes
+            edge_failed |= overloaded_edges
+        else:
+            # Out of steps: settle the flows after the last failures
+            served = self._fail_and_rebalance(flow, edge_failed, node_failed, passes)
+
+        return {
+            "failed_nodes": [self.node_ids[i] for i in np.flatnonzero(node_failed)],
+            "failed_edges": [self.edges[e] for e in np.flatnonzero(edge_failed)],
+            "steps": steps,
+            "converged": converged,
+            "total_demand": total_demand,
+            "demand_served": float(served.sum()),
+            "demand_served_fraction": float(served.sum() / total_demand) if total_demand > 0 else 1.0,
+            "edge_flows": dict(zip(self.edges, flow.tolist()))
+        }
+
+    @staticmethod
+    def _apply_changes(capacity: np.ndarray, i: int, changes: Dict) -> bool:
+        """
+        Apply disrupted attributes to a capacity entry.
+
+        Declared capacities take the disrupted value; derived capacities
+        shrink by the disruption impact.
+
+        Returns:
+            Whether the element failed outright
+        """
+        impact = changes.get('disruption_impact', 0)
+        if 'capacity' in changes:
+            capacity[i] = changes['capacity']
+        else:
+            capacity[i] *= max(0, 1 - impact)
+        return impact >= FAILURE_IMPACT
+
+    def _fail_and_rebalance(self, flow: np.ndarray, edge_failed: np.ndarray, node_failed: np.ndarray,
+                            passes: int) -> np.ndarray:
+        """
+        Remove failed elements and restore flow balance, in place.
+
+        Failed nodes take their routes with them.
+        A node's surplus is its inflow + supply - demand served - outflow.
+        Each pass spreads the surplus of the frontier nodes, whose surplus is
+        non-zero and which have a working outbound route, over their working
+        outbound routes in proportion to their flow. Inflows and outflows are
+        updated from the moved routes only, so a pass costs O(frontier routes).
+
+        Returns:
+            Demand served per node
+        """
+        num_nodes = len(self.node_ids)
+        edge_failed |= node_failed[self.src] | node_failed[self.dst]
+        flow[edge_failed] = 0
+        working = ~edge_failed
+        supply = np.where(node_failed, 0, self.supply)
+        demand = np.where(node_failed, 0, self.demand)
+        out_routes = np.bincount(self.src[working], minlength=num_nodes) > 0
+        movable = out_routes & ~node_failed
+
+        inflow = np.bincount(self.dst, weights=flow, minlength=num_nodes)
+        outflow = np.bincount(self.src, weights=flow, minlength=num_nodes)
+        frontier = np.flatnonzero(movable & (np.abs(self._surplus(inflow, outflow, supply, demand)) > _FLOW_EPSILON))
+
+        for _ in range(passes):
+            if len(frontier) == 0:
+                break
+
+            # Working outbound routes of the frontier, grouped by frontier node
+            counts = self.out_ptr[frontier + 1] - self.out_ptr[frontier]
+            group = np.repeat(np.arange(len(frontier)), counts)
+            offsets = np.arange(len(group)) - np.repeat(np.cumsum(counts) - counts, counts)
+            edges = self.out_edges[np.repeat(self.out_ptr[frontier], counts) + offsets]
+            keep = working[edges]
+            edges, group = edges[keep], group[keep]
+
+            # Share of each route in its origin's outbound flow
+            surplus = self._surplus(inflow[frontier], outflow[frontier], supply[frontier], demand[frontier])
+            share = flow[edges] + _FLOW_EPSILON
+            total_share = np.bincount(group, weights=share, minlength=len(frontier))
+            moved = np.maximum(flow[edges] + surplus[group] * share / total_share[group], 0) - flow[edges]
+            flow[edges] += moved
+            outflow[frontier] += np.bincount(group, weights=moved, minlength=len(frontier))
+            np.add.at(inflow, self.dst[edges], moved)
+
+            affected = np.sort(np.concatenate([frontier, self.dst[edges]]))
+            affected = affected[np.concatenate([[True], affected[1:] != affected[:-1]])]
+            surplus = self._surplus(inflow[affected], outflow[affected], supply[affected], demand[affected])
+            frontier = affected[movable[affected] & (np.abs(surplus) > _FLOW_EPSILON)]
+
+        return np.minimum(demand, inflow + supply)
+
+    @staticmethod
+    def _surplus(inflow: np.ndarray, outflow: np.ndarray, supply: np.ndarray, demand: np.ndarray) -> np.ndarray:
+        """Flow available at nodes beyond the demand they serve and the flow they send on."""
+        available = inflow + supply
+        return available - np.minimum(demand, available) - outflow
@@ -0,0 +1,345 @@
+"""
+Compact Graph Representation Module
+
+This module provides an array-backed view of the supply chain network that is
+kept alongside the NetworkX DiGraph. Nodes are mapped to integer indices,
+numeric attributes are stored as NumPy columns and adjacency is available in
+CSR form, so analytics can run as vectorized operations instead of walking
+dict-of-dict node and edge data.
+"""
+
+import numpy as np
+import networkx as nx
+from typing import Dict, List, Tuple, Any, Optional, Hashable
+from scipy.sparse import csr_matrix
+
+
+class CompactGraph:
+    """
+    Array-backed directed graph with NumPy attribute columns.
+
+    Missing numeric attributes are stored as NaN. Like a NetworkX DiGraph,
+    there is at most one edge per (origin, destination) pair and adding an
+    existing node or edge updates its attributes.
+
+    Every change made through the add/set methods increments ``version``, so
+    derived results can be cached until the graph changes. Writing into the
+    arrays returned by node_column/edge_column bypasses this counter.
+    """
+
+    # Numeric node attributes tracked as columns
+    NODE_COLUMNS = ("capacity", "fixed_cost", "utilization", "demand", "demand_mean",
+                    "fulfilled", "lat", "lon")
+
+    # Numeric edge attributes tracked as columns
+    EDGE_COLUMNS = ("capacity", "cost", "flow", "transit_time", "distance")
+
+    # Integer codes for the node "type" attribute
+    NODE_TYPES = {"facility": 1, "demand": 2}
+
+    def __init__(self, initial_capacity: int = 64):
+        """
+        Initialize an empty compact graph.
+
+        Args:
+            initial_capacity: Number of node and edge slots to preallocate
+        """
+        self.node_ids: List[Hashable] = []
+        self.node_index: Dict[Hashable, int] = {}
+        self.edge_index: Dict[Tuple[int, int], int] = {}
+        self.edge_route_ids: List[Optional[str]] = []
+        self.num_nodes = 0
+        self.num_edges = 0
+        self.version = 0
+
+        self._node_type = np.zeros(initial_capacity, dtype=np.int8)
+        self._node_data = {c: np.full(initial_capacity, np.nan) for c in self.NODE_COLUMNS}
+        self._edge_src = np.zeros(initial_capacity, dtype=np.int64)
+        self._edge_dst = np.zeros(initial_capacity, dtype=np.int64)
+        self._edge_data = {c: np.full(initial_capacity, np.nan) for c in self.EDGE_COLUMNS}
+        self._csr = None
+
+    @classmethod
+    def from_networkx(cls, graph: nx.DiGraph) -> 'CompactGraph':
+        """
+        Build a compact graph from a NetworkX DiGraph.
+
+        Args:
+            graph: Graph to convert
+
+        Returns:
+            CompactGraph instance with the same nodes, edges and numeric attributes
+        """
+        compact = cls(initial_capacity=max(graph.number_of_nodes(), graph.number_of_edges(), 1))
+        for node_id, data in graph.nodes(data=True):
+            compact.add_node(node_id, **data)
+        for u, v, data in graph.edges(data=True):
+            compact.add_edge(u, v, **data)
+        return compact
+
+    # ----- Construction and updates -----
+
+    def add_node(self, node_id: Hashable, **attributes) -> int:
+        """
+        Add a node or update an existing node's attributes.
+
+        Args:
+            node_id: Node identifier
+            **attributes: Node attributes; only tracked numeric columns,
+                "type" and "location"/"pos" coordinates are stored
+
+        Returns:
+            Integer index of the node
+        """
+        idx = self.node_index.get(node_id)
+        if idx is None:
+            idx = self.num_nodes
+            self._reserve_nodes(idx + 1)
+            self.node_ids.append(node_id)
+            self.node_index[node_id] = idx
+            self.num_nodes += 1
+            self._csr = None
+        self._set_node_values(idx, attributes)
+        self.version += 1
+        return idx
+
+    def add_edge(self, origin: Hashable, destination: Hashable, **attributes) -> int:
+        """
+        Add an edge or update an existing edge's attributes.
+        Missing endpoint nodes are created.
+
+        Args:
+            origin: Origin node ID
+            destination: Destination node ID
+            **attributes: Edge attributes; tracked numeric columns and route_id are stored
+
+        Returns:
+            Integer index of the edge
+        """
+        u = self.node_index[origin] if origin in self.node_index else self.add_node(origin)
+        v = self.node_index[destination] if destination in self.node_index else self.add_node(destination)
+
+        pos = self.edge_index.get((u, v))
+        if pos is None:
+            pos = self.num_edges
+            self._reserve_edges(pos + 1)
+            self._edge_src[pos] = u
+            self._edge_dst[pos] = v
+            self.edge_index[(u, v)] = pos
+            self.edge_route_ids.append(None)
+            self.num_edges += 1
+            self._csr = None
+
+        if "route_id" in attributes:
+            self.edge_route_ids[pos] = attributes["route_id"]
+        self._set_edge_values(pos, attributes)
+        self.version += 1
+        return pos
+
+    def add_nodes(self, node_ids: List[Hashable], node_type: Optional[str] = None,
+                  **columns) -> np.ndarray:
+        """
+        Add or update many nodes at once.
+
+        Args:
+            node_ids: Node identifiers
+            node_type: Type shared by all the nodes (optional)
+            **columns: Arrays of tracked node attributes aligned with node_ids
+
+        Returns:
+            Integer indices of the nodes
+        """
+        indices = np.empty(len(node_ids), dtype=np.int64)
+        for i, node_id in enumerate(node_ids):
+            idx = self.node_index.get(node_id)
+            if idx is None:
+                idx = self.num_nodes
+                self.node_ids.append(node_id)
+                self.node_index[node_id] = idx
+                self.num_nodes += 1
+            indices[i] = idx
+        self._reserve_nodes(self.num_nodes)
+
+        if node_type is not None:
+            self._node_type[indices] = self.NODE_TYPES.get(node_type, 0)
+        for name, values in columns.items():
+            if name in self._node_data:
+                self._node_data[name][indices] = values
+
+        self._csr = None
+        self.version += 1
+        return indices
+
+    def add_edges(self, origins: List[Hashable], destinations: List[Hashable],
+                  route_ids: Optional[List[str]] = None, **columns) -> np.ndarray:
+        """
+        Add or update many edges at once. Missing endpoint nodes are created.
+
+        Args:
+            origins: Origin node IDs
+            destinations: Destination node IDs
+            route_ids: Route identifiers aligned with the edges (optional)
+            **columns: Arrays of tracked edge attributes aligned with the edges
+
+        Returns:
+            Integer indices of the edges
+        """
+        known = self.node_index
+        missing = [n for n in dict.fromkeys(list(origins) + list(destinations)) if n not in known]
+        if missing:
+            self.add_nodes(missing)
+
+        positions = np.empty(len(origins), dtype=np.int64)
+        for i, key in enumerate(zip([known[o] for o in origins], [known[d] for d in destinations])):
+            pos = self.edge_index.get(key)
+            if pos is None:
+                pos = self.num_edges
+                self.edge_index[key] = pos
+                self.edge_route_ids.append(None)
+                self.num_edges += 1
+            positions[i] = pos
+        self._reserve_edges(self.num_edges)
+
+        self._edge_src[positions] = [known[o] for o in origins]
+        self._edge_dst[positions] = [known[d] for d in destinations]
+        if route_ids is not None:
+            for pos, route_id in zip(positions.tolist(), route_ids):
+                self.edge_route_ids[pos] = route_id
+        for name, values in columns.items():
+            if name in self._edge_data:
+                self._edge_data[name][positions] = values
+
+        self._csr = None
+        self.version += 1
+        return positions
+
+    def set_node_attributes(self, node_id: Hashable, **attributes) -> None:
+        """Update tracked attributes of an existing node."""
+        self._set_node_values(self.node_index[node_id], attributes)
+        self.version += 1
+
+    def set_edge_attributes(self, origin: Hashable, destination: Hashable, **attributes) -> None:
+        """Update tracked attributes of an existing edge."""
+        pos = self.edge_index[(self.node_index[origin], self.node_index[destination])]
+        self._set_edge_values(pos, attributes)
+        self.version += 1
+
+    def _set_node_values(self, idx: int, attributes: Dict[str, Any]) -> None:
+        """Write tracked node attributes into the column arrays."""
+        if "type" in attributes:
+            self._node_type[idx] = self.NODE_TYPES.get(attributes["type"], 0)
+
+        location = attributes.get("location", attributes.get("pos"))
+        if location is not None:
+            self._node_data["lat"][idx] = location[0]
+            self._node_data["lon"][idx] = location[1]
+
+        for name, value in attributes.items():
+            if name in self._node_data and value is not None:
+                self._node_data[name][idx] = value
+
+    def _set_edge_values(self, pos: int, attributes: Dict[str, Any]) -> None:
+        """Write tracked edge attributes into the column arrays."""
+        for name, value in attributes.items():
+            if name in self._edge_data and value is not None:
+                self._edge_data[name][pos] = value
+
+    def _reserve_nodes(self, size: int) -> None:
+        """Grow the node columns (at least doubling) so they hold `size` nodes."""
+        if size <= len(self._node_type):
+            return
+        extra = max(len(self._node_type), size - len(self._node_type))
+        self._node_type = np.concatenate([self._node_type, np.zeros(extra, dtype=np.int8)])
+        for name, column in self._node_data.items():
+            self._node_data[name] = np.concatenate([column, np.full(extra, np.nan)])
+
+    def _reserve_edges(self, size: int) -> None:
+        """Grow the edge columns (at least doubling) so they hold `size` edges."""
+        if size <= len(self._edge_src):
+            return
+        extra = max(len(self._edge_src), size - len(self._edge_src))
+        self._edge_src = np.concatenate([self._edge_src, np.zeros(extra, dtype=np.int64)])
+        self._edge_dst = np.concatenate([self._edge_dst, np.zeros(extra, dtype=np.int64)])
+        for name, column in self._edge_data.items():
+            self._edge_data[name] = np.concatenate([column, np.full(extra, np.nan)])
+
+    # ----- Array views -----
+
+    @property
+    def node_types(self) -> np.ndarray:
+        """Node type codes (see NODE_TYPES, 0 for untyped nodes)."""
+        return self._node_type[:self.num_nodes]
+
+    @property
+    def edge_sources(self) -> np.ndarray:
+        """Origin node index of every edge."""
+        return self._edge_src[:self.num_edges]
+
+    @property
+    def edge_targets(self) -> np.ndarray:
+        """Destination node index of every edge."""
+        return self._edge_dst[:self.num_edges]
+
+    def node_column(self, name: str) -> np.ndarray:
+        """
+        Get a node attribute column (NaN where the attribute is missing).
+
+        Args:
+            name: Attribute name from NODE_COLUMNS
+
+        Returns:
+            View of the column for the current nodes
+        """
+        return self._node_data[name][:self.num_nodes]
+
+    def edge_column(self, name: str) -> np.ndarray:
+        """
+        Get an edge attribute column (NaN where the attribute is missing).
+
+        Args:
+            name: Attribute name from EDGE_COLUMNS
+
+        Returns:
+            View of the column for the current edges
+        """
+        return self._edge_data[name][:self.num_edges]
+
+    def coordinates(self) -> np.ndarray:
+        """Node (lat, lon) coordinates as an (n, 2) array."""
+        return np.column_stack([self.node_column("lat"), self.node_column("lon")])
+
+    def degree(self) -> np.ndarray:
+        """Total (in + out) degree of every node."""
+        return (np.bincount(self.edge_sources, minlength=self.num_nodes) +
+                np.bincount(self.edge_targets, minlength=self.num_nodes))
+
+    def csr(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get the outgoing adjacency in CSR form.
+
+        Returns:
+            (indptr, indices, edge_ids) where the successors of node i are
+            indices[indptr[i]:indptr[i + 1]] and edge_ids maps each CSR entry
+            back to its edge index for attribute lookups
+        """
+        if self._csr is None:
+            sources = self.edge_sources
+            edge_ids = np.argsort(sources, kind="stable")
+            indptr = np.zeros(self.num_nodes + 1, dtype=np.int64)
+            np.cumsum(np.bincount(sources, minlength=self.num_nodes), out=indptr[1:])
+            self._csr = (indptr, self.edge_targets[edge_ids], edge_ids)
+        return self._csr
+
+    def to_sparse(self, weight: Optional[str] = None) -> csr_matrix:
+        """
+        Get the adjacency matrix as a SciPy CSR matrix.
+
+        Args:
+            weight: Edge column to use as matrix values (1.0 for every edge if None)
+
+        Returns:
+            (num_nodes x num_nodes) sparse matrix
+        """
+        indptr, indices, edge_ids = self.csr()
+        values = np.ones(len(edge_ids)) if weight is None else self.edge_column(weight)[edge_ids]
+        return csr_matrix((values, indices, indptr), shape=(self.num_nodes, self.num_nodes))
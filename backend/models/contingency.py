@@ -0,0 +1,450 @@
+"""
+N-k Contingency Analysis Module
+
+This module finds which combinations of up to k facility and route outages
+break service in a supply chain network. Served demand after an outage is
+computed on the compact graph by one of two kernels:
+
+- reachability: demand points reachable from a working facility are served
+  (one breadth-first search from a super source over all facilities)
+- capacitated: a maximum flow from the facilities, limited by facility and
+  route capacities, to the demand points
+
+Outages are applied by patching the shared CSR matrix in place and restoring
+it afterwards, so no graph is copied per outage set.
+
+Outage sets are enumerated level by level (k = 1, 2, ...). Losing more
+elements never serves more demand, so the loss of a subset is a lower bound
+on the loss of any superset: once a set breaks service, its supersets are
+dominated and skipped. Sets containing a route that touches a failed
+facility in the same set are skipped too, since the route outage changes
+nothing. Levels with more combinations than a sample size are sampled
+instead of enumerated.
+
+Sets are evaluated in blocks, optionally on a process pool, and progress
+can be checkpointed to a JSON file after every block so long runs can be
+resumed.
+"""
+
+import hashlib
+import itertools
+import json
+import math
+import os
+import numpy as np
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import breadth_first_order, maximum_flow
+from typing import Dict, List, Tuple, Any, Optional, Hashable, Iterator, Set
+
+from .compact_graph import CompactGraph
+
+CHECKPOINT_FORMAT = 1
+
+# Default number of outage sets per evaluation block
+DEFAULT_BLOCK_SIZE = 2048
+
+# Integer flow units the total demand is scaled to (at most) for maximum_flow
+FLOW_UNITS = 1_000_000
+
+# Engine used by worker processes, set by _init_worker
+_worker_analyzer = None
+
+
+class ContingencyAnalyzer:
+    """
+    Evaluates facility and route outage sets against the undisrupted network.
+
+    Elements are numbered with facilities first, followed by the routes
+    (edges) of the compact graph: element i < num_facilities is facility i,
+    element num_facilities + e is edge e.
+    """
+
+    def __init__(self, compact: CompactGraph, facilities: List[Hashable],
+                 capacitated: bool = False, loss_threshold: float = 0.0):
+        """
+        Initialize the analyzer and compute the baseline served demand.
+
+        Args:
+            compact: Compact graph of the network
+            facilities: Facility node IDs (supply sources and outage candidates)
+            capacitated: Whether served demand is limited by facility and
+                route capacities (maximum flow) or only by reachability
+            loss_threshold: An outage set breaks service when it loses more
+                than this fraction of the baseline served demand
+        """
+        if not 0 <= loss_threshold < 1:
+            raise ValueError(f"Loss threshold must be in [0, 1), got {loss_threshold}")
+
+        self.node_ids = list(compact.node_ids)
+        self.capacitated = capacitated
+        self.loss_threshold = loss_threshold
+        num_nodes, num_edges = compact.num_nodes, compact.num_edges
+
+        self.facility_idx = np.array([compact.node_index[f] for f in facilities if f in compact.node_index],
+                                     dtype=np.int64)
+        self.num_facilities = len(self.facility_idx)
+        self.num_elements = self.num_facilities + num_edges
+        self.src = compact.edge_sources.copy()
+        self.dst = compact.edge_targets.copy()
+        self.route_ids = list(compact.edge_route_ids)
+
+        is_demand = compact.node_types == CompactGraph.NODE_TYPES["demand"]
+        self.demand = np.where(is_demand, np.nan_to_num(compact.node_column("demand_mean")), 0.0)
+        self.total_demand = float(self.demand.sum())
+
+        # Super source feeding every facility (and sink fed by every demand point)
+        source, sink = num_nodes, num_nodes + 1
+        self.source, self.sink = source, sink
+        rows = np.concatenate([np.full(self.num_facilities, source), self.src])
+        cols = np.concatenate([self.facility_idx, self.dst])
+        if capacitated:
+            # Demand points drain into the sink; capacities are scaled to
+            # integers by a power of ten (so demands with few decimals stay
+            # exact) and missing capacities are unlimited
+            demand_idx = np.flatnonzero(self.demand > 0)
+            rows = np.concatenate([rows, demand_idx])
+            cols = np.concatenate([cols, np.full(len(demand_idx), sink)])
+            self.scale = 1.0
+            if self.total_demand > 0:
+                self.scale = 10.0 ** np.floor(np.log10(FLOW_UNITS / self.total_demand))
+            capacity = np.concatenate([compact.node_column("capacity")[self.facility_idx],
+                                       compact.edge_column("capacity"), self.demand[demand_idx]])
+            capacity = np.where(np.isnan(capacity), np.inf, capacity) * self.scale
+            values = np.minimum(np.round(capacity), np.iinfo(np.int32).max).astype(np.int32)
+        else:
+            values = np.ones(len(rows))
+
+        size = num_nodes + 2
+        order = np.lexsort((cols, rows))
+        indptr = np.searchsorted(rows[order], np.arange(size + 1))
+        self.matrix = csr_matrix((values[order], cols[order], indptr), shape=(size, size))
+        self._indices = self.matrix.indices.copy()
+        self._data = self.matrix.data.copy()
+        self._rows = np.repeat(np.arange(size), np.diff(indptr))
+
+        # CSR positions disabled by each element's outage: a facility loses
+        # its supply edge and all its outbound routes
+        position = np.empty(len(rows), dtype=np.int64)
+        position[order] = np.arange(len(rows))
+        self.element_positions = [
+            np.concatenate([[position[i]], np.arange(indptr[f], indptr[f + 1])])
+            for i, f in enumerate(self.facility_idx.tolist())
+        ]
+        self.element_positions += [position[self.num_facilities + e:self.num_facilities + e + 1]
+                                   for e in range(num_edges)]
+
+        # Facility elements at either end of each route
+        facility_element = {f: i for i, f in enumerate(self.facility_idx.tolist())}
+        self.route_facilities = [
+            {facility_element[n] for n in (u, v) if n in facility_element}
+            for u, v in zip(self.src.tolist(), self.dst.tolist())
+        ]
+
+        self.baseline_served = self.served_demand(())
+
+    @contextmanager
+    def _outage(self, elements: Tuple[int, ...]) -> Iterator[csr_matrix]:
+        """
+        Temporarily disable the elements' edges in the matrix.
+
+        Reachability turns disabled edges into self-loops, which no search
+        follows; the capacitated kernel sets their capacity to zero.
+        """
+        if not elements:
+            yield self.matrix
+            return
+        positions = np.concatenate([self.element_positions[e] for e in elements])
+        if self.capacitated:
+            self.matrix.data[positions] = 0
+        else:
+            self.matrix.indices[positions] = self._rows[positions]
+        try:
+            yield self.matrix
+        finally:
+            self.matrix.indices[positions] = self._indices[positions]
+            self.matrix.data[positions] = self._data[positions]
+
+    def served_demand(self, elements: Tuple[int, ...]) -> float:
+        """
+        Demand served with some elements out of service.
+
+        Args:
+            elements: Element numbers of the failed facilities and routes
+
+        Returns:
+            Served demand
+        """
+        with self._outage(elements) as matrix:
+            if self.capacitated:
+                return float(maximum_flow(matrix, self.source, self.sink).flow_value / self.scale)
+            reached = breadth_first_order(matrix, self.source, directed=True, return_predecessors=False)
+        return float(self.demand[reached[reached < len(self.demand)]].sum())
+
+    def degraded_served_demand(self, residual: Dict[int, float]) -> float:
+        """
+        Demand served with some elements at a fraction of their capacity.
+
+        The capacitated kernel scales a facility's supply or a route's
+        capacity by its remaining fraction. Reachability only distinguishes
+        failed elements (nothing left) from working ones.
+
+        Args:
+            residual: Remaining capacity fraction per element number
+
+        Returns:
+            Served demand
+        """
+        failed = tuple(e for e, fraction in residual.items() if fraction <= 0)
+        partial = [(e, fraction) for e, fraction in residual.items() if 0 < fraction < 1]
+        if not self.capacitated or not partial:
+            return self.served_demand(failed)
+
+        # The first position of an element is its supply edge or route
+        positions = np.array([self.element_positions[e][0] for e, _ in partial], dtype=np.int64)
+        self.matrix.data[positions] = np.round(self._data[positions] * [fraction for _, fraction in partial])
+        try:
+            return self.served_demand(failed)
+        finally:
+            self.matrix.data[positions] = self._data[positions]
+
+    def describe(self, elements: Tuple[int, ...]) -> Dict[str, List[Any]]:
+        """
+        Failed facility and route IDs of an outage set.
+
+        Routes without a route_id are given as (origin, destination).
+        """
+        facilities, routes = [], []
+        for element in elements:
+            if element < self.num_facilities:
+                facilities.append(self.node_ids[self.facility_idx[element]])
+            else:
+                e = element - self.num_facilities
+                routes.append(self.route_ids[e] or (self.node_ids[self.src[e]], self.node_ids[self.dst[e]]))
+        return {"facilities": facilities, "routes": routes}
+
+    def fingerprint(self, settings: Dict[str, Any]) -> str:
+        """Hash of the network arrays and run settings, to match checkpoints to runs."""
+        digest = hashlib.sha1()
+        for array in (self.facility_idx, self.src, self.dst, self.demand, self.matrix.data):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        digest.update(json.dumps(settings, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def run(self, max_k: int = 2, top_n: int = 20, sample_size: Optional[int] = None,
+            seed: Optional[int] = None, max_workers: int = 1, block_size: int = DEFAULT_BLOCK_SIZE,
+            checkpoint_file: Optional[str] = None) -> Dict:
+        """
+        Run an N-k contingency analysis.
+
+        Args:
+            max_k: Largest number of simultaneous outages
+            top_n: Number of worst outage sets to return
+            sample_size: Levels with more candidate sets than this are
+                sampled (up to sample_size distinct random sets) instead of
+                enumerated; None always enumerates
+            seed: Seed for sampled levels (None for fresh entropy, which is
+                stored in the checkpoint)
+            max_workers: Number of worker processes (1 runs in-process)
+            block_size: Number of outage sets per evaluation block
+            checkpoint_file: JSON file that progress is saved to after every
+                block; an existing checkpoint for the same network and
+                settings is resumed
+
+        Returns:
+            Dictionary with baseline demand, per-level statistics, the worst
+            outage sets (most demand lost first) and the minimal outage sets
+            that break service
+        """
+        if max_k < 1:
+            raise ValueError(f"max_k must be at least 1, got {max_k}")
+        if block_size < 1:
+            raise ValueError(f"Block size must be positive, got {block_size}")
+
+        settings = {"max_k": max_k, "top_n": top_n, "sample_size": sample_size, "seed": seed,
+                    "block_size": block_size, "capacitated": self.capacitated,
+                    "loss_threshold": self.loss_threshold}
+        state = {
+            "format": CHECKPOINT_FORMAT,
+            "fingerprint": self.fingerprint(settings),
+            "entropy": np.random.SeedSequence(seed).entropy,
+            "level": 1,
+            "blocks_done": 0,
+            "levels": [],
+            "failing": [],
+            "worst": []
+        }
+        if checkpoint_file and os.path.exists(checkpoint_file):
+            with open(checkpoint_file, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get("format") != CHECKPOINT_FORMAT or saved.get("fingerprint") != state["fingerprint"]:
+                raise ValueError(f"Checkpoint {checkpoint_file} was written for a different network or settings")
+            state = saved
+
+        failing = {tuple(s) for s in state["failing"]}
+        seeds = np.random.SeedSequence(state["entropy"]).spawn(max_k)
+        for k in range(state["level"], max_k + 1):
+            if len(state["levels"]) < k:
+                state["levels"].append({"k": k, "candidates": 0, "considered": 0, "evaluated": 0,
+                                        "failing": 0, "sampled": False})
+            level = state["levels"][k - 1]
+            counter = {"considered": 0}
+            candidate_sets = self._level_sets(k, failing, sample_size, np.random.default_rng(seeds[k - 1]),
+                                              level, counter)
+            blocks = iter(lambda: list(itertools.islice(candidate_sets, block_size)), [])
+            for _ in range(state["blocks_done"]):
+                next(blocks)
+
+            for block, served in self._evaluate_blocks(blocks, max_workers):
+                self._record_block(state, failing, block, served, top_n)
+                level["considered"] = counter["considered"]
+                state["blocks_done"] += 1
+                self._save_checkpoint(state, checkpoint_file)
+
+            level["considered"] = counter["considered"]
+            state["level"], state["blocks_done"] = k + 1, 0
+            self._save_checkpoint(state, checkpoint_file)
+
+        return self._summary(state)
+
+    def _level_sets(self, k: int, failing: Set[Tuple[int, ...]], sample_size: Optional[int],
+                    rng: np.random.Generator, level: Dict, counter: Dict[str, int]) -> Iterator[Tuple[int, ...]]:
+        """
+        Outage sets of one level that are not dominated or redundant.
+
+        Single elements that break service are left out of larger sets, and
+        larger sets are checked against the failing sets of every smaller
+        size. counter["considered"] counts the sets generated before pruning.
+        Only failing sets of smaller levels prune a level, so a level resumed
+        from a checkpoint regenerates the same sets.
+        """
+        if k == 1:
+            candidates = list(range(self.num_elements))
+        else:
+            candidates = [e for e in range(self.num_elements) if (e,) not in failing]
+        total = math.comb(len(candidates), k)
+        level["candidates"] = total
+        if sample_size is not None and total > sample_size:
+            level["sampled"] = True
+            combos = self._sample_sets(candidates, k, sample_size, rng)
+        else:
+            combos = itertools.combinations(candidates, k)
+
+        for combo in combos:
+            counter["considered"] += 1
+            facilities = {e for e in combo if e < self.num_facilities}
+            if facilities and any(self.route_facilities[e - self.num_facilities] & facilities
+                                  for e in combo if e >= self.num_facilities):
+                continue
+            if any(subset in failing for size in range(2, k) for subset in itertools.combinations(combo, size)):
+                continue
+            yield combo
+
+    @staticmethod
+    def _sample_sets(candidates: List[int], k: int, sample_size: int,
+                     rng: np.random.Generator) -> Iterator[Tuple[int, ...]]:
+        """Distinct random k-element sets of candidates, in sorted order."""
+        rows = np.sort(rng.integers(len(candidates), size=(sample_size, k)), axis=1)
+        rows = rows[(np.diff(rows, axis=1) > 0).all(axis=1)]
+        rows = np.unique(rows, axis=0)
+        elements = np.asarray(candidates, dtype=np.int64)[rows]
+        for row in elements.tolist():
+            yield tuple(row)
+
+    def _evaluate_blocks(self, blocks: Iterator[List[Tuple[int, ...]]],
+                         max_workers: int) -> Iterator[Tuple[List[Tuple[int, ...]], np.ndarray]]:
+        """
+        Evaluate blocks in order, keeping at most two blocks per worker in flight.
+        """
+        if max_workers <= 1:
+            for block in blocks:
+                yield block, self.evaluate_block(block)
+            return
+
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(self,)) as executor:
+            pending = deque()
+            for block in blocks:
+                pending.append((block, executor.submit(_evaluate_block, block)))
+                if len(pending) >= 2 * max_workers:
+                    block, future = pending.popleft()
+                    yield block, future.result()
+            while pending:
+                block, future = pending.popleft()
+                yield block, future.result()
+
+    def evaluate_block(self, block: List[Tuple[int, ...]]) -> np.ndarray:
+        """
+        Served demand for each outage set of a block.
+
+        Args:
+            block: Outage sets as tuples of element numbers
+
+        Returns:
+            Array of served demand per set
+        """
+        return np.array([self.served_demand(elements) for elements in block], dtype=float)
+
+    def _record_block(self, state: Dict, failing: Set[Tuple[int, ...]], block: List[Tuple[int, ...]],
+                      served: np.ndarray, top_n: int) -> None:
+        """Add a block's results to the run state."""
+        level = state["levels"][len(block[0]) - 1]
+        lost = np.maximum(self.baseline_served - served, 0)
+        level["evaluated"] += len(block)
+
+        breaks = lost > self.loss_threshold * self.baseline_served + 1e-9
+        for i in np.flatnonzero(breaks).tolist():
+            failing.add(block[i])
+            state["failing"].append(list(block[i]))
+        level["failing"] += int(breaks.sum())
+
+        # Merge the block's worst sets into the ranked list
+        best = np.argsort(-lost, kind="stable")[:top_n]
+        ranked = state["worst"] + [[float(lost[i]), list(block[i])] for i in best.tolist()]
+        ranked.sort(key=lambda entry: (-entry[0], len(entry[1]), entry[1]))
+        state["worst"] = ranked[:top_n]
+
+    @staticmethod
+    def _save_checkpoint(state: Dict, checkpoint_file: Optional[str]) -> None:
+        """Atomically write the run state to the checkpoint file."""
+        if not checkpoint_file:
+            return
+        temporary = f"{checkpoint_file}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(temporary, checkpoint_file)
+
+    def _summary(self, state: Dict) -> Dict:
+        """Result dictionary of a finished run."""
+        baseline = self.baseline_served
+        worst = [
+            dict(self.describe(tuple(elements)), k=len(elements), demand_served=baseline - lost,
+                 demand_lost=lost, lost_fraction=lost / baseline if baseline > 0 else 0.0)
+            for lost, elements in state["worst"]
+        ]
+        levels = [
+            {"k": level["k"], "candidates": level["candidates"], "evaluated": level["evaluated"],
+             "pruned": level["considered"] - level["evaluated"], "failing": level["failing"],
+             "sampled": level["sampled"]}
+            for level in state["levels"]
+        ]
+        return {
+            "total_demand": self.total_demand,
+            "baseline_served": baseline,
+            "levels": levels,
+            "worst": worst,
+            "failing_sets": [self.describe(tuple(elements)) for elements in state["failing"]]
+        }
+
+
+def _init_worker(analyzer: ContingencyAnalyzer) -> None:
+    """Store the analyzer in a worker process, so it is sent once per worker."""
+    global _worker_analyzer
+    _worker_analyzer = analyzer
+
+
+def _evaluate_block(block: List[Tuple[int, ...]]) -> np.ndarray:
+    """Evaluate one block of outage sets in a worker process."""
+    return _worker_analyzer.evaluate_block(block)
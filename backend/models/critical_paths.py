@@ -0,0 +1,421 @@
+"""
+Critical Path Analysis Module
+
+This module finds the facility-to-demand paths of a supply chain network
+and evaluates what removing each path's routes does to the network's hop
+distances, without copying the graph per path.
+
+Shortest-path trees are computed once per facility with
+scipy.sparse.csgraph. Baseline hop distances between all nodes are computed
+once as well, and a path removal only recomputes the distances from sources
+whose search tree used one of the removed routes. A cheap detour bound lets
+callers skip the exact evaluation of paths that cannot matter.
+"""
+
+import numpy as np
+from contextlib import contextmanager
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import shortest_path, breadth_first_order, connected_components
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple, Optional, Hashable, Iterator
+
+from .compact_graph import CompactGraph
+
+# Hop distance marking unreachable pairs in integer distance matrices
+UNREACHABLE = np.iinfo(np.int32).max
+
+# Number of sources per block of breadth-first searches
+SOURCE_BLOCK_SIZE = 512
+
+# Engine used by worker processes, set by _init_worker
+_worker_engine = None
+
+
+def _hop_distances(matrix: csr_matrix, sources: np.ndarray) -> np.ndarray:
+    """Hop distances from the sources to every node (UNREACHABLE if not reachable)."""
+    distances = np.empty((len(sources), matrix.shape[0]), dtype=np.int32)
+    for start in range(0, len(sources), SOURCE_BLOCK_SIZE):
+        block = sources[start:start + SOURCE_BLOCK_SIZE]
+        hops = shortest_path(matrix, directed=True, unweighted=True, indices=block)
+        hops[np.isinf(hops)] = UNREACHABLE
+        distances[start:start + len(block)] = hops
+    return distances
+
+
+def average_shortest_path_length(compact: CompactGraph) -> float:
+    """
+    Average hop distance between all ordered node pairs.
+
+    Matches nx.average_shortest_path_length on the unweighted graph, except
+    that networks which are not strongly connected (where NetworkX raises)
+    return infinity.
+
+    Args:
+        compact: Compact graph of the network
+
+    Returns:
+        Average shortest path length, or inf if some pair is unreachable
+    """
+    num_nodes = compact.num_nodes
+    if num_nodes == 0:
+        return float('inf')
+    if num_nodes == 1:
+        return 0.0
+    matrix = compact.to_sparse()
+    if connected_components(matrix, directed=True, connection='strong')[0] > 1:
+        return float('inf')
+    total = 0
+    for start in range(0, num_nodes, SOURCE_BLOCK_SIZE):
+        sources = np.arange(start, min(start + SOURCE_BLOCK_SIZE, num_nodes))
+        total += int(_hop_distances(matrix, sources).sum(dtype=np.int64))
+    return total / (num_nodes * (num_nodes - 1))
+
+
+class CriticalPathEngine:
+    """
+    Evaluates the removal of facility-to-demand paths against fixed
+    baseline hop distances.
+
+    A source's distances can only grow if its breadth-first search tree
+    loses a route, and then only for nodes below that route in the tree.
+    The search trees are reduced per route as they are computed: the number
+    of nodes below each route summed over all trees, and for routes on key
+    paths the set of sources whose tree uses them (as a bitset). Memory is
+    O(edges + key path routes x nodes / 8) rather than O(nodes^2), a removal
+    only searches again from sources whose tree lost a route, and
+    removal_bound can rule out most paths without any search.
+    """
+
+    def __init__(self, compact: CompactGraph, sources: List[Hashable], targets: List[Hashable],
+                 max_hops: int = 3):
+        """
+        Initialize the engine and compute the baseline shortest paths.
+
+        Args:
+            compact: Compact graph of the network
+            sources: Source node IDs (e.g. facilities)
+            targets: Target node IDs (e.g. demand points)
+            max_hops: Longest path, in routes, considered a key path
+        """
+        self.node_ids = list(compact.node_ids)
+        self.num_nodes = compact.num_nodes
+        self.num_edges = compact.num_edges
+        self.src = compact.edge_sources.copy()
+        self.dst = compact.edge_targets.copy()
+        self.edge_index = dict(compact.edge_index)
+        self.in_degree = np.bincount(self.dst, minlength=self.num_nodes)
+        self.out_degree = np.bincount(self.src, minlength=self.num_nodes)
+        # Edges sorted by (destination, origin), to look up search tree routes
+        in_keys = self.dst * self.num_nodes + self.src
+        self.in_edge_order = np.argsort(in_keys, kind="stable")
+        self.in_edge_keys = in_keys[self.in_edge_order]
+
+        indptr, indices, edge_ids = compact.csr()
+        # Position of every edge in the CSR arrays
+        self.csr_position = np.empty(self.num_edges, dtype=np.int64)
+        self.csr_position[edge_ids] = np.arange(self.num_edges)
+        self.matrix = csr_matrix((np.ones(self.num_edges), indices.copy(), indptr.copy()),
+                                 shape=(self.num_nodes, self.num_nodes))
+
+        source_idx = np.array([compact.node_index[s] for s in sources if s in compact.node_index],
+                              dtype=np.int64)
+        target_idx = np.array([compact.node_index[t] for t in targets if t in compact.node_index],
+                              dtype=np.int64)
+        self.paths = self._key_paths(source_idx, target_idx, max_hops)
+
+        # Number of key paths through each edge
+        used = [e for _, edges in self.paths for e in edges]
+        self.edge_usage = np.bincount(np.array(used, dtype=np.int64), minlength=self.num_edges)
+
+        # All-pairs hop distances are only needed when they are all finite;
+        # otherwise every removal leaves the average path length infinite
+        self.strongly_connected = (self.num_nodes > 1 and connected_components(
+            self.matrix, directed=True, connection='strong')[0] == 1)
+        self.distance_sums = None
+        self.edge_below = None
+        self.tracked_edges = None
+        self.tree_sources = None
+        if self.strongly_connected:
+            self._search_trees()
+
+    def _search_trees(self) -> None:
+        """
+        Distance sums of every source, and search trees reduced per route.
+
+        edge_below holds, per route, the number of nodes below it summed over
+        every source's search tree. Routes on key paths get a row in
+        tree_sources (tracked_edges maps routes to rows, -1 if untracked):
+        a bitset over sources of the trees that use the route. Trees are
+        computed and reduced one block of sources at a time.
+        """
+        num_nodes = self.num_nodes
+        self.distance_sums = np.empty(num_nodes, dtype=np.int64)
+        self.edge_below = np.zeros(self.num_edges, dtype=np.int64)
+        key_edges = np.flatnonzero(self.edge_usage > 0)
+        self.tracked_edges = np.full(self.num_edges, -1, dtype=np.int64)
+        self.tracked_edges[key_edges] = np.arange(len(key_edges))
+        self.tree_sources = np.zeros((len(key_edges), (num_nodes + 7) // 8), dtype=np.uint8)
+
+        for start in range(0, num_nodes, SOURCE_BLOCK_SIZE):
+            block = np.arange(start, min(start + SOURCE_BLOCK_SIZE, num_nodes))
+            hops, parents = shortest_path(self.matrix, directed=True, unweighted=True,
+                                          indices=block, return_predecessors=True)
+            hops = hops.astype(np.int64).ravel()
+            self.distance_sums[block] = hops.reshape(len(block), num_nodes).sum(axis=1)
+
+            # Accumulate subtree sizes into tree parents, deepest level first
+            sizes = np.ones(len(hops), dtype=np.int64)
+            parent_slots = (np.arange(len(hops)) // num_nodes) * num_nodes + parents.ravel()
+            order = np.argsort(hops, kind="stable")
+            level_starts = np.searchsorted(hops[order], np.arange(hops.max() + 2))
+            for level in range(int(hops.max()), 0, -1):
+                slots = order[level_starts[level]:level_starts[level + 1]]
+                np.add.at(sizes, parent_slots[slots], sizes[slots])
+
+            # Reduce the block's trees into the per-route counts and source sets
+            rows, nodes, edges = self._tree_edges(parents)
+            below = np.bincount(edges, weights=sizes[rows * num_nodes + nodes], minlength=self.num_edges)
+            self.edge_below += below.astype(np.int64)
+            tracked = self.tracked_edges[edges]
+            keep = tracked >= 0
+            members = np.zeros((len(key_edges), len(block)), dtype=bool)
+            members[tracked[keep], rows[keep]] = True
+            columns = slice(start // 8, start // 8 + (len(block) + 7) // 8)
+            self.tree_sources[:, columns] = np.packbits(members, axis=1)
+
+    def _tree_edges(self, parents: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Routes of a block of search trees.
+
+        Args:
+            parents: Predecessor matrix (sources x nodes) from shortest_path
+
+        Returns:
+            Source row, node and edge index of every tree route into a node
+        """
+        # Keys are ordered by node first, so each tree's lookups run in order
+        rows, nodes = np.nonzero(parents >= 0)
+        keys = nodes * self.num_nodes + parents[rows, nodes]
+        return rows, nodes, self.in_edge_order[np.searchsorted(self.in_edge_keys, keys)]
+
+    def _affected_sources(self, edges: np.ndarray) -> np.ndarray:
+        """
+        Sources whose search tree uses one of the edges.
+
+        Routes on key paths are looked up in tree_sources; any other route
+        needs the search trees again, one block of sources at a time.
+        """
+        rows = self.tracked_edges[edges]
+        if (rows >= 0).all():
+            used = np.bitwise_or.reduce(self.tree_sources[rows], axis=0)
+            return np.flatnonzero(np.unpackbits(used, count=self.num_nodes))
+
+        affected = []
+        for start in range(0, self.num_nodes, SOURCE_BLOCK_SIZE):
+            block = np.arange(start, min(start + SOURCE_BLOCK_SIZE, self.num_nodes))
+            parents = shortest_path(self.matrix, directed=True, unweighted=True,
+                                    indices=block, return_predecessors=True)[1]
+            affected.append(block[(parents[:, self.dst[edges]] == self.src[edges]).any(axis=1)])
+        return np.concatenate(affected)
+
+    @contextmanager
+    def _without(self, removed: np.ndarray) -> Iterator[csr_matrix]:
+        """
+        Temporarily remove edges from the adjacency matrix.
+
+        Removed edges are turned into self-loops, which no search uses, so
+        the matrix is patched in place instead of being rebuilt.
+        """
+        positions = self.csr_position[removed]
+        self.matrix.indices[positions] = self.src[removed]
+        try:
+            yield self.matrix
+        finally:
+            self.matrix.indices[positions] = self.dst[removed]
+
+    def _key_paths(self, source_idx: np.ndarray, target_idx: np.ndarray,
+                   max_hops: int) -> List[Tuple[List[int], List[int]]]:
+        """
+        Shortest paths of at most max_hops routes from every source to every
+        target, as (node indices, edge indices), from one shortest-path tree
+        per source.
+        """
+        paths = []
+        if len(source_idx) == 0 or len(target_idx) == 0:
+            return paths
+        hops, predecessors = shortest_path(self.matrix, directed=True, unweighted=True,
+                                           indices=source_idx, return_predecessors=True)
+        for row, source in enumerate(source_idx.tolist()):
+            reachable = target_idx[np.isfinite(hops[row, target_idx]) & (hops[row, target_idx] <= max_hops)]
+            tree = predecessors[row]
+            for target in reachable.tolist():
+                if target == source:
+                    continue
+                nodes = [target]
+                while nodes[-1] != source:
+                    nodes.append(int(tree[nodes[-1]]))
+                nodes.reverse()
+                edges = [self.edge_index[(u, v)] for u, v in zip(nodes[:-1], nodes[1:])]
+                paths.append((nodes, edges))
+        return paths
+
+    def path_node_ids(self, path: int) -> List[Hashable]:
+        """Node IDs along a key path."""
+        return [self.node_ids[i] for i in self.paths[path][0]]
+
+    def ranked_edges(self) -> List[Tuple[Tuple[Hashable, Hashable], int]]:
+        """
+        Edges used by key paths, most used first.
+
+        Returns:
+            List of ((origin, destination), number of key paths) tuples
+        """
+        order = np.argsort(-self.edge_usage, kind="stable")
+        return [((self.node_ids[self.src[e]], self.node_ids[self.dst[e]]), int(self.edge_usage[e]))
+                for e in order.tolist() if self.edge_usage[e] > 0]
+
+    def _removal_state(self, edges: List[int]) -> Tuple[np.ndarray, bool]:
+        """
+        Removed edges, and whether the network may stay strongly connected
+        without them (False if it is certainly disconnected).
+        """
+        edges = np.array(sorted(set(edges)), dtype=np.int64)
+        if not self.strongly_connected:
+            return edges, False
+
+        # Nodes left without inbound or outbound routes are cut off
+        for ends, degree in ((self.dst[edges].tolist(), self.in_degree), (self.src[edges].tolist(), self.out_degree)):
+            if any(degree[node] == ends.count(node) for node in set(ends)):
+                return edges, False
+        return edges, True
+
+    def _degree(self, edges: np.ndarray) -> float:
+        """Average total degree after removing the edges."""
+        return 2 * (self.num_edges - len(edges)) / self.num_nodes if self.num_nodes else 0.0
+
+    def _average(self, total: int) -> float:
+        """Average distance from a sum of distances over all ordered pairs."""
+        return total / (self.num_nodes * (self.num_nodes - 1))
+
+    def removal_bound(self, edges: List[int]) -> Dict[str, float]:
+        """
+        Cheap upper bound on the metrics after removing some edges.
+
+        Replacing each removed route (u, v) by its shortest detour from u to v
+        in the reduced network lengthens a node's search tree path by at most
+        the detour's extra hops, and only nodes below the route in a tree
+        are affected, so the total distance grows by at most the sum over
+        removed routes of extra hops x nodes below the route. This needs one
+        search per removed route instead of one per affected source. A
+        missing detour means the network is disconnected, which is exact.
+
+        Args:
+            edges: Indices of the removed edges
+
+        Returns:
+            Dictionary with the exact avg_degree and an upper bound on
+            avg_shortest_path
+        """
+        edges, connected = self._removal_state(edges)
+        metrics = {"avg_degree": self._degree(edges), "avg_shortest_path": float('inf')}
+        if not connected:
+            return metrics
+
+        total = int(self.distance_sums.sum())
+        below = self.edge_below[edges]
+        used = below > 0
+        if used.any():
+            with self._without(edges) as matrix:
+                detours = self._detours(matrix, self.src[edges][used], self.dst[edges][used])
+            if np.isinf(detours).any():
+                return metrics
+            total += int(((detours - 1) * below[used]).sum())
+        metrics["avg_shortest_path"] = self._average(total)
+        return metrics
+
+    @staticmethod
+    def _detours(matrix: csr_matrix, origins: np.ndarray, destinations: np.ndarray) -> np.ndarray:
+        """
+        Hop distances from origins to destinations (inf if unreachable).
+
+        A breadth-first order with predecessors is much cheaper than a full
+        distance search, and walking back from a destination gives its depth.
+        """
+        detours = np.full(len(origins), np.inf)
+        trees = {}
+        for i, (origin, destination) in enumerate(zip(origins.tolist(), destinations.tolist())):
+            if origin not in trees:
+                trees[origin] = breadth_first_order(matrix, origin, directed=True,
+                                                    return_predecessors=True)[1]
+            tree = trees[origin]
+            node, hops = destination, 0
+            while node != origin and node >= 0:
+                node = tree[node]
+                hops += 1
+            if node == origin:
+                detours[i] = hops
+        return detours
+
+    def evaluate_removal(self, edges: List[int]) -> Dict[str, float]:
+        """
+        Network metrics after removing some edges.
+
+        Args:
+            edges: Indices of the removed edges
+
+        Returns:
+            Dictionary with avg_degree and avg_shortest_path (hop count; inf
+            if some node pair becomes unreachable)
+        """
+        edges, connected = self._removal_state(edges)
+        metrics = {"avg_degree": self._degree(edges), "avg_shortest_path": float('inf')}
+        if not connected:
+            return metrics
+
+        total = int(self.distance_sums.sum())
+        affected = self._affected_sources(edges)
+        if len(affected):
+            with self._without(edges) as matrix:
+                if connected_components(matrix, directed=True, connection='strong')[0] > 1:
+                    return metrics
+                distances = _hop_distances(matrix, affected)
+            total += int(distances.sum(dtype=np.int64)) - int(self.distance_sums[affected].sum())
+        metrics["avg_shortest_path"] = self._average(total)
+        return metrics
+
+    def evaluate_paths(self, paths: Optional[List[int]] = None, exact: bool = True,
+                       max_workers: int = 1) -> List[Dict[str, float]]:
+        """
+        Evaluate the removal of key paths' edges.
+
+        Args:
+            paths: Indices of the key paths to evaluate (all paths if None)
+            exact: Whether to compute exact metrics (evaluate_removal) or
+                upper bounds (removal_bound)
+            max_workers: Number of worker processes the paths are spread over
+
+        Returns:
+            Metrics per evaluated path, in the order given
+        """
+        if paths is None:
+            paths = range(len(self.paths))
+        removals = [self.paths[p][1] for p in paths]
+        method = "evaluate_removal" if exact else "removal_bound"
+        if max_workers <= 1 or len(removals) <= 1:
+            return [getattr(self, method)(edges) for edges in removals]
+        chunk_size = max(1, len(removals) // (4 * max_workers))
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(self,)) as executor:
+            return list(executor.map(_evaluate_removal, [method] * len(removals), removals,
+                                     chunksize=chunk_size))
+
+
+def _init_worker(engine: CriticalPathEngine) -> None:
+    """Store the engine in a worker process, so it is sent once per worker."""
+    global _worker_engine
+    _worker_engine = engine
+
+
+def _evaluate_removal(method: str, edges: List[int]) -> Dict[str, float]:
+    """Evaluate one path removal in a worker process."""
+    return getattr(_worker_engine, method)(edges)
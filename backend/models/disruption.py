@@ -7,15 +7,31 @@ including natural disasters, pandemics, and geopolitical events.
 
 import numpy as np
 import networkx as nx
-from typing import Dict, List, Tuple, Any, Optional
+from typing import Dict, List, Tuple, Any, Optional, Iterator
+import gzip
 import json
 import random
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from scipy.spatial import cKDTree
+
+from .online_statistics import RunningStats, TDigest
+from .path_metrics import PathDegradationEngine
+from .cascade import CascadeEngine, DEFAULT_TOLERANCE
+
+# Scenarios per Monte Carlo shard; each shard has its own random stream
+MONTE_CARLO_SHARD_SIZE = 1000
 
 class DisruptionSimulator:
     """
     Simulates various types of supply chain disruptions and their impacts
     on network performance.
+    
+    Node positions come from the 'pos' attribute, falling back to the
+    'location' attribute that SupplyChainNetworkOptimizer sets (see
+    node_position). Every scenario generator, disruption and sweep places
+    nodes this way; nodes with neither attribute are never affected.
     """
     
     DISRUPTION_TYPES = {
@@ -41,6 +57,18 @@ class DisruptionSimulator:
         }
     }
     
+    # Epicenter used when a node has no position data (Kenya center)
+    DEFAULT_EPICENTER = (0.0236, 37.9062)
+    
+    # Impacts at or below this level are ignored
+    IMPACT_THRESHOLD = 0.05
+    
+    # Edges are more affected than the nodes they connect
+    EDGE_IMPACT_FACTOR = 1.2
+    
+    # Degrees of distance per unit of geographical spread at which impact reaches zero
+    SPREAD_DISTANCE = 5
+    
     def __init__(self, network_graph: nx.DiGraph):
         """
         Initialize the disruption simulator.
@@ -52,6 +80,20 @@ class DisruptionSimulator:
         self.current_disruptions = {}
         self.disruption_history = []
         
+        # Cached (settings key, PathDegradationEngine) for evaluate_network_resilience
+        self._path_engine = None
+        
+    @staticmethod
+    def node_position(node_data: Dict) -> Optional[Tuple[float, float]]:
+        """
+        Get the (lat, lon) position of a node from its 'pos' attribute, or
+        the 'location' attribute set by SupplyChainNetworkOptimizer.
+        
+        Returns:
+            Position, or None if the node has no position data
+        """
+        return node_data.get('pos', node_data.get('location'))
+        
     def generate_disruption_scenario(self, 
                                     disruption_type: str,
                                     epicenter: Optional[Tuple[float, float]] = None,
@@ -86,12 +128,8 @@ class DisruptionSimulator:
         # If no epicenter provided, choose a random node
         if not epicenter and len(self.network_graph.nodes) > 0:
             node_id = random.choice(list(self.network_graph.nodes))
-            node_data = self.network_graph.nodes[node_id]
-            if 'pos' in node_data:
-                epicenter = node_data['pos']
-            else:
-                # Default to Kenya center if no position data
-                epicenter = (0.0236, 37.9062)  # Kenya center
+            # Default to Kenya center if no position data
+            epicenter = self.node_position(self.network_graph.nodes[node_id]) or self.DEFAULT_EPICENTER
         
         # Generate scenario ID
         scenario_id = f"{disruption_type}_{int(time.time())}_{random.randint(1000, 9999)}"
@@ -115,212 +153,719 @@ class DisruptionSimulator:
         
         return scenario
         
-    def apply_disruption_to_network(self, disruption_scenario: Dict) -> nx.DiGraph:
+    def apply_disruption_to_network(self, disruption_scenario: Dict,
+                                    materialize: bool = True) -> Any:
         """
         Apply a disruption scenario to the network, modifying node and edge attributes.
         
         Args:
             disruption_scenario: Disruption scenario details
+            materialize: Whether to return a full copy of the network graph.
+                If False, a DisruptionOverlay holding only the modified
+                attributes is returned instead, which avoids copying the
+                network for every scenario.
             
         Returns:
-            Modified network graph with disruption effects
+            Modified network graph with disruption effects (or overlay)
         """
-        # Create a copy of the network to modify
-        modified_network = self.network_graph.copy()
+        overlay = DisruptionOverlay(self.network_graph)
         
         # Extract scenario parameters
         epicenter = disruption_scenario["epicenter"]
         severity = disruption_scenario["severity"]
         geo_spread = disruption_scenario["geographical_spread"]
         
-        affected_nodes = []
-        affected_edges = []
-        
         # Calculate impact on each node based on distance from epicenter
-        for node_id, node_data in modified_network.nodes(data=True):
+        for node_id, node_data in self.network_graph.nodes(data=True):
             # Skip nodes without position data
-            if 'pos' not in node_data:
+            node_pos = self.node_position(node_data)
+            if node_pos is None:
                 continue
                 
             # Calculate distance from epicenter
-            node_pos = node_data['pos']
             distance = np.sqrt((node_pos[0] - epicenter[0])**2 + 
                               (node_pos[1] - epicenter[1])**2)
             
             # Calculate impact factor (decreases with distance)
-            distance_factor = max(0, 1 - distance / (geo_spread * 5))
+            distance_factor = max(0, 1 - distance / (geo_spread * self.SPREAD_DISTANCE))
             impact = severity * distance_factor
             
             # Apply impact if significant
-            if impact > 0.05:
+            if impact > self.IMPACT_THRESHOLD:
+                changes = {'disruption_impact': impact}
+                
                 # Reduce capacity
                 if 'capacity' in node_data:
-                    modified_network.nodes[node_id]['original_capacity'] = node_data['capacity']
-                    modified_network.nodes[node_id]['capacity'] = max(0, node_data['capacity'] * (1 - impact))
+                    changes['capacity'] = max(0, node_data['capacity'] * (1 - impact))
                 
                 # Increase costs
                 if 'fixed_cost' in node_data:
-                    modified_network.nodes[node_id]['original_fixed_cost'] = node_data['fixed_cost']
-                    modified_network.nodes[node_id]['fixed_cost'] = node_data['fixed_cost'] * (1 + impact * 0.5)
+                    changes['fixed_cost'] = node_data['fixed_cost'] * (1 + impact * 0.5)
                 
-                # Mark as affected
-                modified_network.nodes[node_id]['disruption_impact'] = impact
-                affected_nodes.append((node_id, impact))
-        
-        # Calculate impact on each edge
-        for u, v, edge_data in modified_network.edges(data=True):
-            # Calculate average impact on connected nodes
-            u_impact = modified_network.nodes[u].get('disruption_impact', 0)
-            v_impact = modified_network.nodes[v].get('disruption_impact', 0)
-            edge_impact = max(u_impact, v_impact) * 1.2  # Edges are more affected than nodes
+                overlay.node_changes[node_id] = changes
+        
+        # Calculate impact on edges; only edges touching an affected node can change
+        for u, v in self._edges_touching(overlay.node_changes):
+            edge_data = self.network_graph.edges[u, v]
+            u_impact = overlay.node_impact(u)
+            v_impact = overlay.node_impact(v)
+            edge_impact = max(u_impact, v_impact) * self.EDGE_IMPACT_FACTOR
             
             # Apply impact if significant
-            if edge_impact > 0.05:
+            if edge_impact > self.IMPACT_THRESHOLD:
+                changes = {'disruption_impact': edge_impact}
+                
                 # Increase transit time
                 if 'transit_time' in edge_data:
-                    modified_network.edges[u, v]['original_transit_time'] = edge_data['transit_time']
-                    modified_network.edges[u, v]['transit_time'] = edge_data['transit_time'] * (1 + edge_impact)
+                    changes['transit_time'] = edge_data['transit_time'] * (1 + edge_impact)
                 
                 # Reduce capacity
                 if 'capacity' in edge_data:
-                    modified_network.edges[u, v]['original_capacity'] = edge_data['capacity']
-                    modified_network.edges[u, v]['capacity'] = max(0, edge_data['capacity'] * (1 - edge_impact))
+                    changes['capacity'] = max(0, edge_data['capacity'] * (1 - edge_impact))
                 
-                # Mark as affected
-                modified_network.edges[u, v]['disruption_impact'] = edge_impact
-                affected_edges.append(((u, v), edge_impact))
+                overlay.edge_changes[(u, v)] = changes
         
         # Update scenario with affected elements
-        disruption_scenario["affected_nodes"] = affected_nodes
-        disruption_scenario["affected_edges"] = affected_edges
+        disruption_scenario["affected_nodes"] = list(overlay.node_impacts().items())
+        disruption_scenario["affected_edges"] = list(overlay.edge_impacts().items())
         
-        return modified_network
+        return overlay.materialize() if materialize else overlay
+    
+    def _edges_touching(self, nodes) -> List[Tuple[Any, Any]]:
+        """Edges of the network with an endpoint in nodes, without duplicates."""
+        edges = {}
+        for node_id in nodes:
+            edges.update(dict.fromkeys(self.network_graph.out_edges(node_id)))
+            edges.update(dict.fromkeys(self.network_graph.in_edges(node_id)))
+        return list(edges)
+    
+    def batch_disruption_impact(self,
+                                epicenters: np.ndarray,
+                                severities: np.ndarray,
+                                geographical_spreads: np.ndarray,
+                                chunk_size: int = 1024) -> Dict[str, Any]:
+        """
+        Compute disruption impacts for many scenarios at once.
+        
+        Uses the same impact model as apply_disruption_to_network, evaluated
+        with NumPy broadcasting over node coordinates and edge endpoint
+        indices instead of per-node and per-edge loops.
+        
+        Args:
+            epicenters: (num_scenarios, 2) array of (lat, lon) epicenters
+            severities: (num_scenarios,) array of severities
+            geographical_spreads: (num_scenarios,) array of geographical spreads
+            chunk_size: Number of scenarios evaluated per block, bounding
+                temporary memory to chunk_size x num_nodes values
+            
+        Returns:
+            Dictionary with node_ids, edges, node_impact (scenario x node),
+            edge_impact (scenario x edge) and capacity_loss (per scenario).
+            Impacts at or below IMPACT_THRESHOLD are reported as 0.
+        """
+        epicenters = np.asarray(epicenters, dtype=float).reshape(-1, 2)
+        num_scenarios = len(epicenters)
+        severities = np.broadcast_to(np.asarray(severities, dtype=float), (num_scenarios,))
+        spreads = np.broadcast_to(np.asarray(geographical_spreads, dtype=float), (num_scenarios,))
+        
+        node_ids, positions, capacity = self._node_arrays()
+        edges = list(self.network_graph.edges())
+        index = {node_id: i for i, node_id in enumerate(node_ids)}
+        src = np.fromiter((index[u] for u, _ in edges), dtype=np.int64, count=len(edges))
+        dst = np.fromiter((index[v] for _, v in edges), dtype=np.int64, count=len(edges))
+        
+        # Nodes without position data are never affected
+        located = ~np.isnan(positions).any(axis=1)
+        lat, lon = positions[located, 0], positions[located, 1]
+        
+        node_impact = np.zeros((num_scenarios, len(node_ids)))
+        edge_impact = np.zeros((num_scenarios, len(edges)))
+        
+        for start in range(0, num_scenarios, chunk_size):
+            block = slice(start, min(start + chunk_size, num_scenarios))
+            distance = np.hypot(lat[None, :] - epicenters[block, 0, None],
+                                lon[None, :] - epicenters[block, 1, None])
+            distance_factor = np.maximum(0, 1 - distance / (spreads[block, None] * self.SPREAD_DISTANCE))
+            impact = severities[block, None] * distance_factor
+            impact[impact <= self.IMPACT_THRESHOLD] = 0
+            node_impact[block, located] = impact
+            
+            block_edges = np.maximum(node_impact[block][:, src], node_impact[block][:, dst])
+            block_edges *= self.EDGE_IMPACT_FACTOR
+            block_edges[block_edges <= self.IMPACT_THRESHOLD] = 0
+            edge_impact[block] = block_edges
+        
+        return {
+            "node_ids": node_ids,
+            "edges": edges,
+            "node_impact": node_impact,
+            "edge_impact": edge_impact,
+            "capacity_loss": node_impact @ capacity
+        }
+    
+    def sweep_capacity_loss(self,
+                            epicenters: np.ndarray,
+                            severity: float,
+                            geographical_spread: float,
+                            chunk_size: int = 4096,
+                            max_workers: int = 1) -> np.ndarray:
+        """
+        Compute the capacity lost for each of many epicenters with a fixed
+        severity and geographical spread.
+        
+        Unlike batch_disruption_impact, only the total capacity loss per
+        epicenter is kept, and only (epicenter, node) pairs within the impact
+        radius are evaluated (found with a k-d tree), so sweeping a dense grid
+        costs time and memory proportional to the affected pairs.
+        
+        Args:
+            epicenters: (num_epicenters, 2) array of (lat, lon) epicenters
+            severity: Severity of every disruption
+            geographical_spread: Geographical spread of every disruption
+            chunk_size: Number of epicenters per block
+            max_workers: Number of worker processes the blocks are spread over
+            
+        Returns:
+            Array of capacity lost per epicenter, matching the capacities of
+            apply_disruption_to_network
+        """
+        epicenters = np.asarray(epicenters, dtype=float).reshape(-1, 2)
+        _, positions, capacity = self._node_arrays()
+        
+        # Only located nodes with capacity can lose any
+        relevant = ~np.isnan(positions).any(axis=1) & (capacity > 0)
+        blocks = [
+            {
+                "epicenters": epicenters[start:start + chunk_size],
+                "positions": positions[relevant],
+                "capacity": capacity[relevant],
+                "severity": severity,
+                "radius": geographical_spread * self.SPREAD_DISTANCE,
+                "threshold": self.IMPACT_THRESHOLD
+            }
+            for start in range(0, len(epicenters), chunk_size)
+        ]
+        
+        if max_workers <= 1 or len(blocks) <= 1:
+            losses = [_capacity_loss_block(block) for block in blocks]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                losses = list(executor.map(_capacity_loss_block, blocks))
+        return np.concatenate(losses) if losses else np.zeros(0)
+    
+    def _node_arrays(self) -> Tuple[List[Any], np.ndarray, np.ndarray]:
+        """
+        Node IDs, (lat, lon) positions (NaN if missing) and capacities (0 if missing).
+        """
+        node_ids = list(self.network_graph.nodes())
+        positions = np.full((len(node_ids), 2), np.nan)
+        capacity = np.zeros(len(node_ids))
+        for i, (_, data) in enumerate(self.network_graph.nodes(data=True)):
+            position = self.node_position(data)
+            if position is not None:
+                positions[i] = position
+            capacity[i] = data.get('capacity', 0) or 0
+        return node_ids, positions, capacity
     
     def monte_carlo_simulation(self, 
                               num_scenarios: int = 100,
                               time_period: int = 365,
-                              disruption_probability: float = 0.01) -> List[Dict]:
+                              disruption_probability: float = 0.01,
+                              seed: Optional[int] = None,
+                              max_workers: int = 1) -> List[Dict]:
         """
         Run Monte Carlo simulation of random disruptions over a time period.
         
+        Disruption arrivals (one Bernoulli trial per day) and their type,
+        duration, severity and epicenter are drawn in bulk per shard of
+        MONTE_CARLO_SHARD_SIZE scenarios. Each shard has its own random
+        stream spawned from the seed, so a given seed produces identical
+        results for any number of workers.
+        
         Args:
             num_scenarios: Number of random scenarios to generate
             time_period: Number of days to simulate
             disruption_probability: Daily probability of a new disruption
+            seed: Seed for reproducible runs (None for fresh entropy)
+            max_workers: Number of worker processes (1 runs in-process)
             
         Returns:
             List of disruption scenarios generated
         """
-        all_scenarios = []
+        shards = self._monte_carlo_shards(num_scenarios, time_period, disruption_probability, seed)
         
-        for _ in range(num_scenarios):
-            # Reset simulation state
-            current_day = 0
-            active_disruptions = []
-            scenario_history = []
-            
-            # Simulate each day
-            while current_day < time_period:
-                # Check if new disruption occurs
-                if random.random() < disruption_probability:
-                    # Choose a random disruption type
-                    disruption_type = random.choice(list(self.DISRUPTION_TYPES.keys()))
-                    
-                    # Generate the disruption
-                    new_disruption = self.generate_disruption_scenario(disruption_type)
-                    active_disruptions.append(new_disruption)
-                    scenario_history.append(new_disruption)
-                
-                # Update day counter
-                current_day += 1
-                
-                # Remove expired disruptions
-                active_disruptions = [d for d in active_disruptions 
-                                     if d["start_time"] + d["duration"] * 86400 > current_day * 86400]
-            
-            all_scenarios.append({
-                "scenario_id": f"montecarlo_{int(time.time())}_{_}",
-                "disruptions": scenario_history,
-                "metrics": self._calculate_scenario_metrics(scenario_history)
-            })
+        all_scenarios = []
+        for shard_scenarios in self._run_monte_carlo_shards(shards, max_workers):
+            all_scenarios.extend(shard_scenarios)
             
         return all_scenarios
     
-    def _calculate_scenario_metrics(self, disruptions: List[Dict]) -> Dict:
+    def iter_monte_carlo(self,
+                         num_scenarios: int = 100,
+                         time_period: int = 365,
+                         disruption_probability: float = 0.01,
+                         seed: Optional[int] = None,
+                         max_workers: int = 1,
+                         statistics: Optional['MonteCarloStatistics'] = None,
+                         spill_file: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Run a Monte Carlo simulation as a stream of scenario summaries.
+        
+        Produces the same scenarios as monte_carlo_simulation for the same
+        seed, but only one shard at a time is held in memory.
+        
+        Args:
+            num_scenarios: Number of random scenarios to generate
+            time_period: Number of days to simulate
+            disruption_probability: Daily probability of a new disruption
+            seed: Seed for reproducible runs (None for fresh entropy)
+            max_workers: Number of worker processes (1 runs in-process)
+            statistics: Aggregates to update as scenarios are produced
+            spill_file: Optional gzip file to append full scenarios to, one
+                JSON object per line (read back with read_monte_carlo_spill)
+            
+        Yields:
+            Scenario summaries with scenario_id and metrics
+        """
+        shards = self._monte_carlo_shards(num_scenarios, time_period, disruption_probability, seed)
+        spill = gzip.open(spill_file, "at", encoding="utf-8") if spill_file else None
+        try:
+            for shard_scenarios in self._run_monte_carlo_shards(shards, max_workers):
+                if statistics is not None:
+                    statistics.update(shard_scenarios)
+                if spill is not None:
+                    spill.writelines(json.dumps(scenario) + "\n" for scenario in shard_scenarios)
+                for scenario in shard_scenarios:
+                    yield {"scenario_id": scenario["scenario_id"], "metrics": scenario["metrics"]}
+        finally:
+            if spill is not None:
+                spill.close()
+    
+    def summarize_monte_carlo(self,
+                              num_scenarios: int = 100,
+                              time_period: int = 365,
+                              disruption_probability: float = 0.01,
+                              seed: Optional[int] = None,
+                              max_workers: int = 1,
+                              spill_file: Optional[str] = None) -> Dict:
         """
-        Calculate metrics for a disruption scenario.
+        Run a Monte Carlo simulation keeping only aggregate statistics.
+        
+        Memory use is independent of num_scenarios.
         
         Args:
-            disruptions: List of disruption events
+            num_scenarios: Number of random scenarios to generate
+            time_period: Number of days to simulate
+            disruption_probability: Daily probability of a new disruption
+            seed: Seed for reproducible runs (None for fresh entropy)
+            max_workers: Number of worker processes (1 runs in-process)
+            spill_file: Optional gzip file to append full scenarios to
             
         Returns:
-            Dictionary of scenario metrics
+            Dictionary of aggregate statistics (see MonteCarloStatistics.to_dict)
         """
-        return {
-            "total_disruptions": len(disruptions),
-            "avg_severity": np.mean([d["severity"] for d in disruptions]) if disruptions else 0,
-            "max_severity": max([d["severity"] for d in disruptions]) if disruptions else 0,
-            "total_duration": sum([d["duration"] for d in disruptions]),
-            "disruption_types": {d_type: sum(1 for d in disruptions if d["type"] == d_type)
-                               for d_type in self.DISRUPTION_TYPES}
+        statistics = MonteCarloStatistics(list(self.DISRUPTION_TYPES))
+        for _ in self.iter_monte_carlo(num_scenarios, time_period, disruption_probability,
+                                       seed, max_workers, statistics, spill_file):
+            pass
+        return statistics.to_dict()
+    
+    @staticmethod
+    def _run_monte_carlo_shards(shards: List[Dict], max_workers: int) -> Iterator[List[Dict]]:
+        """
+        Simulate shards in order, keeping at most two shards per worker in flight.
+        """
+        if max_workers <= 1 or len(shards) <= 1:
+            for shard in shards:
+                yield _simulate_monte_carlo_shard(shard)
+            return
+        
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            pending = deque()
+            for shard in shards:
+                pending.append(executor.submit(_simulate_monte_carlo_shard, shard))
+                if len(pending) >= 2 * max_workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+    
+    def _monte_carlo_shards(self, num_scenarios: int, time_period: int,
+                            disruption_probability: float, seed: Optional[int]) -> List[Dict]:
+        """
+        Split a Monte Carlo run into shards with independent random streams.
+        
+        The shard layout depends only on num_scenarios, never on the number
+        of workers.
+        """
+        if not 0 <= disruption_probability <= 1:
+            raise ValueError(f"Disruption probability must be in [0, 1], got {disruption_probability}")
+        
+        # Candidate epicenters: a random node's position, or the Kenya center
+        epicenters = np.array([self.node_position(data) or self.DEFAULT_EPICENTER
+                               for _, data in self.network_graph.nodes(data=True)], dtype=float)
+        if len(epicenters) == 0:
+            epicenters = np.array([self.DEFAULT_EPICENTER], dtype=float)
+        
+        types = list(self.DISRUPTION_TYPES)
+        params = [self.DISRUPTION_TYPES[t] for t in types]
+        type_arrays = {
+            "duration_low": np.array([p["duration_range"][0] for p in params]),
+            "duration_high": np.array([p["duration_range"][1] for p in params]),
+            "severity_low": np.array([p["severity_range"][0] for p in params], dtype=float),
+            "severity_high": np.array([p["severity_range"][1] for p in params], dtype=float),
+            "geographical_spread": np.array([p["geographical_spread"] for p in params], dtype=float)
         }
+        
+        starts = range(0, num_scenarios, MONTE_CARLO_SHARD_SIZE)
+        seeds = np.random.SeedSequence(seed).spawn(len(starts))
+        return [
+            {
+                "seed": shard_seed,
+                "first_scenario": first,
+                "num_scenarios": min(MONTE_CARLO_SHARD_SIZE, num_scenarios - first),
+                "time_period": time_period,
+                "disruption_probability": disruption_probability,
+                "types": types,
+                "type_arrays": type_arrays,
+                "epicenters": epicenters
+            }
+            for first, shard_seed in zip(starts, seeds)
+        ]
     
     def evaluate_network_resilience(self, 
                                   original_network: nx.DiGraph,
-                                  disruption_scenario: Dict) -> Dict:
+                                  disruption_scenario: Dict,
+                                  num_sources: Optional[int] = None,
+                                  connectivity_samples: int = 100,
+                                  seed: Optional[int] = 0) -> Dict:
         """
         Evaluate the resilience of a network to a disruption.
         
+        Shortest paths (weighted by transit time) and sampled node connectivity
+        of the original network are computed once and reused for later
+        scenarios on the same network; see PathDegradationEngine.
+        
         Args:
             original_network: Original network graph
             disruption_scenario: Disruption scenario to evaluate
+            num_sources: Number of sampled path sources (None for all nodes on
+                networks up to ALL_PAIRS_LIMIT nodes)
+            connectivity_samples: Number of node pairs sampled for connectivity
+            seed: Seed for the source and pair samples
             
         Returns:
             Dictionary of resilience metrics
         """
         # Apply the disruption to get the affected network
-        disrupted_network = self.apply_disruption_to_network(disruption_scenario)
+        disrupted_network = self.apply_disruption_to_network(disruption_scenario, materialize=False)
         
-        # Calculate network connectivity metrics
-        original_connectivity = nx.average_node_connectivity(original_network)
-        try:
-            disrupted_connectivity = nx.average_node_connectivity(disrupted_network)
-            connectivity_reduction = 1 - (disrupted_connectivity / original_connectivity)
-        except:
-            connectivity_reduction = 1.0  # Assume complete failure if calculation fails
-        
-        # Calculate path length changes
-        path_length_increases = []
-        for source in list(original_network.nodes())[:10]:  # Limit to first 10 nodes for efficiency
-            for target in list(original_network.nodes())[:10]:
-                if source != target:
-                    try:
-                        original_path_length = nx.shortest_path_length(original_network, source, target)
-                        disrupted_path_length = nx.shortest_path_length(disrupted_network, source, target)
-                        increase = (disrupted_path_length - original_path_length) / original_path_length
-                        path_length_increases.append(increase)
-                    except:
-                        # Path doesn't exist in one of the networks
-                        pass
-        
-        avg_path_increase = np.mean(path_length_increases) if path_length_increases else float('inf')
-        
-        # Calculate capacity reduction
-        capacity_reductions = []
-        for node in disrupted_network.nodes():
-            original = original_network.nodes[node].get('capacity', 0)
-            disrupted = disrupted_network.nodes[node].get('capacity', 0)
-            if original > 0:
-                reduction = (original - disrupted) / original
-                capacity_reductions.append(reduction)
-        
-        avg_capacity_reduction = np.mean(capacity_reductions) if capacity_reductions else 0
+        engine = self._get_path_engine(original_network, num_sources, connectivity_samples, seed)
+        metrics = engine.evaluate(disrupted_network)
+        
+        metrics["resilience_score"] = 1 - (metrics["connectivity_reduction"] * 0.4 + 
+                                           min(1, metrics["avg_path_length_increase"]) * 0.3 + 
+                                           metrics["avg_capacity_reduction"] * 0.3)
+        return metrics
+    
+    def simulate_cascade(self,
+                         disruption_scenario: Dict,
+                         flows: Optional[Dict] = None,
+                         tolerance: float = DEFAULT_TOLERANCE,
+                         max_steps: int = 50) -> Dict:
+        """
+        Simulate how a disruption cascades through the network's flows.
+        
+        The disruption reduces capacities and fails elements left with no
+        capacity; their flow is then rerouted onto neighbouring routes, and
+        any node or route pushed over capacity fails in the next step.
+        
+        Args:
+            disruption_scenario: Disruption scenario to apply
+            flows: Initial flow per route (route_id or (origin, destination)),
+                e.g. route_flows from NetworkFlowEngine.optimize(); defaults
+                to the 'flow' edge attribute
+            tolerance: Spare capacity, as a fraction of initial flow, of
+                elements without a 'capacity' attribute
+            max_steps: Maximum number of cascade steps
+            
+        Returns:
+            Dictionary with failed elements, per-step statistics and the
+            fraction of demand still served (see CascadeEngine.run)
+        """
+        overlay = self.apply_disruption_to_network(disruption_scenario, materialize=False)
+        engine = CascadeEngine(self.network_graph, flows, tolerance)
+        return engine.run(overlay, max_steps=max_steps)
+    
+    def _get_path_engine(self, original_network: nx.DiGraph, num_sources: Optional[int],
+                         connectivity_samples: int, seed: Optional[int]) -> PathDegradationEngine:
+        """
+        Get the path engine for a network, reusing it while the network
+        (including its transit times and capacities) and sampling settings
+        are unchanged.
+        """
+        key = (PathDegradationEngine.graph_signature(original_network),
+               num_sources, connectivity_samples, seed)
+        if self._path_engine is None or self._path_engine[0] != key:
+            engine = PathDegradationEngine(original_network, num_sources=num_sources,
+                                           connectivity_samples=connectivity_samples, seed=seed)
+            self._path_engine = (key, engine)
+        return self._path_engine[1]
+
+def _simulate_monte_carlo_shard(shard: Dict) -> List[Dict]:
+    """
+    Simulate one shard of Monte Carlo scenarios.
+    
+    Runs in worker processes, so it only uses the plain data in the shard.
+    
+    Args:
+        shard: Shard description from DisruptionSimulator._monte_carlo_shards
         
+    Returns:
+        List of scenario dictionaries with their disruptions and metrics
+    """
+    rng = np.random.default_rng(shard["seed"])
+    num_scenarios = shard["num_scenarios"]
+    types = shard["types"]
+    arrays = shard["type_arrays"]
+    epicenters = shard["epicenters"]
+    
+    # Arrival days of all disruptions, ordered by scenario then day
+    arrivals = rng.random((num_scenarios, shard["time_period"])) < shard["disruption_probability"]
+    scenario_idx, start_day = np.nonzero(arrivals)
+    num_events = len(start_day)
+    
+    type_idx = rng.integers(len(types), size=num_events)
+    duration = rng.integers(arrays["duration_low"][type_idx], arrays["duration_high"][type_idx] + 1)
+    severity_low = arrays["severity_low"][type_idx]
+    severity = severity_low + (arrays["severity_high"][type_idx] - severity_low) * rng.random(num_events)
+    epicenter = epicenters[rng.integers(len(epicenters), size=num_events)]
+    spread = arrays["geographical_spread"][type_idx]
+    
+    # Per-scenario metrics
+    counts = np.bincount(scenario_idx, minlength=num_scenarios)
+    severity_sum = np.bincount(scenario_idx, weights=severity, minlength=num_scenarios)
+    max_severity = np.zeros(num_scenarios)
+    np.maximum.at(max_severity, scenario_idx, severity)
+    total_duration = np.bincount(scenario_idx, weights=duration, minlength=num_scenarios)
+    type_counts = np.zeros((num_scenarios, len(types)), dtype=np.int64)
+    np.add.at(type_counts, (scenario_idx, type_idx), 1)
+    
+    # Plain Python values make building the result dictionaries much faster
+    bounds = np.concatenate([[0], np.cumsum(counts)]).tolist()
+    event_types = [types[t] for t in type_idx.tolist()]
+    event_epicenters = [tuple(e) for e in epicenter.tolist()]
+    duration, severity, spread, start_day = (duration.tolist(), severity.tolist(),
+                                             spread.tolist(), start_day.tolist())
+    
+    scenarios = []
+    for i in range(num_scenarios):
+        scenario_number = shard["first_scenario"] + i
+        disruptions = [
+            {
+                "id": f"{event_types[e]}_{scenario_number}_{e - bounds[i]}",
+                "type": event_types[e],
+                "epicenter": event_epicenters[e],
+                "duration": duration[e],
+                "severity": severity[e],
+                "geographical_spread": spread[e],
+                "start_day": start_day[e],
+                "end_day": start_day[e] + duration[e],
+                "affected_nodes": [],
+                "affected_edges": []
+            }
+            for e in range(bounds[i], bounds[i + 1])
+        ]
+        scenarios.append({
+            "scenario_id": f"montecarlo_{scenario_number}",
+            "disruptions": disruptions,
+            "metrics": {
+                "total_disruptions": int(counts[i]),
+                "avg_severity": float(severity_sum[i] / counts[i]) if counts[i] else 0,
+                "max_severity": float(max_severity[i]),
+                "total_duration": int(total_duration[i]),
+                "disruption_types": dict(zip(types, type_counts[i].tolist()))
+            }
+        })
+    return scenarios
+
+
+def _capacity_loss_block(block: Dict) -> np.ndarray:
+    """
+    Capacity lost for one block of epicenters of a sweep.
+    
+    Runs in worker processes, so it only uses the plain data in the block.
+    
+    Args:
+        block: Block description from DisruptionSimulator.sweep_capacity_loss
+        
+    Returns:
+        Array of capacity lost per epicenter in the block
+    """
+    epicenters = block["epicenters"]
+    loss = np.zeros(len(epicenters))
+    if len(epicenters) == 0 or len(block["positions"]) == 0 or block["radius"] <= 0:
+        return loss
+    
+    pairs = cKDTree(epicenters).sparse_distance_matrix(
+        cKDTree(block["positions"]), block["radius"], output_type="ndarray")
+    impact = block["severity"] * (1 - pairs["v"] / block["radius"])
+    significant = impact > block["threshold"]
+    
+    lost = block["capacity"][pairs["j"][significant]] * np.minimum(impact[significant], 1)
+    loss += np.bincount(pairs["i"][significant], weights=lost, minlength=len(epicenters))
+    return loss
+
+
+def read_monte_carlo_spill(filename: str) -> Iterator[Dict]:
+    """
+    Read full scenarios back from a Monte Carlo spill file.
+    
+    Args:
+        filename: File written by DisruptionSimulator.iter_monte_carlo
+        
+    Yields:
+        Scenario dictionaries with disruptions and metrics
+    """
+    with gzip.open(filename, "rt", encoding="utf-8") as f:
+        for line in f:
+            yield json.loads(line)
+
+
+class MonteCarloStatistics:
+    """
+    Constant-memory aggregates of Monte Carlo scenario metrics.
+    
+    Keeps the running mean and variance (Welford) and t-digest quantile
+    sketches of each numeric metric, plus total counts per disruption type.
+    """
+    
+    # Numeric scenario metrics that are aggregated
+    METRICS = ("total_disruptions", "avg_severity", "max_severity", "total_duration")
+    
+    # Quantiles reported by to_dict
+    QUANTILES = (0.5, 0.9, 0.95, 0.99)
+    
+    def __init__(self, disruption_types: List[str]):
+        """
+        Initialize empty aggregates.
+        
+        Args:
+            disruption_types: Disruption types to count
+        """
+        self.num_scenarios = 0
+        self.stats = {m: RunningStats() for m in self.METRICS}
+        self.digests = {m: TDigest() for m in self.METRICS}
+        self.type_counts = {t: 0 for t in disruption_types}
+        
+    def update(self, scenarios: List[Dict]) -> None:
+        """
+        Add a batch of scenarios.
+        
+        Args:
+            scenarios: Scenarios with a metrics dictionary
+        """
+        self.num_scenarios += len(scenarios)
+        for metric in self.METRICS:
+            values = np.fromiter((s["metrics"][metric] for s in scenarios),
+                                 dtype=float, count=len(scenarios))
+            self.stats[metric].update(values)
+            self.digests[metric].update(values)
+        for scenario in scenarios:
+            for d_type, count in scenario["metrics"]["disruption_types"].items():
+                self.type_counts[d_type] = self.type_counts.get(d_type, 0) + count
+                
+    def to_dict(self) -> Dict:
+        """
+        Summary of the aggregates.
+        
+        Returns:
+            Dictionary with num_scenarios, per-metric statistics and quantiles,
+            and disruption_type_counts
+        """
+        metrics = {}
+        for metric in self.METRICS:
+            summary = self.stats[metric].to_dict()
+            for q in self.QUANTILES:
+                summary[f"p{int(q * 100)}"] = self.digests[metric].quantile(q)
+            metrics[metric] = summary
         return {
-            "connectivity_reduction": connectivity_reduction,
-            "avg_path_length_increase": avg_path_increase,
-            "avg_capacity_reduction": avg_capacity_reduction,
-            "resilience_score": 1 - (connectivity_reduction * 0.4 + 
-                                   min(1, avg_path_increase) * 0.3 + 
-                                   avg_capacity_reduction * 0.3)
+            "num_scenarios": self.num_scenarios,
+            "metrics": metrics,
+            "disruption_type_counts": dict(self.type_counts)
         }
+
+
+class DisruptionOverlay:
+    """
+    Copy-on-write view of a network under a disruption.
+    
+    Only the attributes changed by the disruption (capacity, fixed_cost,
+    transit_time and disruption_impact) are stored; everything else is read
+    from the shared base graph, which is never modified.
+    """
+    
+    # Attributes whose pre-disruption value is recorded as original_<name>
+    TRACKED_ATTRIBUTES = ("capacity", "fixed_cost", "transit_time")
+    
+    def __init__(self, base_graph: nx.DiGraph):
+        """
+        Initialize an empty overlay.
+        
+        Args:
+            base_graph: Undisrupted network graph
+        """
+        self.base_graph = base_graph
+        self.node_changes: Dict[Any, Dict[str, float]] = {}
+        self.edge_changes: Dict[Tuple[Any, Any], Dict[str, float]] = {}
+        
+    def node_attributes(self, node_id: Any) -> Dict:
+        """Attributes of a node with the disruption applied."""
+        return {**self.base_graph.nodes[node_id], **self.node_changes.get(node_id, {})}
+        
+    def edge_attributes(self, origin: Any, destination: Any) -> Dict:
+        """Attributes of an edge with the disruption applied."""
+        return {**self.base_graph.edges[origin, destination],
+                **self.edge_changes.get((origin, destination), {})}
+        
+    def node_impact(self, node_id: Any) -> float:
+        """Disruption impact on a node (0 if unaffected)."""
+        return self.node_changes.get(node_id, {}).get('disruption_impact', 0)
+        
+    def node_impacts(self) -> Dict[Any, float]:
+        """Disruption impact per affected node."""
+        return {n: changes['disruption_impact'] for n, changes in self.node_changes.items()}
+        
+    def edge_impacts(self) -> Dict[Tuple[Any, Any], float]:
+        """Disruption impact per affected edge."""
+        return {e: changes['disruption_impact'] for e, changes in self.edge_changes.items()}
+        
+    def total_node_capacity(self) -> float:
+        """Total node capacity with the disruption applied."""
+        total = sum(data.get('capacity', 0) for _, data in self.base_graph.nodes(data=True))
+        for node_id, changes in self.node_changes.items():
+            if 'capacity' in changes:
+                total += changes['capacity'] - self.base_graph.nodes[node_id]['capacity']
+        return total
+        
+    def materialize(self) -> nx.DiGraph:
+        """
+        Build a full copy of the disrupted network.
+        
+        Changed attributes keep their pre-disruption value as original_<name>.
+        
+        Returns:
+            Modified network graph with disruption effects
+        """
+        graph = self.base_graph.copy()
+        for node_id, changes in self.node_changes.items():
+            self._apply(graph.nodes[node_id], changes)
+        for (u, v), changes in self.edge_changes.items():
+            self._apply(graph.edges[u, v], changes)
+        return graph
+        
+    def _apply(self, data: Dict, changes: Dict) -> None:
+        """Write changes into an attribute dictionary, recording original values."""
+        for attr in self.TRACKED_ATTRIBUTES:
+            if attr in changes:
+                data[f'original_{attr}'] = data[attr]
+        data.update(changes)
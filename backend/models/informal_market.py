@@ -7,9 +7,24 @@ common in Kenya, with improved calculations and validations.
 
 from typing import Dict, List, Tuple, Optional
 import numpy as np
+import pandas as pd
 from datetime import datetime, timedelta
 from scipy.stats import norm
 from .model_validator import ModelValidator
+from .vendor_routing import VendorRoutePlanner, DEFAULT_MAX_ITERATIONS, DEFAULT_MAX_NO_IMPROVEMENT
+
+# Hour bands of _get_time_factor (band i covers hours from bound i-1 up to
+# bound i) and their factors, for vectorized lookups
+TIME_FACTOR_BOUNDS = np.array([6, 9, 12, 15, 17])
+TIME_FACTOR_VALUES = np.array([0.7, 1.5, 2.0, 1.2, 1.0, 0.7])
+
+# Days in the day-of-year axis of the demand multiplier tables
+DAYS_PER_YEAR = 366
+
+# Hours from which _calculate_perishable_discount steps up and its discounts,
+# for vectorized lookups
+PERISHABLE_DISCOUNT_BOUNDS = np.array([17, 18, 19])
+PERISHABLE_DISCOUNT_VALUES = np.array([0.0, 0.2, 0.3, 0.5])
 
 class InformalMarketDynamics:
     def __init__(self):
@@ -42,7 +57,18 @@ class InformalMarketDynamics:
             }
         }
         
+        self.product_categories = {
+            # Demand pattern and perishability used by batch pricing
+            'fresh_produce': {'market_type': 'agricultural', 'perishable': True},
+            'dairy': {'market_type': 'agricultural', 'perishable': True},
+            'grains': {'market_type': 'agricultural', 'perishable': False},
+            'prepared_food': {'market_type': 'urban', 'perishable': True},
+            'clothing': {'market_type': 'urban', 'perishable': False},
+            'household': {'market_type': 'urban', 'perishable': False}
+        }
+        
         self.validator = ModelValidator()
+        self._multiplier_tables = {}
 
     def get_demand_multiplier(self, market: str, datetime: datetime, 
                             market_type: str = 'agricultural') -> float:
@@ -61,48 +87,183 @@ class InformalMarketDynamics:
         multiplier = 1.0
         
         # Market day effect (stronger effect for agricultural markets)
-        base_market_day_boost = 2.5 if market_type == 'agricultural' else 1.8
         if self.is_market_day(market, datetime):
-            multiplier *= base_market_day_boost
+            multiplier *= self._market_day_factor(market_type)
         
         # Time of day effect
-        hour = datetime.hour
+        multiplier *= self._peak_hour_factor(datetime.hour)
+        
+        # Seasonal effect
+        multiplier *= self._seasonal_factor(datetime.month, market_type)
+        
+        # Weather effect (simplified)
+        if self.is_rainy_season(datetime):
+            multiplier *= self._rain_factor(market_type)
+        
+        # Weekend effect for urban markets
+        if market_type == 'urban' and datetime.weekday() >= 5:
+            multiplier *= 1.3
+        
+        return multiplier
+
+    def _market_day_factor(self, market_type: str) -> float:
+        """Demand boost on a market's trading days."""
+        return 2.5 if market_type == 'agricultural' else 1.8
+
+    def _peak_hour_factor(self, hour: int) -> float:
+        """Demand factor of the trading period an hour falls in."""
         for period, (start, end) in self.peak_hours.items():
             if start <= hour < end:
                 if period == 'mid_morning':
-                    multiplier *= 2.0  # Peak trading hours
+                    return 2.0  # Peak trading hours
                 elif period == 'early_morning':
-                    multiplier *= 1.5  # Early trade bonus
+                    return 1.5  # Early trade bonus
                 elif period == 'afternoon':
-                    multiplier *= 1.3  # Steady trade
+                    return 1.3  # Steady trade
                 elif period == 'evening':
-                    multiplier *= 1.6  # Evening rush
+                    return 1.6  # Evening rush
                 break
-        
-        # Seasonal effect
-        month = datetime.month
+        return 1.0
+
+    def _seasonal_factor(self, month: int, market_type: str) -> float:
+        """Demand factor of a month's season."""
         seasonal_patterns = self.seasonal_factors[market_type]
         if month in seasonal_patterns['peak']:
-            multiplier *= 1.5
+            return 1.5
         elif month in seasonal_patterns['low']:
-            multiplier *= 0.7
+            return 0.7
+        return 1.0
+
+    def _rain_factor(self, market_type: str) -> float:
+        """Demand factor during the rainy seasons."""
+        return 0.7 if market_type == 'agricultural' else 0.8
+
+    def demand_multiplier_table(self, year: int,
+                                market_type: str = 'agricultural') -> Tuple[List[str], np.ndarray]:
+        """
+        Demand multipliers of every market for every hour of a year.
         
-        # Weather effect (simplified)
-        if self.is_rainy_season(datetime):
-            rain_impact = 0.7 if market_type == 'agricultural' else 0.8
-            multiplier *= rain_impact
+        Tables are built once per year, market type, market day schedule,
+        peak hours and seasonal factors, and cached, so changes to any of
+        these settings are picked up.
         
-        # Weekend effect for urban markets
-        if market_type == 'urban' and datetime.weekday() >= 5:
-            multiplier *= 1.3
+        Args:
+            year: Calendar year
+            market_type: Type of market ('agricultural' or 'urban')
+            
+        Returns:
+            Market names (in table row order) and a (markets + 1, 366, 24)
+            array of multipliers by day of year (0-based) and hour; the
+            last row is for markets without market days. Day 365 of a
+            non-leap year repeats day 364.
+        """
+        if market_type not in self.seasonal_factors:
+            raise ValueError(f"Unknown market type: {market_type}")
+        schedule = tuple(sorted((name, tuple(days)) for name, days in self.market_days.items()))
+        # Peak hours are matched in order, so their order is part of the key
+        peak_hours = tuple((period, tuple(hours)) for period, hours in self.peak_hours.items())
+        seasons = tuple(sorted((season, tuple(months))
+                               for season, months in self.seasonal_factors[market_type].items()))
+        key = (year, market_type, schedule, peak_hours, seasons)
+        table = self._multiplier_tables.get(key)
+        if table is None:
+            table = self._build_multiplier_table(year, market_type)
+            self._multiplier_tables[key] = table
+        return table
+
+    def _build_multiplier_table(self, year: int, market_type: str) -> Tuple[List[str], np.ndarray]:
+        """Compute the multiplier table of a year (see demand_multiplier_table)."""
+        markets = sorted(self.market_days)
+        days = np.arange(np.datetime64(f'{year:04d}-01-01'), np.datetime64(f'{year + 1:04d}-01-01'))
+        days = np.concatenate([days, days[-1:]])[:DAYS_PER_YEAR]
+        weekdays = (days.astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday
+        months = days.astype('datetime64[M]').astype(np.int64) % 12 + 1
+
+        # Factors per market and weekday, hour and month, applied in the order of get_demand_multiplier
+        market_day = np.ones((len(markets) + 1, 7))
+        for row, market in enumerate(markets):
+            market_day[row, self.market_days[market]] = self._market_day_factor(market_type)
+        hour_factors = np.array([self._peak_hour_factor(hour) for hour in range(24)])
+        month_factors = np.array([self._seasonal_factor(month, market_type) for month in range(1, 13)])
+        rain_factors = np.array([self._rain_factor(market_type) if self.is_rainy_season(datetime(year, month, 1))
+                                 else 1.0 for month in range(1, 13)])
+        weekend = np.where((weekdays >= 5) & (market_type == 'urban'), 1.3, 1.0)
+
+        table = market_day[:, weekdays][:, :, None] * hour_factors[None, None, :]
+        table = table * month_factors[months - 1][None, :, None]
+        table = table * rain_factors[months - 1][None, :, None]
+        table = table * weekend[None, :, None]
+        return markets, table
+
+    def market_codes(self, markets) -> np.ndarray:
+        """
+        Row of each market in the demand multiplier tables.
         
-        return multiplier
+        Args:
+            markets: Market name or array of names (case-insensitive, like
+                is_market_day)
+            
+        Returns:
+            Integer array of table rows; markets without market days map to
+            the last row (len(market_days))
+        """
+        codes, names = pd.factorize(np.asarray(markets, dtype=object).ravel())
+        rows = {name: row for row, name in enumerate(sorted(self.market_days))}
+        lookup = np.array([rows.get(str(name).lower(), len(rows)) for name in names], dtype=np.int64)
+        return lookup[codes].reshape(np.shape(markets))
+
+    def get_demand_multipliers(self, markets, timestamps,
+                               market_type: str = 'agricultural') -> np.ndarray:
+        """
+        Vectorized get_demand_multiplier over arrays of markets and timestamps.
+        
+        Args:
+            markets: Market name or array of names, or integer table rows
+                from market_codes (faster when queried repeatedly)
+            timestamps: Datetime or array of datetimes/datetime64 values,
+                broadcast against markets
+            market_type: Type of market ('agricultural' or 'urban')
+            
+        Returns:
+            Array of demand multipliers with the broadcast shape of the inputs
+        """
+        rows = np.asarray(markets)
+        if not np.issubdtype(rows.dtype, np.integer):
+            rows = self.market_codes(markets)
+        rows, hours = np.broadcast_arrays(rows, self._timestamp_hours(timestamps))
+
+        years = hours.astype('datetime64[Y]')
+        days = hours.astype('datetime64[D]')
+        day_of_year = (days - years).astype(np.int64)
+        hour_of_day = (hours - days).astype(np.int64)
+        years = years.astype(np.int64) + 1970
+
+        first_year = years.flat[0] if years.size else 1970
+        if (years == first_year).all():
+            _, table = self.demand_multiplier_table(int(first_year), market_type)
+            return table[rows, day_of_year, hour_of_day]
+
+        result = np.empty(hours.shape)
+        for year in np.unique(years):
+            _, table = self.demand_multiplier_table(int(year), market_type)
+            in_year = years == year
+            result[in_year] = table[rows[in_year], day_of_year[in_year], hour_of_day[in_year]]
+        return result
+
+    def _timestamp_hours(self, timestamps) -> np.ndarray:
+        """Timestamps (datetimes, datetime64 values or strings) as a datetime64[h] array."""
+        hours = np.asarray(timestamps)
+        if hours.dtype == object:
+            # Python datetimes convert much faster through pandas than through NumPy
+            hours = pd.to_datetime(hours.ravel()).values.reshape(hours.shape)
+        return hours.astype('datetime64[h]')
 
     def calculate_flexible_pricing(self, base_price: float, 
                                  demand_multiplier: float,
                                  competition_factor: float,
                                  perishable: bool = False,
-                                 storage_cost: float = 0.0) -> float:
+                                 storage_cost: float = 0.0,
+                                 hour: Optional[int] = None) -> float:
         """
         Calculate dynamic pricing with enhanced factors.
         
@@ -112,6 +273,7 @@ class InformalMarketDynamics:
             competition_factor: Local competition intensity (0-1)
             perishable: Whether the item is perishable
             storage_cost: Daily storage cost per unit
+            hour: Hour of day for perishable discounts (default: now)
             
         Returns:
             float: Calculated price
@@ -130,7 +292,8 @@ class InformalMarketDynamics:
         price *= competition_impact
         
         # Time-based discounting for perishables
-        hour = datetime.now().hour
+        if hour is None:
+            hour = datetime.now().hour
         if perishable:
             if hour >= 17:  # Late day discount
                 discount = self._calculate_perishable_discount(hour)
@@ -156,6 +319,83 @@ class InformalMarketDynamics:
             return 0.2  # 20% discount
         return 0.0
 
+    def _perishable_discounts(self, hours: np.ndarray) -> np.ndarray:
+        """Vectorized _calculate_perishable_discount."""
+        return PERISHABLE_DISCOUNT_VALUES[np.searchsorted(PERISHABLE_DISCOUNT_BOUNDS, hours, side='right')]
+
+    def calculate_flexible_prices(self, base_prices, categories, markets, timestamps,
+                                  competition_factors=0.0, storage_costs=0.0) -> Dict[str, np.ndarray]:
+        """
+        Vectorized calculate_flexible_pricing for whole vendor catalogues.
+        
+        Demand multipliers come from the precomputed tables of each
+        category's market type, and perishable discounts use the hour of
+        each item's timestamp. All inputs are broadcast against each other.
+        
+        Args:
+            base_prices: Base price per item
+            categories: Product category per item (keys of product_categories)
+            markets: Market name per item, or integer rows from market_codes
+            timestamps: Datetime or datetime64 per item
+            competition_factors: Local competition intensity (0-1) per item
+            storage_costs: Daily storage cost per unit per item
+            
+        Returns:
+            Dictionary of arrays with the broadcast shape of the inputs:
+            price, demand_multiplier, competition_discount and
+            perishable_discount (fractions of the running price),
+            storage_cost, and price_floor (True where the minimum viable
+            price applied)
+        """
+        hours = self._timestamp_hours(timestamps)
+        rows = np.asarray(markets)
+        if not np.issubdtype(rows.dtype, np.integer):
+            rows = self.market_codes(markets)
+        category_codes, category_names = pd.factorize(np.asarray(categories, dtype=object).ravel())
+        unknown = [name for name in category_names if name not in self.product_categories]
+        if unknown:
+            raise ValueError(f"Unknown product categories: {unknown}")
+        category_codes = category_codes.reshape(np.shape(categories))
+
+        base_prices, category_codes, rows, hours, competition, storage = np.broadcast_arrays(
+            np.asarray(base_prices, dtype=float), category_codes, rows, hours,
+            np.asarray(competition_factors, dtype=float), np.asarray(storage_costs, dtype=float))
+        if (base_prices <= 0).any():
+            raise ValueError("Base price must be positive")
+        if ((competition < 0) | (competition > 1)).any():
+            raise ValueError("Competition factor must be between 0 and 1")
+
+        # Demand multipliers per market type, perishability per category
+        multipliers = np.empty(base_prices.shape)
+        perishable = np.zeros(base_prices.shape, dtype=bool)
+        category_types = np.array([self.product_categories[name]['market_type'] for name in category_names])
+        for market_type in np.unique(category_types):
+            items = np.isin(category_codes, np.flatnonzero(category_types == market_type))
+            multipliers[items] = self.get_demand_multipliers(rows[items], hours[items], market_type)
+        for code, name in enumerate(category_names):
+            if self.product_categories[name]['perishable']:
+                perishable |= category_codes == code
+
+        # Same steps as calculate_flexible_pricing
+        competition_discount = (competition ** 0.7) * 0.3
+        price = base_prices * multipliers * (1 - competition_discount)
+        hour_of_day = (hours - hours.astype('datetime64[D]')).astype(np.int64)
+        perishable_discount = np.where(perishable, self._perishable_discounts(hour_of_day), 0.0)
+        price *= 1 - perishable_discount
+        storage = np.where(storage > 0, storage, 0.0)
+        price += storage
+        min_viable_price = base_prices * 0.7
+        price_floor = price < min_viable_price
+
+        return {
+            'price': np.round(np.maximum(price, min_viable_price), 2),
+            'demand_multiplier': multipliers,
+            'competition_discount': competition_discount,
+            'perishable_discount': perishable_discount,
+            'storage_cost': storage,
+            'price_floor': price_floor
+        }
+
     def optimize_mobile_vendor_routing(self, 
                                      vendor_location: Tuple[float, float],
                                      markets: List[Dict],
@@ -173,48 +413,65 @@ class InformalMarketDynamics:
         Returns:
             List of optimized routes with timing
         """
-        routes = []
-        current_pos = vendor_location
-        current_time = time_window[0]
-        total_distance = 0.0
-        
-        # Sort markets by potential profit per km
-        sorted_markets = sorted(
-            markets,
-            key=lambda x: self._calculate_market_priority(x, current_time)
-        )
-        
-        for market in sorted_markets:
-            market_pos = (market['latitude'], market['longitude'])
-            distance = self._calculate_distance(current_pos, market_pos)
+        plan = self.plan_vendor_routes([vendor_location], markets, max_distance, time_window)
+        return plan['routes'][0]
+
+    def plan_vendor_routes(self, vendor_locations: List[Tuple[float, float]],
+                           markets: List[Dict],
+                           max_distance: float = 50.0,
+                           time_window: Tuple[int, int] = (6, 19),
+                           max_iterations: int = DEFAULT_MAX_ITERATIONS,
+                           max_no_improvement: int = DEFAULT_MAX_NO_IMPROVEMENT) -> Dict:
+        """
+        Plan market visits for a team of vendors maximizing expected profit.
+        
+        Each market is visited by at most one vendor of the team; see
+        VendorRoutePlanner for the constraints and the search.
+        
+        Args:
+            vendor_locations: Starting point (lat, lon) of each vendor
+            markets: List of potential markets
+            max_distance: Maximum travel distance per vendor in km
+            time_window: Operating hours window
+            max_iterations: Maximum number of local search iterations
+            max_no_improvement: Iterations without improvement before stopping
             
-            # Check constraints
-            if (total_distance + distance <= max_distance and
-                self._can_reach_market(current_time, distance, market)):
-                    
-                # Calculate optimal visit duration
-                visit_duration = self._calculate_optimal_visit_duration(
-                    market, current_time)
-                
-                # Calculate expected profit
-                profit = self._estimate_market_profit(
-                    market, current_time, visit_duration)
-                
-                route = {
-                    'market': market['name'],
-                    'arrival_time': current_time,
-                    'duration': visit_duration,
-                    'distance': distance,
-                    'expected_profit': profit,
-                    'route': self._get_route_waypoints(current_pos, market_pos)
-                }
-                
-                routes.append(route)
-                current_pos = market_pos
-                current_time += visit_duration
-                total_distance += distance
-        
-        return routes
+        Returns:
+            Routes per vendor with timing, profit and distance totals and
+            the unvisited markets
+        """
+        planner = VendorRoutePlanner(self, markets, max_distance, time_window,
+                                     max_iterations, max_no_improvement)
+        return planner.plan(vendor_locations)
+
+    def plan_vendor_routes_batch(self, vendor_teams: List[List[Tuple[float, float]]],
+                                 markets: List[Dict],
+                                 max_distance: float = 50.0,
+                                 time_window: Tuple[int, int] = (6, 19),
+                                 max_iterations: int = DEFAULT_MAX_ITERATIONS,
+                                 max_no_improvement: int = DEFAULT_MAX_NO_IMPROVEMENT,
+                                 max_workers: int = 1) -> List[Dict]:
+        """
+        Plan market visits for many independent vendor teams.
+        
+        Markets and their distances are prepared once for all teams.
+        
+        Args:
+            vendor_teams: Starting points of each team's vendors (a single
+                vendor is a team of one)
+            markets: List of potential markets shared by all teams
+            max_distance: Maximum travel distance per vendor in km
+            time_window: Operating hours window
+            max_iterations: Maximum number of local search iterations per team
+            max_no_improvement: Iterations without improvement before stopping
+            max_workers: Number of worker processes the teams are spread over
+            
+        Returns:
+            Plan per team (see plan_vendor_routes), in the order given
+        """
+        planner = VendorRoutePlanner(self, markets, max_distance, time_window,
+                                     max_iterations, max_no_improvement)
+        return planner.plan_many(vendor_teams, max_workers)
 
     def _calculate_distance(self, point1: Tuple[float, float], 
                           point2: Tuple[float, float]) -> float:
@@ -263,6 +520,11 @@ class InformalMarketDynamics:
         else:  # Evening/night
             return 0.7
 
+    def _time_factors(self, hours: np.ndarray) -> np.ndarray:
+        """Vectorized _get_time_factor over an array of hours."""
+        bands = np.searchsorted(TIME_FACTOR_BOUNDS, np.asarray(hours, dtype=float), side='right')
+        return TIME_FACTOR_VALUES[bands]
+
     def _can_reach_market(self, current_time: int, 
                          distance: float,
                          market: Dict) -> bool:
@@ -289,6 +551,14 @@ class InformalMarketDynamics:
         # Cap maximum duration
         return min(duration, 4.0)  # Max 4 hours per market
 
+    def _visit_durations(self, size_factors: np.ndarray,
+                         arrival_times: np.ndarray) -> np.ndarray:
+        """Vectorized _calculate_optimal_visit_duration over arrays of markets and times."""
+        arrival_times = np.asarray(arrival_times, dtype=float)
+        duration = 2.0 * np.asarray(size_factors, dtype=float)
+        duration = duration * np.where((8 <= arrival_times) & (arrival_times <= 12), 1.3, 1.0)
+        return np.minimum(duration, 4.0)
+
     def _estimate_market_profit(self, market: Dict,
                               arrival_time: int,
                               duration: float) -> float:
@@ -303,6 +573,12 @@ class InformalMarketDynamics:
         
         return base_profit * time_factor * duration_factor
 
+    def _visit_profits(self, base_profits: np.ndarray, arrival_times: np.ndarray,
+                       durations: np.ndarray) -> np.ndarray:
+        """Vectorized _estimate_market_profit over arrays of markets, times and durations."""
+        duration_factors = np.minimum(np.asarray(durations, dtype=float) / 2.0, 1.5)
+        return np.asarray(base_profits, dtype=float) * self._time_factors(arrival_times) * duration_factors
+
     def _get_route_waypoints(self, start: Tuple[float, float],
                            end: Tuple[float, float]) -> List[Tuple[float, float]]:
         """Generate route waypoints considering Kenya's road network."""
@@ -0,0 +1,167 @@
+"""
+Network Bulk Loading Module
+
+This module reads and validates tabular network data (pandas DataFrames,
+CSV or Parquet files) for facilities, demand points and routes, so large
+networks can be ingested in one pass instead of one add_* call per row.
+
+Expected columns:
+- facilities: facility_id, latitude, longitude, capacity, fixed_cost, [echelon]
+- demand points: demand_id, latitude, longitude, demand_mean, [demand_std]
+- routes: route_id, origin, destination, distance, transit_time, [mode], [cost]
+"""
+
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Union
+
+TableSource = Union[pd.DataFrame, str, Path]
+
+FACILITY_COLUMNS = ["facility_id", "latitude", "longitude", "capacity", "fixed_cost"]
+DEMAND_POINT_COLUMNS = ["demand_id", "latitude", "longitude", "demand_mean"]
+ROUTE_COLUMNS = ["route_id", "origin", "destination", "distance", "transit_time"]
+
+
+def read_table(source: TableSource) -> pd.DataFrame:
+    """
+    Read a network table from a DataFrame, CSV file or Parquet file.
+
+    Args:
+        source: DataFrame or path to a .csv or .parquet file
+
+    Returns:
+        DataFrame with the table contents
+    """
+    if isinstance(source, pd.DataFrame):
+        return source
+
+    path = Path(source)
+    suffix = path.suffix.lower()
+    if suffix in (".parquet", ".pq"):
+        return pd.read_parquet(path)
+    if suffix == ".csv":
+        return pd.read_csv(path)
+    raise ValueError(f"Unsupported table format: {path.suffix} (expected .csv or .parquet)")
+
+
+def prepare_facilities(table: pd.DataFrame) -> pd.DataFrame:
+    """
+    Validate a facilities table and fill optional columns.
+
+    Args:
+        table: Facilities table
+
+    Returns:
+        Validated table with an integer echelon column
+    """
+    table = _validate_table(table, "facilities", FACILITY_COLUMNS, "facility_id",
+                            ["latitude", "longitude", "capacity", "fixed_cost"])
+    _check_coordinates(table, "facilities")
+    _check_non_negative(table, "facilities", ["capacity", "fixed_cost"])
+
+    echelon = pd.to_numeric(table["echelon"], errors="coerce") if "echelon" in table else None
+    table["echelon"] = 1 if echelon is None else echelon.fillna(1).astype(int)
+    return table
+
+
+def prepare_demand_points(table: pd.DataFrame) -> pd.DataFrame:
+    """
+    Validate a demand points table and fill optional columns.
+
+    Args:
+        table: Demand points table
+
+    Returns:
+        Validated table with demand_std defaulting to 20% of demand_mean
+    """
+    table = _validate_table(table, "demand points", DEMAND_POINT_COLUMNS, "demand_id",
+                            ["latitude", "longitude", "demand_mean"])
+    _check_coordinates(table, "demand points")
+    _check_non_negative(table, "demand points", ["demand_mean"])
+
+    default_std = 0.2 * table["demand_mean"]
+    if "demand_std" in table:
+        table["demand_std"] = pd.to_numeric(table["demand_std"], errors="coerce").fillna(default_std)
+    else:
+        table["demand_std"] = default_std
+    return table
+
+
+def prepare_routes(table: pd.DataFrame, known_nodes: Union[set, Dict, List]) -> pd.DataFrame:
+    """
+    Validate a routes table and fill optional columns.
+
+    Args:
+        table: Routes table
+        known_nodes: Node IDs the routes may connect
+
+    Returns:
+        Validated table with mode defaulting to 'road' and cost to 1.5 per km
+    """
+    table = _validate_table(table, "routes", ROUTE_COLUMNS, "route_id",
+                            ["distance", "transit_time"])
+    _check_non_negative(table, "routes", ["distance", "transit_time"])
+
+    known = set(known_nodes)
+    for column in ("origin", "destination"):
+        is_unknown = np.fromiter((node not in known for node in table[column].tolist()),
+                                 dtype=bool, count=len(table))
+        unknown = table.loc[is_unknown, column]
+        if len(unknown):
+            raise ValueError(f"routes: {len(unknown)} rows reference unknown {column} nodes "
+                             f"(e.g. {unknown.unique()[:5].tolist()})")
+
+    table["mode"] = table["mode"].fillna("road") if "mode" in table else "road"
+
+    # Default cost calculation, as in add_route
+    default_cost = table["distance"] * 1.5
+    if "cost" in table:
+        table["cost"] = pd.to_numeric(table["cost"], errors="coerce").fillna(default_cost)
+    else:
+        table["cost"] = default_cost
+    return table
+
+
+def _validate_table(table: pd.DataFrame, name: str, required: List[str],
+                    id_column: str, numeric: List[str]) -> pd.DataFrame:
+    """Check required columns, unique non-null IDs and numeric columns."""
+    missing = [c for c in required if c not in table.columns]
+    if missing:
+        raise ValueError(f"{name}: missing required columns {missing}")
+
+    table = table.copy()
+    ids = table[id_column]
+    if ids.isna().any():
+        raise ValueError(f"{name}: {int(ids.isna().sum())} rows have no {id_column}")
+    duplicated = ids[ids.duplicated()]
+    if len(duplicated):
+        raise ValueError(f"{name}: duplicate {id_column} values "
+                         f"(e.g. {duplicated.unique()[:5].tolist()})")
+
+    for column in numeric:
+        values = pd.to_numeric(table[column], errors="coerce")
+        bad = values.isna() | ~np.isfinite(values)
+        if bad.any():
+            raise ValueError(f"{name}: column '{column}' has {int(bad.sum())} missing or "
+                             f"non-numeric values (e.g. rows {table.index[bad][:5].tolist()})")
+        table[column] = values.astype(float)
+
+    return table
+
+
+def _check_coordinates(table: pd.DataFrame, name: str) -> None:
+    """Check latitude/longitude ranges."""
+    for column, limit in (("latitude", 90), ("longitude", 180)):
+        bad = table[column].abs() > limit
+        if bad.any():
+            raise ValueError(f"{name}: column '{column}' has {int(bad.sum())} values outside "
+                             f"[-{limit}, {limit}]")
+
+
+def _check_non_negative(table: pd.DataFrame, name: str, columns: List[str]) -> None:
+    """Check that quantities are not negative."""
+    for column in columns:
+        bad = table[column] < 0
+        if bad.any():
+            raise ValueError(f"{name}: column '{column}' has {int(bad.sum())} negative values")
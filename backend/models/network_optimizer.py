@@ -5,11 +5,16 @@ This module implements the main supply chain network optimizer that integrates
 facility location, routing, and inventory optimization components.
 """
 
+import asyncio
+import multiprocessing
+import threading
+import time
 import numpy as np
 import networkx as nx
 import matplotlib.pyplot as plt
 import folium
 import json
+import hashlib
 from typing import Dict, List, Tuple, Any, Optional
 from datetime import datetime
 
@@ -17,6 +22,102 @@ from datetime import datetime
 from .facility_location import FacilityLocationOptimizer
 from .routing import RoutingOptimizer
 from .inventory import InventoryOptimizer
+from .network_flow import NetworkFlowEngine
+from .compact_graph import CompactGraph
+from .network_loader import (TableSource, read_table, prepare_facilities,
+                             prepare_demand_points, prepare_routes)
+from .network_snapshot import NetworkSnapshot, write_snapshot
+from .network_versions import NetworkVersion
+from .network_rendering import DEFAULT_MAX_ROUTES, build_render_layers, render_layers
+
+
+# Sub-models run by optimize_all, mapped to the method producing their results
+OPTIMIZATION_MODELS = {
+    "route-optimization": "_run_route_optimization",
+    "inventory-management": "_run_inventory_optimization",
+    "network-optimization": "_run_network_optimization",
+}
+
+# Default per-model time limit in seconds (OR-Tools routing search runs up to 30s)
+DEFAULT_MODEL_TIMEOUT = 60.0
+
+# Networks with more elements than this are drawn with clustered GeoJSON layers
+DIRECT_RENDER_LIMIT = 1000
+
+
+# Idle model workers kept for reuse by optimize_all, set by _get_model_pool
+_model_pool = None
+
+
+def _execute_model(optimizer: 'SupplyChainNetworkOptimizer', method_name: str) -> Tuple[Dict, float]:
+    """Run a single optimize_all sub-model in a worker process and time it."""
+    start = time.perf_counter()
+    result = getattr(optimizer, method_name)()
+    return result, time.perf_counter() - start
+
+
+def _model_worker_loop(conn) -> None:
+    """Run (optimizer, method name) tasks received on a pipe until it closes."""
+    while True:
+        try:
+            optimizer, method_name = conn.recv()
+        except EOFError:
+            return
+        try:
+            conn.send(("completed",) + _execute_model(optimizer, method_name))
+        except Exception as e:
+            conn.send(("failed", f"{type(e).__name__}: {e}", None))
+
+
+class _ModelWorker:
+    """A long-lived process running optimize_all sub-models, one at a time."""
+
+    def __init__(self):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_model_worker_loop, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def stop(self) -> None:
+        """Terminate the process, even in the middle of a model."""
+        self.process.terminate()
+        self.process.join()
+        self.conn.close()
+
+
+class _ModelWorkerPool:
+    """
+    Idle model workers shared by optimize_all calls.
+
+    Unlike a ProcessPoolExecutor, a worker whose model times out can be
+    terminated without breaking the others; it is simply not returned.
+    """
+
+    def __init__(self):
+        self.idle: List[_ModelWorker] = []
+        self._lock = threading.Lock()
+
+    def acquire(self) -> _ModelWorker:
+        """Take an idle worker, or start a new one."""
+        with self._lock:
+            while self.idle:
+                worker = self.idle.pop()
+                if worker.process.is_alive():
+                    return worker
+        return _ModelWorker()
+
+    def release(self, worker: _ModelWorker) -> None:
+        """Return a worker that finished its model."""
+        with self._lock:
+            self.idle.append(worker)
+
+
+def _get_model_pool() -> _ModelWorkerPool:
+    """The model worker pool of this process."""
+    global _model_pool
+    if _model_pool is None:
+        _model_pool = _ModelWorkerPool()
+    return _model_pool
 
 
 class SupplyChainNetworkOptimizer:
@@ -33,8 +134,9 @@ class SupplyChainNetworkOptimizer:
         self.routes = {}
         self.inventory_params = {}
         
-        # Graph representation
+        # Graph representation, with an array-backed view kept in sync for analytics
         self.network_graph = nx.DiGraph()
+        self.compact_graph = CompactGraph()
         
         # Component optimizers
         self.facility_optimizer = None
@@ -44,51 +146,120 @@ class SupplyChainNetworkOptimizer:
         # Baseline metrics
         self.baseline_metrics = None
         
+        # Cached (compact graph, version, state metrics) for get_current_state
+        self._state_metrics = None
+        
+        # Cached (compact graph, version, options, layers) for visualize_network
+        self._render_cache = None
+        
+        # Cached (compact graph, version, fingerprint) for network_fingerprint
+        self._fingerprint = None
+        
     async def get_current_state(self) -> Dict:
         """Get current state of the supply chain network"""
         state = {
             "routes": self._get_route_states(),
             "facilities": self._get_facility_states(),
-            "daily_throughput": self._calculate_throughput(),
-            "bottlenecks": self._identify_bottlenecks(),
-            "resource_utilization": self._calculate_resource_utilization(),
-            "cost_per_unit": self._calculate_cost_per_unit(),
-            "stockout_rate": self._calculate_stockout_rate()
+            **self._get_state_metrics()
         }
         return state
 
-    async def optimize_all(self, network_state: Dict) -> Dict:
-        """Run all optimization models and return estimated improvements"""
+    async def optimize_all(self, network_state: Dict,
+                           timeout: float = DEFAULT_MODEL_TIMEOUT,
+                           max_workers: Optional[int] = None) -> Dict:
+        """
+        Run all optimization models concurrently and return estimated improvements.
+        
+        Each sub-model runs in a worker process so the event loop stays free
+        while they solve. Worker processes are kept between calls; a model
+        that exceeds the timeout has its worker terminated, so it stops using
+        CPU when the call returns. Models that fail or time out are left out
+        of the results; their status is reported under "model_execution".
+        
+        Args:
+            network_state: Current network state (see get_current_state)
+            timeout: Maximum wall time in seconds allowed for each model,
+                counted from when it starts on a worker
+            max_workers: Number of models run at once (defaults to all)
+            
+        Returns:
+            Estimated improvements per model plus per-model execution details
+        """
         results = {}
+        execution = {}
         
-        # Initialize optimizers if not already done
-        self._initialize_optimizers()
+        slots = asyncio.Semaphore(max_workers or len(OPTIMIZATION_MODELS))
+        outcomes = await asyncio.gather(*(
+            self._run_model(method_name, timeout, slots) for method_name in OPTIMIZATION_MODELS.values()
+        ))
         
-        # Run route optimization
-        route_results = self.routing_optimizer.optimize()
-        results["route-optimization"] = {
+        for model_name, (model_results, status) in zip(OPTIMIZATION_MODELS, outcomes):
+            if model_results is not None:
+                results[model_name] = model_results
+            execution[model_name] = status
+        
+        results["model_execution"] = execution
+        return results
+
+    async def _run_model(self, method_name: str, timeout: float,
+                         slots: asyncio.Semaphore) -> Tuple[Optional[Dict], Dict]:
+        """Run a sub-model on a pooled worker, converting timeouts and errors into a status entry"""
+        async with slots:
+            pool = _get_model_pool()
+            worker = pool.acquire()
+            reusable = False
+            start = time.perf_counter()
+            try:
+                worker.conn.send((self, method_name))
+                # Wait in a thread, so the event loop stays free
+                ready = await asyncio.get_running_loop().run_in_executor(None, worker.conn.poll, timeout)
+                if not ready:
+                    return None, {"status": "timeout", "wall_time": time.perf_counter() - start}
+                status, payload, wall_time = worker.conn.recv()
+                reusable = True
+            except Exception as e:
+                return None, {
+                    "status": "failed",
+                    "wall_time": time.perf_counter() - start,
+                    "error": f"{type(e).__name__}: {e}"
+                }
+            finally:
+                # Workers that timed out, died or were cancelled mid-model are terminated
+                if reusable:
+                    pool.release(worker)
+                else:
+                    worker.stop()
+        
+        if status == "completed":
+            return payload, {"status": "completed", "wall_time": wall_time}
+        return None, {"status": "failed", "wall_time": time.perf_counter() - start, "error": payload}
+
+    def _run_route_optimization(self) -> Dict:
+        """Run route optimization and map it to estimated improvements"""
+        route_results = RoutingOptimizer(self.routes).optimize()
+        return {
             "estimated_average_transit_time": route_results["estimated_transit_time"],
             "estimated_transportation_cost": route_results["estimated_cost_per_unit"],
             "estimated_vehicle_utilization": route_results["estimated_utilization"]
         }
-        
-        # Run inventory optimization
-        inv_results = self.inventory_optimizer.optimize()
-        results["inventory-management"] = {
-            "estimated_inventory_holding_cost": inv_results["holding_cost_percent"],
-            "estimated_stockout_rate": inv_results["stockout_rate"],
-            "estimated_working_capital_requirement": inv_results["working_capital"]
+
+    def _run_inventory_optimization(self) -> Dict:
+        """Run inventory optimization and map it to estimated improvements"""
+        inv_results = InventoryOptimizer(self.facilities, self.inventory_params).optimize()
+        return {
+            "estimated_inventory_holding_cost": inv_results["estimated_inventory_holding_cost"],
+            "estimated_stockout_rate": inv_results["estimated_stockout_rate"],
+            "estimated_working_capital_requirement": inv_results["estimated_working_capital_requirement"]
         }
-        
-        # Run network flow optimization
+
+    def _run_network_optimization(self) -> Dict:
+        """Run network flow optimization and map it to estimated improvements"""
         network_results = self._optimize_network_flow()
-        results["network-optimization"] = {
+        return {
             "estimated_network_throughput": network_results["throughput"],
             "estimated_bottleneck_count": network_results["bottlenecks"],
             "estimated_resource_utilization": network_results["utilization"]
         }
-        
-        return results
 
     def _get_route_states(self) -> List[Dict]:
         """Get current state of all routes"""
@@ -116,63 +287,67 @@ class SupplyChainNetworkOptimizer:
             })
         return states
 
+    def _get_state_metrics(self) -> Dict:
+        """
+        Calculate the aggregate state metrics in one pass over the attribute columns.
+        
+        Results are cached against the compact graph version, so repeated polls
+        of an unchanged network cost O(1).
+        """
+        compact = self.compact_graph
+        if self._state_metrics is not None:
+            cached_graph, cached_version, cached_metrics = self._state_metrics
+            if cached_graph is compact and cached_version == compact.version:
+                return cached_metrics
+        
+        flow = compact.edge_column("flow")
+        utilization = compact.node_column("utilization")
+        demand = compact.node_column("demand")
+        has_demand = ~np.isnan(demand)
+        fulfilled = np.nan_to_num(compact.node_column("fulfilled")[has_demand])
+        
+        total_flow = float(np.nansum(flow))
+        total_cost = float(np.nansum(compact.edge_column("cost")))
+        total_demand = float(demand[has_demand].sum())
+        unfulfilled_demand = float(np.maximum(0, demand[has_demand] - fulfilled).sum())
+        
+        metrics = {
+            # Sum of all flow through network edges
+            "daily_throughput": total_flow,
+            # 90% utilization threshold (NaN compares False, so nodes without data are skipped)
+            "bottlenecks": [compact.node_ids[i] for i in np.flatnonzero(utilization > 0.9)],
+            "resource_utilization": float(np.nan_to_num(utilization).mean()) if len(utilization) else 0,
+            "cost_per_unit": total_cost / total_flow if total_flow > 0 else 0,
+            "stockout_rate": unfulfilled_demand / total_demand if total_demand > 0 else 0
+        }
+        
+        self._state_metrics = (compact, compact.version, metrics)
+        return metrics
+
     def _calculate_throughput(self) -> float:
         """Calculate current daily network throughput"""
-        # Sum of all flow through network edges
-        total_flow = sum(edge["flow"] for _, _, edge in self.network_graph.edges(data=True))
-        return total_flow
+        return self._get_state_metrics()["daily_throughput"]
 
     def _identify_bottlenecks(self) -> List[str]:
         """Identify network bottlenecks based on capacity utilization"""
-        bottlenecks = []
-        for node, data in self.network_graph.nodes(data=True):
-            if data.get("utilization", 0) > 0.9:  # 90% utilization threshold
-                bottlenecks.append(node)
-        return bottlenecks
+        return self._get_state_metrics()["bottlenecks"]
 
     def _calculate_resource_utilization(self) -> float:
         """Calculate average resource utilization across network"""
-        utilizations = [data.get("utilization", 0) 
-                       for _, data in self.network_graph.nodes(data=True)]
-        return np.mean(utilizations) if utilizations else 0
+        return self._get_state_metrics()["resource_utilization"]
 
     def _calculate_cost_per_unit(self) -> float:
         """Calculate current transportation cost per unit"""
-        total_cost = sum(edge.get("cost", 0) for _, _, edge in self.network_graph.edges(data=True))
-        total_volume = sum(edge.get("flow", 0) for _, _, edge in self.network_graph.edges(data=True))
-        return total_cost / total_volume if total_volume > 0 else 0
+        return self._get_state_metrics()["cost_per_unit"]
 
     def _calculate_stockout_rate(self) -> float:
         """Calculate current stockout rate"""
-        total_demand = 0
-        unfulfilled_demand = 0
-        
-        for node, data in self.network_graph.nodes(data=True):
-            if "demand" in data:
-                total_demand += data["demand"]
-                unfulfilled_demand += max(0, data["demand"] - data.get("fulfilled", 0))
-                
-        return unfulfilled_demand / total_demand if total_demand > 0 else 0
+        return self._get_state_metrics()["stockout_rate"]
 
     def _optimize_network_flow(self) -> Dict:
-        """Optimize network flow to maximize throughput and minimize bottlenecks"""
-        # Implementation of network flow optimization using minimum cost flow
-        flow = nx.max_flow_min_cost(self.network_graph, "source", "sink")
-        
-        # Calculate metrics for optimized network
-        optimized_throughput = sum(flow.values())
-        
-        # Count potential bottlenecks in optimized network
-        bottleneck_count = sum(1 for f in flow.values() if f > 0.9)
-        
-        # Calculate resource utilization in optimized network
-        utilization = np.mean([f for f in flow.values() if f > 0])
-        
-        return {
-            "throughput": optimized_throughput,
-            "bottlenecks": bottleneck_count,
-            "utilization": utilization
-        }
+        """Optimize network flow to maximize throughput at minimum cost"""
+        engine = NetworkFlowEngine(self.facilities, self.demand_points, self.routes)
+        return engine.optimize()
         
     def add_facility(self, facility_id: str, location: Tuple[float, float], 
                     capacity: float, fixed_cost: float, echelon: int = 1) -> None:
@@ -202,6 +377,13 @@ class SupplyChainNetworkOptimizer:
             fixed_cost=fixed_cost,
             echelon=echelon
         )
+        self.compact_graph.add_node(
+            facility_id,
+            type='facility',
+            location=location,
+            capacity=capacity,
+            fixed_cost=fixed_cost
+        )
         
     def add_demand_point(self, demand_id: str, location: Tuple[float, float], 
                         demand_mean: float, demand_std: Optional[float] = None) -> None:
@@ -228,6 +410,12 @@ class SupplyChainNetworkOptimizer:
             demand_mean=demand_mean,
             demand_std=self.demand_points[demand_id]["demand_std"]
         )
+        self.compact_graph.add_node(
+            demand_id,
+            type='demand',
+            location=location,
+            demand_mean=demand_mean
+        )
         
     def add_route(self, route_id: str, origin: str, destination: str, 
                  distance: float, transit_time: float, mode: str = 'road', 
@@ -263,6 +451,155 @@ class SupplyChainNetworkOptimizer:
             mode=mode,
             cost=self.routes[route_id]["cost"]
         )
+        self.compact_graph.add_edge(
+            origin,
+            destination,
+            route_id=route_id,
+            distance=distance,
+            transit_time=transit_time,
+            cost=self.routes[route_id]["cost"]
+        )
+        
+    def load_facilities(self, source: TableSource) -> int:
+        """
+        Bulk load facilities from a DataFrame, CSV or Parquet file.
+        
+        Columns: facility_id, latitude, longitude, capacity, fixed_cost, [echelon]
+        
+        Args:
+            source: DataFrame or path to a .csv or .parquet file
+            
+        Returns:
+            Number of facilities loaded
+        """
+        table = prepare_facilities(read_table(source))
+        
+        ids = table["facility_id"].tolist()
+        locations = list(zip(table["latitude"].tolist(), table["longitude"].tolist()))
+        capacities = table["capacity"].tolist()
+        fixed_costs = table["fixed_cost"].tolist()
+        echelons = table["echelon"].tolist()
+        
+        records = [
+            {"location": loc, "capacity": cap, "fixed_cost": cost, "echelon": ech}
+            for loc, cap, cost, ech in zip(locations, capacities, fixed_costs, echelons)
+        ]
+        self.facilities.update(zip(ids, records))
+        self.network_graph.add_nodes_from(
+            (f_id, {"type": 'facility', **record}) for f_id, record in zip(ids, records)
+        )
+        self.compact_graph.add_nodes(
+            ids,
+            node_type='facility',
+            lat=table["latitude"].to_numpy(),
+            lon=table["longitude"].to_numpy(),
+            capacity=table["capacity"].to_numpy(),
+            fixed_cost=table["fixed_cost"].to_numpy()
+        )
+        return len(ids)
+        
+    def load_demand_points(self, source: TableSource) -> int:
+        """
+        Bulk load demand points from a DataFrame, CSV or Parquet file.
+        
+        Columns: demand_id, latitude, longitude, demand_mean, [demand_std]
+        
+        Args:
+            source: DataFrame or path to a .csv or .parquet file
+            
+        Returns:
+            Number of demand points loaded
+        """
+        table = prepare_demand_points(read_table(source))
+        
+        ids = table["demand_id"].tolist()
+        locations = list(zip(table["latitude"].tolist(), table["longitude"].tolist()))
+        
+        records = [
+            {"location": loc, "demand_mean": mean, "demand_std": std}
+            for loc, mean, std in zip(locations, table["demand_mean"].tolist(),
+                                      table["demand_std"].tolist())
+        ]
+        self.demand_points.update(zip(ids, records))
+        self.network_graph.add_nodes_from(
+            (d_id, {"type": 'demand', **record}) for d_id, record in zip(ids, records)
+        )
+        self.compact_graph.add_nodes(
+            ids,
+            node_type='demand',
+            lat=table["latitude"].to_numpy(),
+            lon=table["longitude"].to_numpy(),
+            demand_mean=table["demand_mean"].to_numpy()
+        )
+        return len(ids)
+        
+    def load_routes(self, source: TableSource) -> int:
+        """
+        Bulk load routes from a DataFrame, CSV or Parquet file.
+        Origins and destinations must be facilities or demand points already in the network.
+        
+        Columns: route_id, origin, destination, distance, transit_time, [mode], [cost]
+        
+        Args:
+            source: DataFrame or path to a .csv or .parquet file
+            
+        Returns:
+            Number of routes loaded
+        """
+        table = prepare_routes(read_table(source), self.network_graph)
+        
+        ids = table["route_id"].tolist()
+        origins = table["origin"].tolist()
+        destinations = table["destination"].tolist()
+        
+        records = [
+            {"origin": o, "destination": d, "distance": dist, "transit_time": tt,
+             "mode": mode, "cost": cost}
+            for o, d, dist, tt, mode, cost in zip(
+                origins, destinations, table["distance"].tolist(),
+                table["transit_time"].tolist(), table["mode"].tolist(), table["cost"].tolist()
+            )
+        ]
+        self.routes.update(zip(ids, records))
+        self.network_graph.add_edges_from(
+            (r["origin"], r["destination"],
+             {"route_id": r_id, "distance": r["distance"], "transit_time": r["transit_time"],
+              "mode": r["mode"], "cost": r["cost"]})
+            for r_id, r in zip(ids, records)
+        )
+        self.compact_graph.add_edges(
+            origins,
+            destinations,
+            route_ids=ids,
+            distance=table["distance"].to_numpy(),
+            transit_time=table["transit_time"].to_numpy(),
+            cost=table["cost"].to_numpy()
+        )
+        return len(ids)
+        
+    @classmethod
+    def from_tables(cls, facilities: Optional[TableSource] = None,
+                    demand_points: Optional[TableSource] = None,
+                    routes: Optional[TableSource] = None) -> 'SupplyChainNetworkOptimizer':
+        """
+        Create a network optimizer from facility, demand point and route tables.
+        
+        Args:
+            facilities: Facilities DataFrame or file (see load_facilities)
+            demand_points: Demand points DataFrame or file (see load_demand_points)
+            routes: Routes DataFrame or file (see load_routes)
+            
+        Returns:
+            SupplyChainNetworkOptimizer instance
+        """
+        optimizer = cls()
+        if facilities is not None:
+            optimizer.load_facilities(facilities)
+        if demand_points is not None:
+            optimizer.load_demand_points(demand_points)
+        if routes is not None:
+            optimizer.load_routes(routes)
+        return optimizer
         
     def add_inventory_params(self, facility_id: str, lead_time: float, review_period: float,
                             demand_mean: Optional[float] = None, demand_std: Optional[float] = None,
@@ -312,6 +649,98 @@ class SupplyChainNetworkOptimizer:
             "holding_cost": holding_cost,
             "stockout_cost": stockout_cost
         })
+        self.compact_graph.set_node_attributes(facility_id, demand_mean=demand_mean)
+        
+    def update_node_attributes(self, node_id: str, **attributes) -> None:
+        """
+        Update attributes of a network node (e.g. utilization, demand, fulfilled).
+        
+        Use this rather than editing network_graph directly so the compact
+        graph view used by the analytics stays in sync.
+        
+        Args:
+            node_id: Node to update
+            **attributes: Attribute values to set
+        """
+        if node_id not in self.network_graph:
+            raise ValueError(f"Node {node_id} not found in network")
+        self.network_graph.nodes[node_id].update(attributes)
+        self.compact_graph.set_node_attributes(node_id, **attributes)
+        
+    def update_edge_attributes(self, origin: str, destination: str, **attributes) -> None:
+        """
+        Update attributes of a network edge (e.g. flow, capacity, cost).
+        
+        Use this rather than editing network_graph directly so the compact
+        graph view used by the analytics stays in sync.
+        
+        Args:
+            origin: Origin node ID
+            destination: Destination node ID
+            **attributes: Attribute values to set
+        """
+        if not self.network_graph.has_edge(origin, destination):
+            raise ValueError(f"Route {origin} -> {destination} not found in network")
+        self.network_graph.edges[origin, destination].update(attributes)
+        self.compact_graph.set_edge_attributes(origin, destination, **attributes)
+        
+    @property
+    def network_version(self) -> int:
+        """
+        Counter that increases whenever the network is changed through the
+        add_*, load_* and update_* methods.
+        
+        Cheap to poll, but only comparable for the same compact graph and
+        within one process; use network_fingerprint to identify content.
+        """
+        return self.compact_graph.version
+        
+    def network_fingerprint(self) -> str:
+        """
+        Content hash of the network.
+        
+        Covers the nodes, routes and their tracked attributes (see
+        CompactGraph) plus the inventory parameters. Equal networks get equal
+        fingerprints in any process, so the fingerprint can key persistent
+        caches. It is recomputed only when network_version changes.
+        
+        Returns:
+            Hex digest identifying the network content
+        """
+        compact = self.compact_graph
+        if self._fingerprint is not None:
+            cached_graph, cached_version, cached_fingerprint = self._fingerprint
+            if cached_graph is compact and cached_version == compact.version:
+                return cached_fingerprint
+        
+        digest = hashlib.sha1()
+        digest.update(json.dumps([repr(node_id) for node_id in compact.node_ids]).encode())
+        digest.update(json.dumps(compact.edge_route_ids).encode())
+        arrays = [compact.node_types, compact.edge_sources, compact.edge_targets]
+        arrays += [compact.node_column(name) for name in CompactGraph.NODE_COLUMNS]
+        arrays += [compact.edge_column(name) for name in CompactGraph.EDGE_COLUMNS]
+        for array in arrays:
+            digest.update(np.ascontiguousarray(array).tobytes())
+        digest.update(json.dumps(self.inventory_params, sort_keys=True, default=str).encode())
+        
+        fingerprint = digest.hexdigest()
+        self._fingerprint = (compact, compact.version, fingerprint)
+        return fingerprint
+        
+    def create_version(self, label: str = "base") -> NetworkVersion:
+        """
+        Create a root version of the current network for what-if analysis.
+        
+        The network graph is copied once and frozen; branches of the
+        returned version only store their own changes on top of it.
+        
+        Args:
+            label: Name of the root version
+            
+        Returns:
+            Root NetworkVersion
+        """
+        return NetworkVersion.from_graph(self.network_graph, label)
         
     def _initialize_optimizers(self) -> None:
         """Initialize component optimizers with current network data."""
@@ -381,18 +810,25 @@ class SupplyChainNetworkOptimizer:
         )
         
     def visualize_network(self, as_is: bool = True, to_be: bool = False, 
-                         map_type: str = 'folium') -> Any:
+                         map_type: str = 'folium', max_routes: int = DEFAULT_MAX_ROUTES) -> Any:
         """
         Visualize the supply chain network.
         
         Args:
             as_is: Whether to show current network
             to_be: Whether to show optimized network
-            map_type: Type of visualization ('folium' for geographic, 'graph' for network)
+            map_type: Type of visualization ('folium' for geographic, 'geojson' for
+                clustered layers suited to large networks, 'graph' for network).
+                'folium' switches to 'geojson' above DIRECT_RENDER_LIMIT elements.
+            max_routes: Maximum number of route polylines per zoom level ('geojson' only)
             
         Returns:
             Visualization object
         """
+        num_elements = self.compact_graph.num_nodes + self.compact_graph.num_edges
+        if map_type == 'geojson' or (map_type == 'folium' and num_elements > DIRECT_RENDER_LIMIT):
+            return render_layers(self._get_render_layers(max_routes))
+            
         if map_type == 'folium':
             # Create map centered at average location
             all_locations = [f["location"] for f in self.facilities.values()]
@@ -507,6 +943,21 @@ class SupplyChainNetworkOptimizer:
         else:
             raise ValueError(f"Unknown map type: {map_type}")
         
+    def _get_render_layers(self, max_routes: int) -> Dict:
+        """
+        Build the map layers for visualize_network, cached against the compact graph version.
+        """
+        compact = self.compact_graph
+        if self._render_cache is not None:
+            cached_graph, cached_version, cached_max_routes, cached_layers = self._render_cache
+            if (cached_graph is compact and cached_version == compact.version
+                    and cached_max_routes == max_routes):
+                return cached_layers
+        
+        layers = build_render_layers(compact, self.network_graph, max_routes=max_routes)
+        self._render_cache = (compact, compact.version, max_routes, layers)
+        return layers
+        
     def export_to_json(self, filename: str) -> None:
         """
         Export network model to JSON.
@@ -586,5 +1037,65 @@ class SupplyChainNetworkOptimizer:
                     route_id=r_id,
                     **{k: v for k, v in route.items() if k not in ["origin", "destination"]}
                 )
+        
+        optimizer.compact_graph = CompactGraph.from_networkx(optimizer.network_graph)
                 
         return optimizer
+
+    def save_snapshot(self, filename: str) -> None:
+        """
+        Save the network model to a binary snapshot file.
+        
+        Snapshots store attributes as memory-mappable columns and are much
+        smaller and faster to load than export_to_json for large networks.
+        
+        Args:
+            filename: Output snapshot filename
+        """
+        write_snapshot(self, filename)
+        
+    @classmethod
+    def from_snapshot(cls, filename: str) -> 'SupplyChainNetworkOptimizer':
+        """
+        Create network optimizer from a binary snapshot file.
+        
+        Use NetworkSnapshot directly to read columns or build a compact graph
+        without materializing the full model.
+        
+        Args:
+            filename: Input snapshot filename
+            
+        Returns:
+            SupplyChainNetworkOptimizer instance
+        """
+        snapshot = NetworkSnapshot(filename)
+        tables = snapshot.to_tables()
+        
+        optimizer = cls()
+        optimizer.load_facilities(tables["facilities"])
+        optimizer.load_demand_points(tables["demand_points"])
+        
+        # Route endpoints that are neither facilities nor demand points
+        other_nodes = [n for n in snapshot.strings("node_id") if n not in optimizer.network_graph]
+        optimizer.network_graph.add_nodes_from(other_nodes)
+        optimizer.compact_graph.add_nodes(other_nodes)
+        
+        optimizer.load_routes(tables["routes"])
+        
+        # Attributes stored outside the columns
+        for table, records in (("facilities", optimizer.facilities),
+                               ("demand_points", optimizer.demand_points)):
+            for node_id, extra in snapshot.extras(table).items():
+                records[node_id].update(extra)
+                optimizer.update_node_attributes(node_id, **extra)
+        for route_id, extra in snapshot.extras("routes").items():
+            route = optimizer.routes[route_id]
+            route.update(extra)
+            optimizer.update_edge_attributes(route["origin"], route["destination"], **extra)
+            
+        for facility_id, params in snapshot.inventory_params().items():
+            optimizer.inventory_params[facility_id] = params
+            optimizer.network_graph.nodes[facility_id].update(params)
+            optimizer.compact_graph.set_node_attributes(facility_id, demand_mean=params["demand_mean"])
+            
+        return optimizer
@@ -0,0 +1,307 @@
+"""
+Network Map Rendering Module
+
+This module turns the compact graph of a supply chain network into compact
+map layers that stay responsive for networks with tens of thousands of
+elements:
+
+- facilities and demand points are emitted as coordinate arrays rendered by
+  a client-side marker cluster instead of one folium Marker per node
+- routes are emitted as GeoJSON FeatureCollections, one per zoom band; at
+  low zoom levels route endpoints are snapped to a coarse grid and parallel
+  routes are merged, so zoomed-out views draw far fewer polylines
+- each band keeps only the routes carrying the most flow (flow-based
+  decimation), with line width scaled by flow
+
+It also renders raster results, such as vulnerability heatmaps, as a single
+image overlay.
+"""
+
+import numpy as np
+import networkx as nx
+import folium
+from folium.plugins import FastMarkerCluster
+from folium.template import Template
+from branca.element import MacroElement
+from typing import Dict, List, Tuple, Any, Optional
+
+from .compact_graph import CompactGraph
+
+# Polyline colors by transportation mode
+ROUTE_MODE_COLORS = {
+    'road': 'blue',
+    'rail': 'red',
+    'air': 'purple',
+    'sea': 'green'
+}
+
+# Zoom bands as (min_zoom, max_zoom, grid size in degrees); None disables snapping
+DEFAULT_ZOOM_BANDS = (
+    (0, 6, 0.5),
+    (7, 9, 0.05),
+    (10, None, None),
+)
+
+# Maximum number of route polylines drawn per zoom band
+DEFAULT_MAX_ROUTES = 2000
+
+# Coordinate precision of the rendered layers (5 decimals ~ 1 m)
+COORDINATE_DECIMALS = 5
+
+# Marker callbacks for FastMarkerCluster rows of [lat, lon, popup, color]
+_MARKER_CALLBACK = """function (row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]),
+        {radius: 6, color: row[3], fillColor: row[3], fillOpacity: 0.8, weight: 1});
+    marker.bindPopup(row[2]);
+    return marker;
+}"""
+
+
+class ZoomLayerSwitch(MacroElement):
+    """Show each layer only within its zoom range."""
+
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+            (function() {
+                var map = {{ this._parent.get_name() }};
+                var bands = [
+                {%- for layer, min_zoom, max_zoom in this.layers %}
+                    [{{ layer.get_name() }}, {{ min_zoom }}, {{ max_zoom }}],
+                {%- endfor %}
+                ];
+                function update() {
+                    var zoom = map.getZoom();
+                    bands.forEach(function(band) {
+                        var visible = zoom >= band[1] && zoom <= band[2];
+                        if (visible && !map.hasLayer(band[0])) { map.addLayer(band[0]); }
+                        if (!visible && map.hasLayer(band[0])) { map.removeLayer(band[0]); }
+                    });
+                }
+                map.on('zoomend', update);
+                update();
+            })();
+        {% endmacro %}
+    """)
+
+    def __init__(self, layers: List[Tuple[Any, int, int]]):
+        """
+        Initialize the zoom switch.
+
+        Args:
+            layers: (layer, min_zoom, max_zoom) tuples
+        """
+        super().__init__()
+        self._name = "ZoomLayerSwitch"
+        self.layers = layers
+
+
+def build_render_layers(compact: CompactGraph, graph: nx.DiGraph,
+                        max_routes: int = DEFAULT_MAX_ROUTES,
+                        zoom_bands: Tuple = DEFAULT_ZOOM_BANDS) -> Dict[str, Any]:
+    """
+    Build the map layers for a network.
+
+    Args:
+        compact: Compact graph of the network
+        graph: NetworkX graph of the network (for echelons and route modes)
+        max_routes: Maximum number of polylines per zoom band
+        zoom_bands: (min_zoom, max_zoom, grid size) tuples
+
+    Returns:
+        Dictionary with marker rows for facilities and demand points, route
+        layers per zoom band and the map center
+    """
+    coords = np.round(compact.coordinates(), COORDINATE_DECIMALS)
+    located = ~np.isnan(coords).any(axis=1)
+    node_types = compact.node_types
+    capacity = compact.node_column("capacity")
+    demand_mean = compact.node_column("demand_mean")
+
+    facility_rows = []
+    demand_rows = []
+    for idx in np.flatnonzero(located):
+        node_id = compact.node_ids[idx]
+        lat, lon = coords[idx].tolist()
+        if node_types[idx] == CompactGraph.NODE_TYPES["facility"]:
+            color = 'red' if graph.nodes[node_id].get("echelon", 1) == 1 else 'blue'
+            facility_rows.append([lat, lon, f"Facility: {node_id}<br>Capacity: {capacity[idx]:g}", color])
+        elif node_types[idx] == CompactGraph.NODE_TYPES["demand"]:
+            demand_rows.append([lat, lon, f"Demand: {node_id}<br>Mean: {demand_mean[idx]:g}", 'green'])
+
+    center = coords[located].mean(axis=0).tolist() if located.any() else [0.0, 0.0]
+
+    node_ids = compact.node_ids
+    edge_modes = [graph.edges[node_ids[u], node_ids[v]].get("mode", "road")
+                  for u, v in zip(compact.edge_sources.tolist(), compact.edge_targets.tolist())]
+
+    route_layers = [
+        {
+            "min_zoom": min_zoom,
+            "max_zoom": 18 if max_zoom is None else max_zoom,
+            "geojson": _route_features(compact, edge_modes, coords, located, grid, max_routes)
+        }
+        for min_zoom, max_zoom, grid in zoom_bands
+    ]
+
+    return {
+        "center": center,
+        "facilities": facility_rows,
+        "demand_points": demand_rows,
+        "routes": route_layers
+    }
+
+
+def _route_weights(compact: CompactGraph) -> np.ndarray:
+    """Flow per route, falling back to capacity and then to 1."""
+    weight = compact.edge_column("flow").copy()
+    capacity = compact.edge_column("capacity")
+    missing = np.isnan(weight)
+    weight[missing] = capacity[missing]
+    weight[np.isnan(weight)] = 1.0
+    return np.maximum(weight, 0.0)
+
+
+def _route_features(compact: CompactGraph, edge_modes: List[str], coords: np.ndarray,
+                    located: np.ndarray, grid: Optional[float], max_routes: int) -> Dict:
+    """
+    Build a GeoJSON FeatureCollection of routes for one zoom band.
+
+    With a grid size, endpoints are snapped to the grid, routes between the
+    same snapped endpoints are merged (summing their flow) and routes that
+    collapse to a point are dropped.
+    """
+    src = compact.edge_sources
+    dst = compact.edge_targets
+    keep = located[src] & located[dst]
+    edges = np.flatnonzero(keep)
+    weight = _route_weights(compact)[edges]
+    start = coords[src[edges]]
+    end = coords[dst[edges]]
+
+    modes = [edge_modes[e] for e in edges]
+
+    if grid is not None and len(edges):
+        start = np.round(np.round(start / grid) * grid, COORDINATE_DECIMALS)
+        end = np.round(np.round(end / grid) * grid, COORDINATE_DECIMALS)
+        segments = np.hstack([start, end])
+        unique, inverse = np.unique(segments, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+        merged_weight = np.bincount(inverse, weights=weight, minlength=len(unique))
+        merged_count = np.bincount(inverse, minlength=len(unique))
+
+        # Each merged line takes the mode of its highest-flow route
+        order = np.lexsort((-weight, inverse))
+        first = order[np.r_[True, inverse[order][1:] != inverse[order][:-1]]]
+        group_mode = np.empty(len(unique), dtype=object)
+        group_mode[inverse[first]] = [modes[i] for i in first]
+
+        not_point = (unique[:, 0] != unique[:, 2]) | (unique[:, 1] != unique[:, 3])
+        start, end = unique[not_point, :2], unique[not_point, 2:]
+        weight = merged_weight[not_point]
+        modes = group_mode[not_point].tolist()
+        labels = [f"{count} routes" for count in merged_count[not_point]]
+    else:
+        labels = [f"Route: {compact.edge_route_ids[e]}" for e in edges]
+
+    # Flow-based decimation: keep the heaviest routes
+    selected = np.arange(len(weight))
+    if len(weight) > max_routes:
+        selected = np.argpartition(-weight, max_routes - 1)[:max_routes]
+    selected = selected[np.argsort(-weight[selected], kind="stable")]
+
+    max_weight = weight[selected].max() if len(selected) and weight[selected].max() > 0 else 1.0
+    line_width = np.round(1 + 4 * weight / max_weight, 1)
+
+    features = [
+        {
+            "type": "Feature",
+            "geometry": {
+                "type": "LineString",
+                # GeoJSON uses (lon, lat) order
+                "coordinates": [[start[i, 1], start[i, 0]], [end[i, 1], end[i, 0]]]
+            },
+            "properties": {
+                "label": labels[i],
+                "mode": modes[i],
+                "flow": round(float(weight[i]), 2),
+                "color": ROUTE_MODE_COLORS.get(modes[i], 'gray'),
+                "weight": float(line_width[i])
+            }
+        }
+        for i in selected.tolist()
+    ]
+    return {"type": "FeatureCollection", "features": features}
+
+
+def render_layers(layers: Dict[str, Any], zoom_start: int = 6) -> folium.Map:
+    """
+    Create a folium map from prebuilt render layers.
+
+    Args:
+        layers: Output of build_render_layers
+        zoom_start: Initial zoom level
+
+    Returns:
+        folium.Map with clustered markers and zoom-dependent route layers
+    """
+    m = folium.Map(location=layers["center"], zoom_start=zoom_start)
+
+    switch_layers = []
+    for band in layers["routes"]:
+        route_layer = folium.GeoJson(
+            band["geojson"],
+            name=f"Routes (zoom {band['min_zoom']}-{band['max_zoom']})",
+            style_function=lambda feature: {
+                "color": feature["properties"]["color"],
+                "weight": feature["properties"]["weight"]
+            },
+            tooltip=(folium.GeoJsonTooltip(fields=["label", "mode", "flow"])
+                     if band["geojson"]["features"] else None),
+            control=False
+        ).add_to(m)
+        switch_layers.append((route_layer, band["min_zoom"], band["max_zoom"]))
+
+    if layers["facilities"]:
+        FastMarkerCluster(layers["facilities"], callback=_MARKER_CALLBACK,
+                          name="Facilities").add_to(m)
+    if layers["demand_points"]:
+        FastMarkerCluster(layers["demand_points"], callback=_MARKER_CALLBACK,
+                          name="Demand points").add_to(m)
+
+    ZoomLayerSwitch(switch_layers).add_to(m)
+    folium.LayerControl().add_to(m)
+    return m
+
+
+def heatmap_layer(heatmap: Dict[str, Any], metric: str = "capacity_loss_percent",
+                  opacity: float = 0.6, name: Optional[str] = None) -> folium.raster_layers.ImageOverlay:
+    """
+    Create an image overlay from a raster such as
+    ResilienceCalculator.vulnerability_heatmap.
+
+    Cells are shaded from transparent (no damage) to opaque red (worst
+    cell). For resilience_score, lower scores are shaded darker.
+
+    Args:
+        heatmap: Dictionary with a (lat x lon) raster under ``metric`` and its
+            [[south, west], [north, east]] bounds; row 0 is the southernmost row
+        metric: Raster to render
+        opacity: Opacity of the most damaged cell
+        name: Layer name (defaults to the metric)
+
+    Returns:
+        folium ImageOverlay to add to a map
+    """
+    values = np.asarray(heatmap[metric], dtype=float)
+    damage = 1 - values if metric == "resilience_score" else values
+    damage = np.nan_to_num(damage - np.nanmin(damage)) if damage.size else damage
+    scale = damage.max() if damage.size and damage.max() > 0 else 1.0
+    level = damage / scale
+
+    # Yellow to red, fading in with the damage level
+    image = np.zeros(values.shape + (4,))
+    image[..., 0] = 1.0
+    image[..., 1] = 1.0 - level
+    image[..., 3] = level * opacity
+    return folium.raster_layers.ImageOverlay(image, bounds=heatmap["bounds"], origin="lower",
+                                             name=name or metric, pixelated=True)
@@ -0,0 +1,322 @@
+"""
+Network Snapshot Module
+
+This module implements a versioned binary snapshot format for supply chain
+networks. A snapshot is a single file holding a small JSON header followed by
+raw, 64-byte aligned NumPy columns (facility, demand point, route and
+inventory attributes). Opening a snapshot only parses the header and memory
+maps the file, so columns are loaded lazily by the OS and several worker
+processes reading the same file share one copy in the page cache.
+
+File layout:
+    8 bytes   magic b"SCNSNAP\\0"
+    4 bytes   format version (little-endian uint32)
+    4 bytes   header length (little-endian uint32)
+    header    UTF-8 JSON: counts, column dtypes/shapes/offsets, categories, extras
+    data      column blobs, each starting on a 64-byte boundary
+"""
+
+import json
+import struct
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Union
+
+from .compact_graph import CompactGraph
+
+MAGIC = b"SCNSNAP\0"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+# Known numeric columns per table; any other record keys are kept in the header
+FACILITY_FIELDS = ("capacity", "fixed_cost", "echelon")
+DEMAND_POINT_FIELDS = ("demand_mean", "demand_std")
+ROUTE_FIELDS = ("distance", "transit_time", "cost")
+INVENTORY_FIELDS = ("lead_time", "review_period", "demand_mean", "demand_std",
+                    "holding_cost", "stockout_cost")
+
+
+def write_snapshot(optimizer, filename: Union[str, Path]) -> None:
+    """
+    Write a network optimizer to a binary snapshot file.
+
+    Args:
+        optimizer: SupplyChainNetworkOptimizer instance
+        filename: Output snapshot filename
+    """
+    columns: Dict[str, np.ndarray] = {}
+    extras: Dict[str, Dict[str, Dict]] = {}
+
+    node_ids = list(optimizer.network_graph.nodes)
+    node_index = {node_id: i for i, node_id in enumerate(node_ids)}
+    columns["node_id"] = _encode_strings(node_ids, "node_id")
+
+    # Facilities
+    facility_ids = list(optimizer.facilities)
+    facilities = [optimizer.facilities[f] for f in facility_ids]
+    columns["facility.id"] = _encode_strings(facility_ids, "facility_id")
+    columns["facility.latitude"] = np.array([f["location"][0] for f in facilities], dtype=float)
+    columns["facility.longitude"] = np.array([f["location"][1] for f in facilities], dtype=float)
+    for field in FACILITY_FIELDS:
+        dtype = np.int64 if field == "echelon" else float
+        columns[f"facility.{field}"] = np.array([f.get(field, 1 if field == "echelon" else 0)
+                                                 for f in facilities], dtype=dtype)
+    extras["facilities"] = _collect_extras(facility_ids, facilities, ("location",) + FACILITY_FIELDS)
+
+    # Demand points
+    demand_ids = list(optimizer.demand_points)
+    demands = [optimizer.demand_points[d] for d in demand_ids]
+    columns["demand.id"] = _encode_strings(demand_ids, "demand_id")
+    columns["demand.latitude"] = np.array([d["location"][0] for d in demands], dtype=float)
+    columns["demand.longitude"] = np.array([d["location"][1] for d in demands], dtype=float)
+    for field in DEMAND_POINT_FIELDS:
+        columns[f"demand.{field}"] = np.array([d.get(field, 0) for d in demands], dtype=float)
+    extras["demand_points"] = _collect_extras(demand_ids, demands, ("location",) + DEMAND_POINT_FIELDS)
+
+    # Routes (endpoints as indices into node_id, mode as categorical codes)
+    route_ids = list(optimizer.routes)
+    routes = [optimizer.routes[r] for r in route_ids]
+    modes = sorted({r.get("mode", "road") for r in routes})
+    mode_codes = {mode: i for i, mode in enumerate(modes)}
+    columns["route.id"] = _encode_strings(route_ids, "route_id")
+    columns["route.origin"] = np.array([node_index[r["origin"]] for r in routes], dtype=np.int64)
+    columns["route.destination"] = np.array([node_index[r["destination"]] for r in routes],
+                                            dtype=np.int64)
+    columns["route.mode"] = np.array([mode_codes[r.get("mode", "road")] for r in routes],
+                                     dtype=np.int16)
+    for field in ROUTE_FIELDS:
+        columns[f"route.{field}"] = np.array([r.get(field, 0) for r in routes], dtype=float)
+    extras["routes"] = _collect_extras(route_ids, routes,
+                                       ("origin", "destination", "mode") + ROUTE_FIELDS)
+
+    # Inventory parameters
+    inventory_ids = list(optimizer.inventory_params)
+    params = [optimizer.inventory_params[f] for f in inventory_ids]
+    columns["inventory.facility_id"] = _encode_strings(inventory_ids, "facility_id")
+    for field in INVENTORY_FIELDS:
+        columns[f"inventory.{field}"] = np.array([p.get(field, 0) for p in params], dtype=float)
+    extras["inventory_params"] = _collect_extras(inventory_ids, params, INVENTORY_FIELDS)
+
+    header = {
+        "format_version": FORMAT_VERSION,
+        "created_at": time.time(),
+        "counts": {
+            "nodes": len(node_ids),
+            "facilities": len(facility_ids),
+            "demand_points": len(demand_ids),
+            "routes": len(route_ids),
+            "inventory_params": len(inventory_ids)
+        },
+        "categories": {"route.mode": modes},
+        "extras": extras,
+        "columns": {}
+    }
+
+    # Lay out columns after the header; offsets are relative to the data section
+    offset = 0
+    for name, array in columns.items():
+        offset = _align(offset)
+        header["columns"][name] = {"dtype": array.dtype.str, "shape": list(array.shape),
+                                   "offset": offset}
+        offset += array.nbytes
+
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_start = _align(len(MAGIC) + 8 + len(header_bytes))
+
+    with open(filename, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<II", FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in columns.items():
+            f.seek(data_start + header["columns"][name]["offset"])
+            f.write(np.ascontiguousarray(array).tobytes())
+        # Make sure the file covers the final (possibly empty) column
+        f.truncate(data_start + offset)
+
+
+class NetworkSnapshot:
+    """
+    Lazily loaded, memory-mapped view of a network snapshot file.
+    """
+
+    def __init__(self, filename: Union[str, Path]):
+        """
+        Open a snapshot file. Only the header is parsed; columns are memory mapped.
+
+        Args:
+            filename: Snapshot filename
+        """
+        self.filename = str(filename)
+
+        with open(self.filename, "rb") as f:
+            magic = f.read(len(MAGIC))
+            if magic != MAGIC:
+                raise ValueError(f"{self.filename} is not a network snapshot file")
+            version, header_length = struct.unpack("<II", f.read(8))
+            if version > FORMAT_VERSION:
+                raise ValueError(f"Snapshot format version {version} is newer than the "
+                                 f"supported version {FORMAT_VERSION}")
+            self.header = json.loads(f.read(header_length).decode("utf-8"))
+
+        self.format_version = version
+        self._data_start = _align(len(MAGIC) + 8 + header_length)
+        self._mmap = None
+        self._strings: Dict[str, List[str]] = {}
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        """Number of nodes, facilities, demand points, routes and inventory records."""
+        return self.header["counts"]
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Get a numeric column as a read-only memory-mapped array.
+
+        Args:
+            name: Column name (e.g. "route.distance", "facility.capacity")
+
+        Returns:
+            Array view into the snapshot file
+        """
+        if name not in self.header["columns"]:
+            raise KeyError(f"Unknown snapshot column: {name}")
+        if self._mmap is None:
+            self._mmap = np.memmap(self.filename, dtype=np.uint8, mode="r")
+
+        spec = self.header["columns"][name]
+        dtype = np.dtype(spec["dtype"])
+        start = self._data_start + spec["offset"]
+        count = int(np.prod(spec["shape"]))
+        return self._mmap[start:start + count * dtype.itemsize].view(dtype).reshape(spec["shape"])
+
+    def strings(self, name: str) -> List[str]:
+        """
+        Get a string column (IDs) decoded to a list, cached after first access.
+
+        Args:
+            name: Column name (e.g. "facility.id", "node_id")
+
+        Returns:
+            List of strings
+        """
+        if name not in self._strings:
+            raw = self.column(name).tobytes().decode("utf-8")
+            self._strings[name] = raw.split("\0") if raw else []
+        return self._strings[name]
+
+    def to_tables(self) -> Dict[str, pd.DataFrame]:
+        """
+        Build DataFrames in the bulk loader format (see network_loader).
+
+        Returns:
+            Dictionary with 'facilities', 'demand_points' and 'routes' tables
+        """
+        node_ids = np.array(self.strings("node_id"), dtype=object)
+        modes = np.array(self.header["categories"]["route.mode"], dtype=object)
+
+        facilities = pd.DataFrame({
+            "facility_id": self.strings("facility.id"),
+            "latitude": self.column("facility.latitude"),
+            "longitude": self.column("facility.longitude"),
+            **{field: self.column(f"facility.{field}") for field in FACILITY_FIELDS}
+        })
+        demand_points = pd.DataFrame({
+            "demand_id": self.strings("demand.id"),
+            "latitude": self.column("demand.latitude"),
+            "longitude": self.column("demand.longitude"),
+            **{field: self.column(f"demand.{field}") for field in DEMAND_POINT_FIELDS}
+        })
+        routes = pd.DataFrame({
+            "route_id": self.strings("route.id"),
+            "origin": node_ids[self.column("route.origin")],
+            "destination": node_ids[self.column("route.destination")],
+            "mode": modes[self.column("route.mode")],
+            **{field: self.column(f"route.{field}") for field in ROUTE_FIELDS}
+        })
+
+        return {"facilities": facilities, "demand_points": demand_points, "routes": routes}
+
+    def to_compact_graph(self) -> CompactGraph:
+        """
+        Build a compact graph directly from the snapshot columns, without
+        constructing per-record dictionaries or a NetworkX graph.
+
+        Returns:
+            CompactGraph with node order matching the snapshot's node_id column
+        """
+        node_ids = self.strings("node_id")
+
+        compact = CompactGraph(initial_capacity=max(len(node_ids), self.counts["routes"], 1))
+        compact.add_nodes(node_ids)
+        compact.add_nodes(
+            self.strings("facility.id"), node_type="facility",
+            lat=self.column("facility.latitude"), lon=self.column("facility.longitude"),
+            capacity=self.column("facility.capacity"), fixed_cost=self.column("facility.fixed_cost")
+        )
+        compact.add_nodes(
+            self.strings("demand.id"), node_type="demand",
+            lat=self.column("demand.latitude"), lon=self.column("demand.longitude"),
+            demand_mean=self.column("demand.demand_mean")
+        )
+        compact.add_edges(
+            [node_ids[i] for i in self.column("route.origin")],
+            [node_ids[i] for i in self.column("route.destination")],
+            route_ids=self.strings("route.id"),
+            distance=self.column("route.distance"),
+            transit_time=self.column("route.transit_time"),
+            cost=self.column("route.cost")
+        )
+        return compact
+
+    def inventory_params(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get inventory parameters keyed by facility ID.
+
+        Returns:
+            Dictionary in the SupplyChainNetworkOptimizer.inventory_params format
+        """
+        columns = {field: self.column(f"inventory.{field}").tolist() for field in INVENTORY_FIELDS}
+        extras = self.header["extras"]["inventory_params"]
+        return {
+            f_id: {**{field: columns[field][i] for field in INVENTORY_FIELDS}, **extras.get(f_id, {})}
+            for i, f_id in enumerate(self.strings("inventory.facility_id"))
+        }
+
+    def extras(self, table: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Get record attributes that are not stored as columns.
+
+        Args:
+            table: 'facilities', 'demand_points', 'routes' or 'inventory_params'
+
+        Returns:
+            Dictionary of record ID -> extra attributes
+        """
+        return self.header["extras"].get(table, {})
+
+
+def _encode_strings(values: List[str], name: str) -> np.ndarray:
+    """Encode string IDs as a NUL-separated UTF-8 byte column."""
+    for value in values:
+        if not isinstance(value, str) or "\0" in value:
+            raise ValueError(f"Snapshot {name} values must be strings without NUL characters, "
+                             f"got {value!r}")
+    return np.frombuffer("\0".join(values).encode("utf-8"), dtype=np.uint8)
+
+
+def _collect_extras(ids: List[str], records: List[Dict], stored: tuple) -> Dict[str, Dict]:
+    """Collect JSON-compatible record attributes that have no column."""
+    extras = {}
+    for record_id, record in zip(ids, records):
+        extra = {k: list(v) if isinstance(v, tuple) else v
+                 for k, v in record.items() if k not in stored}
+        if extra:
+            extras[record_id] = extra
+    return extras
+
+
+def _align(offset: int) -> int:
+    """Round an offset up to the column alignment."""
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
@@ -0,0 +1,331 @@
+"""
+Network Versioning Module
+
+This module lets scenario planners branch what-if variants of a supply chain
+network without cloning it. All versions share one frozen base graph; each
+version only stores the nodes and edges it changed (full attribute state, or
+None when removed) on top of its parent. Lookups resolve through the chain of
+parents, diffs compare only touched elements, and a full NetworkX graph is
+materialized only when a caller asks for one.
+"""
+
+import itertools
+import networkx as nx
+from typing import Dict, List, Tuple, Any, Optional, Hashable
+
+_version_counter = itertools.count(1)
+
+Edge = Tuple[Hashable, Hashable]
+
+
+class NetworkVersion:
+    """
+    A version of a supply chain network expressed as changes layered on a
+    shared, immutable base graph.
+
+    A version can be edited until it is branched; branching freezes it so
+    its descendants stay consistent.
+    """
+
+    def __init__(self, base_graph: nx.DiGraph, parent: Optional['NetworkVersion'] = None,
+                 label: Optional[str] = None):
+        """
+        Initialize a network version.
+
+        Args:
+            base_graph: Frozen base graph shared by all versions in the tree
+            parent: Version this one branches from (None for the root)
+            label: Human-readable name of the version
+        """
+        self.base_graph = base_graph
+        self.parent = parent
+        self.version_id = f"v{next(_version_counter)}"
+        self.label = label or self.version_id
+        self.frozen = False
+
+        # Changes made in this version: full attribute dict, or None when removed
+        self.node_changes: Dict[Hashable, Optional[Dict[str, Any]]] = {}
+        self.edge_changes: Dict[Edge, Optional[Dict[str, Any]]] = {}
+
+        self._materialized = None
+        self._effective = None
+
+    @classmethod
+    def from_graph(cls, graph: nx.DiGraph, label: str = "base") -> 'NetworkVersion':
+        """
+        Create a root version from a snapshot of a graph.
+
+        Args:
+            graph: Network graph to use as the shared base (it is copied once)
+            label: Name of the root version
+
+        Returns:
+            Root NetworkVersion
+        """
+        return cls(nx.freeze(graph.copy()), label=label)
+
+    # ----- Branching -----
+
+    def branch(self, label: Optional[str] = None) -> 'NetworkVersion':
+        """
+        Create an editable child version. This version becomes read-only.
+
+        Args:
+            label: Name of the new version
+
+        Returns:
+            New NetworkVersion with no changes of its own
+        """
+        self.frozen = True
+        return NetworkVersion(self.base_graph, parent=self, label=label)
+
+    def lineage(self) -> List['NetworkVersion']:
+        """Versions from the root down to this one."""
+        chain = []
+        version = self
+        while version is not None:
+            chain.append(version)
+            version = version.parent
+        return chain[::-1]
+
+    # ----- Edits -----
+
+    def add_node(self, node_id: Hashable, **attributes) -> None:
+        """Add a node, or update the attributes of an existing node."""
+        self._check_editable()
+        current = self.node_attributes(node_id)
+        self.node_changes[node_id] = {**(current or {}), **attributes}
+        self._changed()
+
+    def set_node_attributes(self, node_id: Hashable, **attributes) -> None:
+        """Update the attributes of an existing node."""
+        if self.node_attributes(node_id) is None:
+            raise ValueError(f"Node {node_id} not found in version {self.label}")
+        self.add_node(node_id, **attributes)
+
+    def remove_node(self, node_id: Hashable) -> None:
+        """Remove a node and all its edges."""
+        self._check_editable()
+        if self.node_attributes(node_id) is None:
+            raise ValueError(f"Node {node_id} not found in version {self.label}")
+        for edge in self._incident_edges(node_id):
+            self.edge_changes[edge] = None
+        self.node_changes[node_id] = None
+        self._changed()
+
+    def add_edge(self, origin: Hashable, destination: Hashable, **attributes) -> None:
+        """Add an edge (creating missing endpoints), or update an existing edge."""
+        self._check_editable()
+        for node_id in (origin, destination):
+            if self.node_attributes(node_id) is None:
+                self.node_changes[node_id] = {}
+        current = self.edge_attributes(origin, destination)
+        self.edge_changes[(origin, destination)] = {**(current or {}), **attributes}
+        self._changed()
+
+    def set_edge_attributes(self, origin: Hashable, destination: Hashable, **attributes) -> None:
+        """Update the attributes of an existing edge."""
+        if self.edge_attributes(origin, destination) is None:
+            raise ValueError(f"Edge {origin} -> {destination} not found in version {self.label}")
+        self.add_edge(origin, destination, **attributes)
+
+    def remove_edge(self, origin: Hashable, destination: Hashable) -> None:
+        """Remove an edge."""
+        self._check_editable()
+        if self.edge_attributes(origin, destination) is None:
+            raise ValueError(f"Edge {origin} -> {destination} not found in version {self.label}")
+        self.edge_changes[(origin, destination)] = None
+        self._changed()
+
+    def _check_editable(self) -> None:
+        """Raise if the version has been branched from."""
+        if self.frozen:
+            raise ValueError(f"Version {self.label} is frozen; branch it to make changes")
+
+    def _changed(self) -> None:
+        """Drop cached results after an edit."""
+        self._materialized = None
+        self._effective = None
+
+    # ----- Lookups -----
+
+    def node_attributes(self, node_id: Hashable) -> Optional[Dict[str, Any]]:
+        """
+        Get the attributes of a node in this version.
+
+        Returns:
+            Attribute dictionary, or None if the node does not exist
+        """
+        version = self
+        while version is not None:
+            if node_id in version.node_changes:
+                return version.node_changes[node_id]
+            version = version.parent
+        if node_id in self.base_graph:
+            return self.base_graph.nodes[node_id]
+        return None
+
+    def edge_attributes(self, origin: Hashable, destination: Hashable) -> Optional[Dict[str, Any]]:
+        """
+        Get the attributes of an edge in this version.
+
+        Returns:
+            Attribute dictionary, or None if the edge does not exist
+        """
+        edge = (origin, destination)
+        version = self
+        while version is not None:
+            if edge in version.edge_changes:
+                return version.edge_changes[edge]
+            version = version.parent
+        if self.base_graph.has_edge(origin, destination):
+            return self.base_graph.edges[origin, destination]
+        return None
+
+    def has_node(self, node_id: Hashable) -> bool:
+        """Whether the node exists in this version."""
+        return self.node_attributes(node_id) is not None
+
+    def has_edge(self, origin: Hashable, destination: Hashable) -> bool:
+        """Whether the edge exists in this version."""
+        return self.edge_attributes(origin, destination) is not None
+
+    def _incident_edges(self, node_id: Hashable) -> List[Edge]:
+        """Existing edges touching a node in this version."""
+        _, edge_changes = self.effective_changes()
+        candidates = set(edge for edge, attrs in edge_changes.items()
+                         if attrs is not None and node_id in edge)
+        if node_id in self.base_graph:
+            candidates.update(self.base_graph.in_edges(node_id))
+            candidates.update(self.base_graph.out_edges(node_id))
+        return [edge for edge in candidates if self.has_edge(*edge)]
+
+    def effective_changes(self) -> Tuple[Dict[Hashable, Optional[Dict]], Dict[Edge, Optional[Dict]]]:
+        """
+        Get all changes relative to the base graph, merged along the lineage.
+
+        Returns:
+            (node changes, edge changes) where values are full attribute
+            dictionaries, or None for removed elements
+        """
+        if self._effective is None:
+            if self.parent is None:
+                node_changes, edge_changes = dict(self.node_changes), dict(self.edge_changes)
+            else:
+                parent_nodes, parent_edges = self.parent.effective_changes()
+                node_changes = {**parent_nodes, **self.node_changes}
+                edge_changes = {**parent_edges, **self.edge_changes}
+            self._effective = (node_changes, edge_changes)
+        return self._effective
+
+    # ----- Diffing and materialization -----
+
+    def diff(self, other: 'NetworkVersion') -> Dict[str, Any]:
+        """
+        Compare this version with another version of the same network.
+
+        Only elements changed in either version (relative to the shared base)
+        are inspected, so the cost scales with the size of the changes.
+
+        Args:
+            other: Version to compare against (the "new" side)
+
+        Returns:
+            Dictionary with nodes/edges added, removed and modified; modified
+            entries map attribute -> (value in this version, value in other)
+        """
+        if other.base_graph is not self.base_graph:
+            raise ValueError("Versions do not share the same base network")
+
+        self_nodes, self_edges = self.effective_changes()
+        other_nodes, other_edges = other.effective_changes()
+
+        diff = {
+            "from_version": self.version_id,
+            "to_version": other.version_id,
+            "nodes": self._diff_elements(set(self_nodes) | set(other_nodes),
+                                         self.node_attributes, other.node_attributes),
+            "edges": self._diff_elements(set(self_edges) | set(other_edges),
+                                         lambda e: self.edge_attributes(*e),
+                                         lambda e: other.edge_attributes(*e))
+        }
+        return diff
+
+    @staticmethod
+    def _diff_elements(keys, old_lookup, new_lookup) -> Dict[str, Any]:
+        """Classify touched elements as added, removed or modified."""
+        added, removed, modified = {}, [], {}
+        for key in keys:
+            old, new = old_lookup(key), new_lookup(key)
+            if old is None and new is not None:
+                added[key] = dict(new)
+            elif old is not None and new is None:
+                removed.append(key)
+            elif old is not None and new is not None and old != new:
+                modified[key] = {
+                    attr: (old.get(attr), new.get(attr))
+                    for attr in set(old) | set(new)
+                    if old.get(attr) != new.get(attr)
+                }
+        return {"added": added, "removed": removed, "modified": modified}
+
+    def materialize(self) -> nx.DiGraph:
+        """
+        Build the full NetworkX graph for this version.
+        The result is cached until the version is edited; do not modify it.
+
+        Returns:
+            DiGraph with all changes applied to a copy of the base graph
+        """
+        if self._materialized is None:
+            graph = nx.DiGraph(self.base_graph)
+            node_changes, edge_changes = self.effective_changes()
+
+            for node_id, attrs in node_changes.items():
+                if attrs is None:
+                    if node_id in graph:
+                        graph.remove_node(node_id)
+                else:
+                    graph.add_node(node_id)
+                    graph.nodes[node_id].clear()
+                    graph.nodes[node_id].update(attrs)
+
+            for (u, v), attrs in edge_changes.items():
+                if attrs is None:
+                    if graph.has_edge(u, v):
+                        graph.remove_edge(u, v)
+                else:
+                    graph.add_edge(u, v)
+                    graph.edges[u, v].clear()
+                    graph.edges[u, v].update(attrs)
+
+            self._materialized = graph
+        return self._materialized
+
+    def to_optimizer(self):
+        """
+        Build a SupplyChainNetworkOptimizer for this version.
+
+        Returns:
+            SupplyChainNetworkOptimizer with the version's facilities,
+            demand points and routes
+        """
+        from .network_optimizer import SupplyChainNetworkOptimizer
+
+        graph = self.materialize()
+        optimizer = SupplyChainNetworkOptimizer()
+
+        for node_id, data in graph.nodes(data=True):
+            if data.get("type") == "facility":
+                optimizer.add_facility(node_id, data["location"], data.get("capacity", 0),
+                                       data.get("fixed_cost", 0), data.get("echelon", 1))
+            elif data.get("type") == "demand":
+                optimizer.add_demand_point(node_id, data["location"], data.get("demand_mean", 0),
+                                           data.get("demand_std"))
+
+        for u, v, data in graph.edges(data=True):
+            optimizer.add_route(data.get("route_id", f"{u}->{v}"), u, v,
+                                data.get("distance", 0), data.get("transit_time", 0),
+                                data.get("mode", "road"), data.get("cost"))
+
+        return optimizer
@@ -0,0 +1,154 @@
+"""
+Online Statistics Module
+
+This module provides constant-memory aggregates for long simulation runs:
+running mean/variance (Welford's algorithm, merged batch-wise with Chan's
+formula) and a merging t-digest for quantile estimates. Both accept NumPy
+batches, so results can be folded in one shard at a time.
+"""
+
+import numpy as np
+from typing import Dict, List, Optional
+
+
+class RunningStats:
+    """
+    Running count, mean, variance, minimum and maximum of a stream of values.
+    """
+
+    def __init__(self):
+        """Initialize empty statistics."""
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+
+    def update(self, values: np.ndarray) -> None:
+        """
+        Add a batch of values.
+
+        Args:
+            values: Values to add
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        n = len(values)
+        if n == 0:
+            return
+
+        batch_mean = float(values.mean())
+        batch_m2 = float(((values - batch_mean) ** 2).sum())
+
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += batch_m2 + delta ** 2 * self.count * n / total
+        self.count = total
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (0 for fewer than two values)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        """Summary of the statistics."""
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "variance": self.variance,
+            "std": float(np.sqrt(self.variance)),
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None
+        }
+
+
+class TDigest:
+    """
+    Merging t-digest for approximate quantiles of a stream of values.
+
+    Values are buffered and periodically merged into at most about
+    ``compression`` weighted centroids. Centroids near the tails are kept
+    small, so extreme quantiles stay accurate.
+    """
+
+    def __init__(self, compression: float = 200):
+        """
+        Initialize an empty digest.
+
+        Args:
+            compression: Accuracy parameter; memory grows linearly with it
+        """
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.count = 0
+        self.min = float('inf')
+        self.max = float('-inf')
+        self._buffer: List[np.ndarray] = []
+        self._buffered = 0
+
+    def update(self, values: np.ndarray) -> None:
+        """
+        Add a batch of values.
+
+        Args:
+            values: Values to add
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        if len(values) == 0:
+            return
+        self._buffer.append(values)
+        self._buffered += len(values)
+        self.count += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        if self._buffered > 10 * self.compression:
+            self._compress()
+
+    def _compress(self) -> None:
+        """Merge buffered values into the centroids."""
+        if not self._buffer:
+            return
+        buffered = np.concatenate(self._buffer)
+        means = np.concatenate([self.means, buffered])
+        weights = np.concatenate([self.weights, np.ones(len(buffered))])
+        self._buffer = []
+        self._buffered = 0
+
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+
+        # Scale function k1: centroids may span at most one unit of k
+        cumulative = np.cumsum(weights)
+        q_left = (cumulative - weights) / cumulative[-1]
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q_left - 1)
+        group = np.floor(k - k[0]).astype(np.int64)
+        _, group = np.unique(group, return_inverse=True)
+
+        merged_weights = np.bincount(group, weights=weights)
+        self.means = np.bincount(group, weights=means * weights) / merged_weights
+        self.weights = merged_weights
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile.
+
+        Args:
+            q: Quantile in [0, 1]
+
+        Returns:
+            Estimated value, or None if no values were added
+        """
+        if not 0 <= q <= 1:
+            raise ValueError(f"Quantile must be in [0, 1], got {q}")
+        self._compress()
+        if self.count == 0:
+            return None
+
+        # Centroid means sit at the middle of their cumulative weight
+        centers = (np.cumsum(self.weights) - self.weights / 2) / self.count
+        positions = np.concatenate([[0.0], centers, [1.0]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return float(np.interp(q, positions, values))
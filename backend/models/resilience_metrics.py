@@ -10,44 +10,115 @@ import networkx as nx
 from typing import Dict, List, Tuple, Any, Optional
 import time
 
+from .disruption import DisruptionSimulator
+from .critical_paths import CriticalPathEngine, average_shortest_path_length
+from .contingency import ContingencyAnalyzer
+from .recovery import RecoverySimulator, DEFAULT_HORIZON
+
+# Default sweep area for vulnerability heatmaps: (south, west, north, east) bounds of Kenya
+KENYA_BOUNDS = (-4.7, 33.9, 5.0, 41.9)
+
+# ScenarioCache scenario type under which baseline metrics are stored
+BASELINE_SCENARIO_TYPE = "baseline_metrics"
+
 class ResilienceCalculator:
     """
     Calculates various resilience metrics for supply chain networks.
     """
     
-    def __init__(self, network_optimizer):
+    # Weights of the factors in the resilience score
+    RESILIENCE_WEIGHTS = {
+        "capacity_loss_percent": 0.4,
+        "avg_shortest_path_change": 0.3,
+        "avg_degree_change": 0.2,
+        "estimated_ttr_days": 0.1
+    }
+    
+    # Recovery time in days by capacity loss: (loss below, days); the last band has no limit
+    RECOVERY_BANDS = ((0.1, 7), (0.3, 30), (0.5, 90), (None, 180))
+    
+    # Number of network fingerprints whose baseline metrics are kept in memory
+    BASELINE_CACHE_SIZE = 8
+    
+    def __init__(self, network_optimizer, scenario_cache=None):
         """
         Initialize the resilience calculator.
         
         Args:
             network_optimizer: SupplyChainNetworkOptimizer instance
+            scenario_cache: Optional ScenarioCache that baseline metrics are
+                shared through, keyed by network fingerprint
         """
         self.optimizer = network_optimizer
+        self.scenario_cache = scenario_cache
         self.baseline_metrics = {}
         self.baseline_calculated = False
         
-    def calculate_baseline_metrics(self):
+        # Baseline metrics per network fingerprint (oldest first), and the
+        # (compact graph, version, fingerprint) of the current baseline
+        self._baselines = {}
+        self._baseline_state = None
+        
+        # Cached (compact graph, version, {sweep settings: heatmap}) for vulnerability_heatmap
+        self._heatmap_cache = None
+        
+    def calculate_baseline_metrics(self, force: bool = False) -> Dict:
         """
         Calculate baseline metrics for the undisrupted network.
         These will be used as reference for comparing disrupted states.
+        
+        Results are cached per network fingerprint, in memory and in the
+        scenario cache, so they are only recomputed when the network changed.
+        Unchanged network versions skip even the fingerprint.
+        
+        Args:
+            force: Recompute the metrics even if they are cached
+            
+        Returns:
+            Dictionary of baseline metrics
         """
-        # Get the network graph
-        network = self.optimizer.network_graph
+        compact = self.optimizer.compact_graph
+        state = self._baseline_state
+        if not force and state is not None and state[0] is compact and state[1] == compact.version:
+            return self.baseline_metrics
+        
+        fingerprint = self.optimizer.network_fingerprint()
+        cache_params = {"fingerprint": fingerprint}
+        metrics = None if force else self._baselines.get(fingerprint)
+        if metrics is None and not force and self.scenario_cache is not None:
+            metrics = self.scenario_cache.get_cached_scenario(BASELINE_SCENARIO_TYPE, cache_params)
+        if metrics is None:
+            metrics = self._compute_baseline_metrics()
+            if self.scenario_cache is not None:
+                self.scenario_cache.cache_scenario(BASELINE_SCENARIO_TYPE, cache_params, metrics)
+        
+        # Most recently used fingerprints are kept
+        self._baselines.pop(fingerprint, None)
+        self._baselines[fingerprint] = metrics
+        while len(self._baselines) > self.BASELINE_CACHE_SIZE:
+            del self._baselines[next(iter(self._baselines))]
+        
+        # Store baseline metrics
+        self.baseline_metrics = metrics
+        self.baseline_calculated = True
+        self._baseline_state = (compact, compact.version, fingerprint)
+        
+        return metrics
+        
+    def _compute_baseline_metrics(self) -> Dict:
+        """Compute the baseline metrics of the current network."""
+        # Get the array-backed view of the network
+        compact = self.optimizer.compact_graph
         
         # Calculate key network metrics
         metrics = {}
         
-        # Connectivity metrics
-        metrics["avg_degree"] = np.mean([d for n, d in network.degree()])
-        
-        try:
-            metrics["avg_shortest_path"] = nx.average_shortest_path_length(network)
-        except nx.NetworkXError:
-            # Graph may not be connected
-            metrics["avg_shortest_path"] = float('inf')
+        # Connectivity metrics (infinite path length if the graph is not strongly connected)
+        metrics["avg_degree"] = np.mean(compact.degree())
+        metrics["avg_shortest_path"] = average_shortest_path_length(compact)
             
         # Calculate total capacity
-        total_capacity = sum(data.get('capacity', 0) for _, data in network.nodes(data=True))
+        total_capacity = float(np.nansum(compact.node_column("capacity")))
         metrics["total_capacity"] = total_capacity
         
         # Calculate total throughput (assuming all demand is met)
@@ -65,10 +136,6 @@ class ResilienceCalculator:
                     
             metrics["total_safety_stock"] = total_safety_stock
             
-        # Store baseline metrics
-        self.baseline_metrics = metrics
-        self.baseline_calculated = True
-        
         return metrics
         
     def calculate_disruption_impact(self, disrupted_network: nx.DiGraph) -> Dict:
@@ -77,31 +144,57 @@ class ResilienceCalculator:
         to the baseline.
         
         Args:
-            disrupted_network: Disrupted network graph
+            disrupted_network: Disrupted network graph, or a DisruptionOverlay
+                from DisruptionSimulator.apply_disruption_to_network
             
         Returns:
             Dictionary of impact metrics
         """
-        # Ensure baseline is calculated
-        if not self.baseline_calculated:
-            self.calculate_baseline_metrics()
+        # Ensure the baseline matches the current network
+        self.calculate_baseline_metrics()
             
         # Calculate metrics for disrupted network
         metrics = {}
         
-        # Connectivity metrics
-        metrics["avg_degree"] = np.mean([d for n, d in disrupted_network.degree()])
-        
-        try:
-            metrics["avg_shortest_path"] = nx.average_shortest_path_length(disrupted_network)
-        except nx.NetworkXError:
-            # Graph may not be connected
-            metrics["avg_shortest_path"] = float('inf')
+        if isinstance(disrupted_network, nx.DiGraph):
+            topology = disrupted_network
+            total_capacity = sum(data.get('capacity', 0) for _, data in disrupted_network.nodes(data=True))
+        else:
+            # Overlays change attributes only, so the topology is the base graph's
+            topology = disrupted_network.base_graph
+            total_capacity = disrupted_network.total_node_capacity()
+        
+        if topology is self.optimizer.network_graph:
+            # Same topology as the baseline, so its connectivity metrics still hold
+            metrics["avg_degree"] = self.baseline_metrics["avg_degree"]
+            metrics["avg_shortest_path"] = self.baseline_metrics["avg_shortest_path"]
+        else:
+            # Connectivity metrics
+            metrics["avg_degree"] = np.mean([d for n, d in topology.degree()])
+            
+            try:
+                metrics["avg_shortest_path"] = nx.average_shortest_path_length(topology)
+            except nx.NetworkXError:
+                # Graph may not be connected
+                metrics["avg_shortest_path"] = float('inf')
             
         # Calculate total capacity
-        total_capacity = sum(data.get('capacity', 0) for _, data in disrupted_network.nodes(data=True))
         metrics["total_capacity"] = total_capacity
         
+        return self._compare_to_baseline(metrics, disrupted_network)
+    
+    def _compare_to_baseline(self, metrics: Dict, disrupted_network: Any) -> Dict:
+        """
+        Turn metrics of a disrupted network into impact metrics.
+        
+        Args:
+            metrics: avg_degree, avg_shortest_path and total_capacity of the
+                disrupted network
+            disrupted_network: Disrupted network graph or overlay
+            
+        Returns:
+            Dictionary of impact metrics, including the resilience score
+        """
         # Calculate impact percentages
         impact = {}
         
@@ -149,14 +242,36 @@ class ResilienceCalculator:
         """
         # Simple model: more severe disruptions take longer to recover from
         # This could be made more sophisticated with real-world recovery data
-        if capacity_loss_percent < 0.1:
-            return 7  # 1 week for minor disruptions
-        elif capacity_loss_percent < 0.3:
-            return 30  # 1 month for moderate disruptions
-        elif capacity_loss_percent < 0.5:
-            return 90  # 3 months for major disruptions
-        else:
-            return 180  # 6 months for severe disruptions
+        for limit, days in self.RECOVERY_BANDS:
+            if limit is None or capacity_loss_percent < limit:
+                return days
+    
+    def simulate_recovery(self, disrupted_network: Any, num_crews: int = 2,
+                          repair_days: Optional[Dict[str, float]] = None, priority: str = "shortest",
+                          capacitated: bool = False, horizon: float = DEFAULT_HORIZON) -> Dict:
+        """
+        Simulate restoration crews repairing a disrupted network.
+        
+        Unlike estimate_time_to_recovery, this follows the served demand as
+        damaged facilities and routes are repaired (see RecoverySimulator).
+        
+        Args:
+            disrupted_network: Disrupted network graph, or a DisruptionOverlay
+                from DisruptionSimulator.apply_disruption_to_network
+            num_crews: Number of restoration crews working in parallel
+            repair_days: Days to repair a destroyed "facility" or "route"
+            priority: Repair queue order ("shortest", "longest" or "given")
+            capacitated: Whether damaged elements keep their remaining capacity
+            horizon: Days over which resilience is averaged
+            
+        Returns:
+            Dictionary with the served demand curve, restoration order, time
+            to recovery and area-under-curve resilience
+        """
+        simulator = RecoverySimulator(self.optimizer.compact_graph, list(self.optimizer.facilities),
+                                      num_crews=num_crews, repair_days=repair_days, priority=priority,
+                                      capacitated=capacitated)
+        return simulator.simulate(simulator.damage_from_network(disrupted_network), horizon)
     
     def calculate_resilience_score(self, impact: Dict) -> float:
         """
@@ -168,13 +283,7 @@ class ResilienceCalculator:
         Returns:
             Resilience score (0-1, higher is better)
         """
-        # Weights for different factors
-        weights = {
-            "capacity_loss_percent": 0.4,
-            "avg_shortest_path_change": 0.3,
-            "avg_degree_change": 0.2,
-            "estimated_ttr_days": 0.1
-        }
+        weights = self.RESILIENCE_WEIGHTS
         
         # Normalize and combine factors
         score = 1.0
@@ -200,13 +309,109 @@ class ResilienceCalculator:
         # Ensure score is in 0-1 range
         return max(0.0, min(1.0, score))
     
-    def analyze_critical_paths(self, disruption_threshold: float = 0.3) -> List[Dict]:
+    def vulnerability_heatmap(self,
+                              bounds: Tuple[float, float, float, float] = KENYA_BOUNDS,
+                              resolution: float = 0.1,
+                              severity: float = 0.8,
+                              geographical_spread: float = 0.3,
+                              max_workers: int = 1) -> Dict:
+        """
+        Sweep a grid of disruption epicenters and map the damage of each.
+        
+        Every grid cell center is used as the epicenter of a disruption with
+        the given (deterministic) severity and spread. Disruptions applied by
+        DisruptionSimulator only change attributes, so the degree and path
+        terms of the resilience score stay at zero and the score follows
+        from the capacity loss alone; all cells are evaluated in one
+        vectorized sweep. Results are cached per network version.
+        
+        Args:
+            bounds: (south, west, north, east) bounds of the sweep in degrees
+            resolution: Grid cell size in degrees
+            severity: Severity of every swept disruption
+            geographical_spread: Geographical spread of every swept disruption
+            max_workers: Number of worker processes for the sweep
+            
+        Returns:
+            Dictionary with cell center lats and lons, (lat x lon) rasters of
+            capacity_loss, capacity_loss_percent and resilience_score (row 0
+            is the southernmost row), the bounds of the raster and the
+            worst epicenter
+        """
+        south, west, north, east = bounds
+        if resolution <= 0 or south >= north or west >= east:
+            raise ValueError(f"Invalid sweep grid: bounds {bounds}, resolution {resolution}")
+        
+        compact = self.optimizer.compact_graph
+        if (self._heatmap_cache is None or self._heatmap_cache[0] is not compact
+                or self._heatmap_cache[1] != compact.version):
+            self._heatmap_cache = (compact, compact.version, {})
+        settings = (tuple(bounds), resolution, severity, geographical_spread)
+        cached = self._heatmap_cache[2]
+        if settings in cached:
+            return cached[settings]
+        
+        lats = np.arange(south + resolution / 2, north, resolution)
+        lons = np.arange(west + resolution / 2, east, resolution)
+        grid_lat, grid_lon = np.meshgrid(lats, lons, indexing="ij")
+        epicenters = np.column_stack([grid_lat.ravel(), grid_lon.ravel()])
+        
+        simulator = DisruptionSimulator(self.optimizer.network_graph)
+        capacity_loss = simulator.sweep_capacity_loss(epicenters, severity, geographical_spread,
+                                                      max_workers=max_workers)
+        capacity_loss = capacity_loss.reshape(grid_lat.shape)
+        
+        total_capacity = float(np.nansum(compact.node_column("capacity")))
+        if total_capacity > 0:
+            loss_percent = capacity_loss / total_capacity
+        else:
+            loss_percent = np.zeros_like(capacity_loss)
+        
+        # Vectorized calculate_resilience_score for attribute-only disruptions
+        limits = [limit for limit, _ in self.RECOVERY_BANDS[:-1]]
+        ttr_days = np.array([days for _, days in self.RECOVERY_BANDS])[np.digitize(loss_percent, limits)]
+        weights = self.RESILIENCE_WEIGHTS
+        score = (1.0 - weights["capacity_loss_percent"] * loss_percent
+                 - weights["estimated_ttr_days"] * np.minimum(1.0, ttr_days / 180.0))
+        score = np.clip(score, 0.0, 1.0)
+        
+        worst = np.unravel_index(np.argmax(capacity_loss), capacity_loss.shape) if capacity_loss.size else None
+        heatmap = {
+            "lats": lats,
+            "lons": lons,
+            "capacity_loss": capacity_loss,
+            "capacity_loss_percent": loss_percent,
+            "resilience_score": score,
+            "bounds": [[south, west], [south + len(lats) * resolution, west + len(lons) * resolution]],
+            "worst_epicenter": {
+                "epicenter": (float(lats[worst[0]]), float(lons[worst[1]])),
+                "capacity_loss": float(capacity_loss[worst]),
+                "resilience_score": float(score[worst])
+            } if worst is not None else None,
+            "settings": {
+                "resolution": resolution,
+                "severity": severity,
+                "geographical_spread": geographical_spread
+            }
+        }
+        cached[settings] = heatmap
+        return heatmap
+    
+    def analyze_critical_paths(self, disruption_threshold: float = 0.3,
+                               max_workers: int = 1) -> List[Dict]:
         """
         Identify critical paths in the supply chain that would
         significantly impact resilience if disrupted.
         
+        Shortest-path trees are computed once per facility, and removing a
+        path only recomputes the hop distances from sources that routed
+        through it (see CriticalPathEngine), so the network is never copied.
+        Paths whose detour bound already rules them out are not evaluated
+        exactly.
+        
         Args:
             disruption_threshold: Threshold for considering a path critical
+            max_workers: Number of worker processes the paths are spread over
             
         Returns:
             List of critical paths with impact metrics
@@ -214,51 +419,78 @@ class ResilienceCalculator:
         network = self.optimizer.network_graph
         critical_paths = []
         
-        # Ensure baseline is calculated
-        if not self.baseline_calculated:
-            self.calculate_baseline_metrics()
-        
-        # Find all paths between key nodes (e.g., between facilities and demand points)
-        # Limit to paths with at most 3 hops for computational efficiency
-        key_paths = []
-        
-        for source in self.optimizer.facilities:
-            for target in self.optimizer.demand_points:
-                try:
-                    # Find shortest path
-                    path = nx.shortest_path(network, source, target)
-                    if len(path) <= 4:  # Source, at most 2 intermediate nodes, target
-                        key_paths.append(path)
-                except nx.NetworkXNoPath:
-                    continue
-        
-        # Analyze each path
-        for path in key_paths:
-            # Create a modified network with this path disrupted
-            disrupted_network = network.copy()
-            
-            # Remove edges in the path
-            for i in range(len(path) - 1):
-                if disrupted_network.has_edge(path[i], path[i + 1]):
-                    disrupted_network.remove_edge(path[i], path[i + 1])
-            
-            # Calculate impact
-            impact = self.calculate_disruption_impact(disrupted_network)
+        # Ensure the baseline matches the current network
+        self.calculate_baseline_metrics()
+        
+        # Shortest paths between facilities and demand points with at most
+        # 3 hops (source, at most 2 intermediate nodes, target)
+        engine = CriticalPathEngine(self.optimizer.compact_graph, list(self.optimizer.facilities),
+                                    list(self.optimizer.demand_points), max_hops=3)
+        
+        # Removing a path's routes leaves the total capacity unchanged
+        total_capacity = self.baseline_metrics["total_capacity"]
+        
+        # The score falls as paths lengthen, so paths that are not critical even
+        # with their worst-case path lengths need no exact evaluation
+        bounds = engine.evaluate_paths(exact=False, max_workers=max_workers)
+        candidates = []
+        for path_index, metrics in enumerate(bounds):
+            metrics["total_capacity"] = total_capacity
+            if self._compare_to_baseline(metrics, network)["resilience_score"] <= (1.0 - disruption_threshold):
+                candidates.append(path_index)
+        
+        exact = engine.evaluate_paths(candidates, max_workers=max_workers)
+        for path_index, metrics in zip(candidates, exact):
+            metrics["total_capacity"] = total_capacity
+            impact = self._compare_to_baseline(metrics, network)
             
             # If impact is significant, consider it a critical path
             if impact.get("resilience_score", 1.0) <= (1.0 - disruption_threshold):
+                path = engine.path_node_ids(path_index)
                 critical_paths.append({
                     "path": path,
-                    "path_description": " → ".join(path),
+                    "path_description": " → ".join(str(node) for node in path),
                     "impact": impact,
-                    "criticality": 1.0 - impact.get("resilience_score", 0)
+                    "criticality": 1.0 - impact.get("resilience_score", 0),
+                    "max_route_usage": int(engine.edge_usage[engine.paths[path_index][1]].max())
                 })
         
-        # Sort by criticality (most critical first)
-        critical_paths.sort(key=lambda x: x["criticality"], reverse=True)
+        # Sort by criticality (most critical first), then by how many paths share its routes
+        critical_paths.sort(key=lambda x: (x["criticality"], x["max_route_usage"]), reverse=True)
         
         return critical_paths
     
+    def analyze_contingencies(self, max_k: int = 2, top_n: int = 20, capacitated: bool = False,
+                              loss_threshold: float = 0.0, sample_size: Optional[int] = None,
+                              seed: Optional[int] = None, max_workers: int = 1,
+                              checkpoint_file: Optional[str] = None) -> Dict:
+        """
+        Run an N-k contingency analysis over facility and route outages.
+        
+        Finds the combinations of up to max_k simultaneous outages that
+        break service (see ContingencyAnalyzer).
+        
+        Args:
+            max_k: Largest number of simultaneous outages
+            top_n: Number of worst outage sets to return
+            capacitated: Whether served demand is limited by capacities
+                (maximum flow) or only by reachability from a facility
+            loss_threshold: Fraction of served demand an outage set may lose
+                without breaking service
+            sample_size: Levels with more candidate sets than this are sampled
+            seed: Seed for sampled levels
+            max_workers: Number of worker processes
+            checkpoint_file: Optional JSON file to save progress to and resume from
+            
+        Returns:
+            Dictionary with per-level statistics, the worst outage sets and
+            the minimal outage sets that break service
+        """
+        analyzer = ContingencyAnalyzer(self.optimizer.compact_graph, list(self.optimizer.facilities),
+                                       capacitated=capacitated, loss_threshold=loss_threshold)
+        return analyzer.run(max_k=max_k, top_n=top_n, sample_size=sample_size, seed=seed,
+                            max_workers=max_workers, checkpoint_file=checkpoint_file)
+    
     def generate_resilience_report(self, disruption_scenario=None) -> Dict:
         """
         Generate a comprehensive resilience report for the supply chain.
@@ -269,9 +501,8 @@ class ResilienceCalculator:
         Returns:
             Detailed resilience report
         """
-        # Ensure baseline is calculated
-        if not self.baseline_calculated:
-            self.calculate_baseline_metrics()
+        # Ensure the baseline matches the current network
+        self.calculate_baseline_metrics()
         
         report = {
             "baseline_metrics": self.baseline_metrics,
@@ -288,9 +519,8 @@ class ResilienceCalculator:
         
         # If a disruption scenario is provided, calculate its impact
         if disruption_scenario is not None:
-            from models.disruption import DisruptionSimulator
             simulator = DisruptionSimulator(self.optimizer.network_graph)
-            disrupted_network = simulator.apply_disruption_to_network(disruption_scenario)
+            disrupted_network = simulator.apply_disruption_to_network(disruption_scenario, materialize=False)
             impact = self.calculate_disruption_impact(disrupted_network)
             report["disruption_impact"] = impact
             report["overall_resilience_score"] = impact.get("resilience_score", None)
@@ -5,11 +5,20 @@ This module implements supplier diversification strategies to enhance
 supply chain resilience against disruptions.
 """
 
+import time
 import numpy as np
 import networkx as nx
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Tuple, Any, Optional
 import pulp as pl
-from math import sqrt
+
+from .supplier_registry import SupplierRegistry
+
+# HHI limits compared by generate_recommended_strategy
+DEFAULT_HHI_GRID = (0.2, 0.25, 0.3, 0.4)
+
+# Optimizer used by worker processes, set by _init_worker
+_worker_optimizer = None
 
 class SupplierDiversityOptimizer:
     """
@@ -22,6 +31,7 @@ class SupplierDiversityOptimizer:
         self.supplier_risks = {}
         self.materials = {}
         self.material_demands = {}
+        self.registry = SupplierRegistry()
         
     def add_supplier(self, supplier_id: str, location: Tuple[float, float],
                    reliability_score: float, capacity: Dict[str, float],
@@ -37,6 +47,15 @@ class SupplierDiversityOptimizer:
             lead_time: Dictionary of material_id -> lead time in days
             cost: Dictionary of material_id -> unit cost
         """
+        # Replacing a supplier drops its old offers and cached risk, and
+        # materials it was the only supplier of
+        if supplier_id in self.suppliers:
+            for material_id in self.suppliers[supplier_id]["capacity"]:
+                self.materials[material_id].remove(supplier_id)
+                if not self.materials[material_id]:
+                    del self.materials[material_id]
+            self.supplier_risks.pop(supplier_id, None)
+
         self.suppliers[supplier_id] = {
             "location": location,
             "reliability_score": reliability_score,
@@ -50,6 +69,8 @@ class SupplierDiversityOptimizer:
             if material_id not in self.materials:
                 self.materials[material_id] = []
             self.materials[material_id].append(supplier_id)
+
+        self.registry.add_supplier(supplier_id, location, reliability_score, capacity, lead_time, cost)
     
     def set_material_demand(self, material_id: str, demand: float):
         """
@@ -60,6 +81,7 @@ class SupplierDiversityOptimizer:
             demand: Required quantity
         """
         self.material_demands[material_id] = demand
+        self.registry.set_demand(material_id, demand)
     
     def calculate_supplier_risk(self, supplier_id: str) -> float:
         """
@@ -74,26 +96,32 @@ class SupplierDiversityOptimizer:
         if supplier_id not in self.suppliers:
             raise ValueError(f"Unknown supplier: {supplier_id}")
         
-        supplier = self.suppliers[supplier_id]
-        
-        # Base risk is inverse of reliability
-        base_risk = 1 - supplier["reliability_score"]
-        
-        # Calculate average lead time (normalized to 0-1)
-        if supplier["lead_time"]:
-            avg_lead_time = sum(supplier["lead_time"].values()) / len(supplier["lead_time"])
-            # Normalize assuming 30 days is max acceptable lead time
-            lead_time_risk = min(1.0, avg_lead_time / 30.0)
-        else:
-            lead_time_risk = 0.5  # Default if no lead time data
-        
-        # Combine factors (could be weighted differently)
-        risk_score = 0.6 * base_risk + 0.4 * lead_time_risk
+        # Risk combines unreliability and average lead time, see SupplierRegistry.risk_scores
+        risk_score = float(self.registry.risk_scores()[self.registry.supplier_index[supplier_id]])
         
         # Cache the calculated risk
         self.supplier_risks[supplier_id] = risk_score
         
         return risk_score
+
+    def calculate_supplier_risks(self, supplier_ids: Optional[List[str]] = None) -> Dict[str, float]:
+        """
+        Calculate the risk scores of many suppliers at once.
+
+        Args:
+            supplier_ids: Suppliers to evaluate (defaults to all)
+
+        Returns:
+            Dictionary of supplier_id -> risk score
+        """
+        supplier_ids = list(self.suppliers) if supplier_ids is None else supplier_ids
+        unknown = [s for s in supplier_ids if s not in self.suppliers]
+        if unknown:
+            raise ValueError(f"Unknown suppliers: {unknown}")
+        scores = self.registry.risk_scores()
+        risks = {s: float(scores[self.registry.supplier_index[s]]) for s in supplier_ids}
+        self.supplier_risks.update(risks)
+        return risks
         
     def calculate_hhi_index(self, material_id: str) -> float:
         """
@@ -109,28 +137,8 @@ class SupplierDiversityOptimizer:
         if material_id not in self.materials:
             raise ValueError(f"No suppliers for material: {material_id}")
         
-        # Get all suppliers for this material
-        suppliers = self.materials[material_id]
-        
-        # If only one supplier, HHI is 1 (maximum concentration)
-        if len(suppliers) <= 1:
-            return 1.0
-        
-        # Calculate market shares based on capacity
-        total_capacity = sum(self.suppliers[s]["capacity"].get(material_id, 0) for s in suppliers)
-        
-        if total_capacity == 0:
-            return 1.0  # If no capacity, assume maximum concentration
-        
-        market_shares = [
-            self.suppliers[s]["capacity"].get(material_id, 0) / total_capacity 
-            for s in suppliers
-        ]
-        
-        # Calculate HHI (sum of squared market shares)
-        hhi = sum(share * share for share in market_shares)
-        
-        return hhi
+        # Sum of squared capacity shares, 1 with a single supplier or no capacity
+        return float(self.registry.hhi_indices()[self.registry.material_index[material_id]])
     
     def optimize_supplier_allocation(self, 
                                    material_id: str,
@@ -150,6 +158,19 @@ class SupplierDiversityOptimizer:
         Returns:
             Dictionary of supplier_id -> allocation amount
         """
+        demand = self._allocation_demand(material_id, demand)
+        allocation_model = self._build_allocation_model(material_id, demand, max_hhi, max_suppliers)
+        return self._solve_allocation_model(allocation_model)
+
+    def _allocation_demand(self, material_id: str, demand: Optional[float],
+                           check_inputs: bool = True) -> float:
+        """
+        Validate the material and return the demand to allocate.
+
+        With check_inputs, the demand and supplier costs are checked too (see
+        _check_allocation_inputs); searches defer that check to each solve so
+        invalid inputs are reported as failures.
+        """
         if material_id not in self.materials:
             raise ValueError(f"No suppliers for material: {material_id}")
             
@@ -158,14 +179,47 @@ class SupplierDiversityOptimizer:
             if material_id not in self.material_demands:
                 raise ValueError(f"No demand specified for material: {material_id}")
             demand = self.material_demands[material_id]
-        
+        if check_inputs:
+            self._check_allocation_inputs(material_id, demand)
+        return demand
+
+    def _check_allocation_inputs(self, material_id: str, demand: float) -> None:
+        """
+        Check that an allocation model can be built for a material.
+
+        Raises:
+            ValueError: If the demand is not positive or a supplier of the
+                material has no finite cost for it
+        """
+        if not demand > 0:
+            raise ValueError(f"Demand for material {material_id} must be positive, got {demand}")
+        no_cost = [s for s in self.materials[material_id]
+                   if not np.isfinite(self.suppliers[s]["cost"].get(material_id, np.inf))]
+        if no_cost:
+            raise ValueError(f"No cost for material {material_id} from suppliers: {no_cost}")
+
+    def _build_allocation_model(self, material_id: str, demand: float, max_hhi: float,
+                                max_suppliers: int) -> Dict[str, Any]:
+        """
+        Build the allocation MILP for one material.
+
+        Args:
+            material_id: Material to optimize for
+            demand: Total demand to be allocated
+            max_hhi: Maximum acceptable HHI value
+            max_suppliers: Maximum number of suppliers to use
+
+        Returns:
+            Dictionary with the PuLP problem, its order and supplier use
+            variables and the minimum order constraints set by max_hhi
+        """
         # Get suppliers for this material
         suppliers = self.materials[material_id]
         
         # Calculate risks if not already done
-        for supplier_id in suppliers:
-            if supplier_id not in self.supplier_risks:
-                self.calculate_supplier_risk(supplier_id)
+        missing = [s for s in suppliers if s not in self.supplier_risks]
+        if missing:
+            self.calculate_supplier_risks(missing)
         
         # Create optimization model
         model = pl.LpProblem(f"Supplier_Allocation_{material_id}", pl.LpMinimize)
@@ -198,17 +252,63 @@ class SupplierDiversityOptimizer:
         # Constraint: HHI index (approximation using piecewise linear approach)
         # This is a complex constraint that's difficult to implement directly in LP
         # Instead, we use a minimum order size approach to encourage diversity
-        min_order_percent = (1.0 - max_hhi) / max_suppliers
+        min_orders = {}
         for s in suppliers:
-            model += orders[s] >= min_order_percent * demand * use_supplier[s]
+            min_orders[s] = orders[s] >= 0
+            model += min_orders[s]
             model += orders[s] <= demand * use_supplier[s]
-        
+
+        allocation_model = {
+            "material_id": material_id,
+            "demand": demand,
+            "max_suppliers": max_suppliers,
+            "max_hhi": max_hhi,
+            "model": model,
+            "orders": orders,
+            "use_supplier": use_supplier,
+            "min_orders": min_orders
+        }
+        self._set_max_hhi(allocation_model, max_hhi)
+        return allocation_model
+
+    def _set_max_hhi(self, allocation_model: Dict[str, Any], max_hhi: float):
+        """
+        Change the HHI limit of a built allocation model in place.
+
+        Only the coefficients of the supplier use variables in the minimum
+        order constraints depend on max_hhi, so nothing else is rebuilt.
+        """
+        allocation_model["max_hhi"] = max_hhi
+        min_order_percent = (1.0 - max_hhi) / allocation_model["max_suppliers"]
+        coefficient = -min_order_percent * allocation_model["demand"]
+        for s, constraint in allocation_model["min_orders"].items():
+            # PuLP 3 keeps the terms in constraint.expr, older versions in the constraint itself
+            getattr(constraint, "expr", constraint)[allocation_model["use_supplier"][s]] = coefficient
+
+    def _solve_allocation_model(self, allocation_model: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Solve a built allocation model and summarize the allocation.
+
+        Raises:
+            ValueError: If the model has no optimal solution
+        """
+        material_id = allocation_model["material_id"]
+        orders = allocation_model["orders"]
+        model = allocation_model["model"]
+
         # Solve the model
         model.solve(pl.PULP_CBC_CMD(msg=False))
+        status = pl.LpStatus[model.status]
+        if status != "Optimal":
+            raise ValueError(f"Supplier allocation for {material_id} is {status.lower()}")
         
         # Extract solution
-        allocation = {s: orders[s].value() for s in suppliers if orders[s].value() > 0.001}
-        
+        allocation = {s: orders[s].value() for s in orders if orders[s].value() > 0.001}
+        return self._summarize_allocation(material_id, allocation, allocation_model["max_hhi"])
+
+    def _summarize_allocation(self, material_id: str, allocation: Dict[str, float],
+                              max_hhi: float) -> Dict[str, Any]:
+        """Cost, risk and concentration of one material's allocation."""
         # Calculate actual HHI of solution
         total_allocated = sum(allocation.values())
         actual_hhi = sum((amount / total_allocated)**2 for amount in allocation.values())
@@ -237,30 +337,282 @@ class SupplierDiversityOptimizer:
         Returns:
             Dispersion score (0-1, higher is better)
         """
-        if len(supplier_ids) <= 1:
-            return 0.0  # No dispersion with 0 or 1 supplier
-            
-        # Get locations
-        locations = [self.suppliers[s]["location"] for s in supplier_ids 
-                   if s in self.suppliers]
-        
-        if len(locations) <= 1:
-            return 0.0
-            
-        # Calculate centroid
-        centroid_lat = sum(loc[0] for loc in locations) / len(locations)
-        centroid_lon = sum(loc[1] for loc in locations) / len(locations)
-        
-        # Calculate average distance from centroid
-        distances = [sqrt((loc[0] - centroid_lat)**2 + (loc[1] - centroid_lon)**2)
-                   for loc in locations]
-        avg_distance = sum(distances) / len(distances)
-        
-        # Normalize based on approximate max distance in Kenya (~1.0 in lat/lon space)
-        dispersion_score = min(1.0, avg_distance / 1.0)
-        
-        return dispersion_score
+        # Average distance from the centroid, normalized by the extent of Kenya (~1.0 in lat/lon space)
+        return self.registry.dispersion(supplier_ids)
     
+    def search_allocation_strategies(self, material_id: str, hhi_grid: Optional[List[float]] = None,
+                                     demand: float = None, max_suppliers: int = 5,
+                                     max_workers: int = 1) -> Dict:
+        """
+        Solve the allocation model over a grid of HHI limits.
+
+        The model is built once (per worker process) and only its HHI
+        dependent coefficients are changed between solves. Grid points are
+        compared on total cost, average risk and achieved HHI to trace the
+        Pareto front of the strategies.
+
+        Args:
+            material_id: Material to optimize for
+            hhi_grid: Maximum HHI values to solve for (defaults to DEFAULT_HHI_GRID)
+            demand: Total demand to be allocated (uses stored demand if None)
+            max_suppliers: Maximum number of suppliers to use
+            max_workers: Number of worker processes the grid is split over
+
+        Returns:
+            Dictionary with one strategy per grid point (in grid order), the
+            Pareto optimal strategies and the grid points that failed; every
+            point records its solve time in seconds
+        """
+        grid = [float(max_hhi) for max_hhi in (DEFAULT_HHI_GRID if hhi_grid is None else hhi_grid)]
+        if not grid:
+            raise ValueError("HHI grid is empty")
+        if any(not 0 < max_hhi <= 1 for max_hhi in grid):
+            raise ValueError(f"HHI limits must be in (0, 1], got {grid}")
+        demand = self._allocation_demand(material_id, demand, check_inputs=False)
+
+        start = time.perf_counter()
+        if max_workers <= 1 or len(grid) <= 1:
+            points = self._solve_hhi_grid(material_id, demand, max_suppliers, grid)
+        else:
+            # Contiguous chunks, so each worker builds its model once
+            chunks = [chunk.tolist() for chunk in np.array_split(grid, min(max_workers, len(grid)))]
+            with ProcessPoolExecutor(max_workers=len(chunks), initializer=_init_worker,
+                                     initargs=(self,)) as executor:
+                results = executor.map(_solve_hhi_grid, [material_id] * len(chunks),
+                                       [demand] * len(chunks), [max_suppliers] * len(chunks), chunks)
+                points = [point for chunk_points in results for point in chunk_points]
+
+        solved = [p for p in points if "error" not in p]
+        objectives = np.array([[p["allocation"]["total_cost"], p["allocation"]["average_risk"],
+                                p["allocation"]["hhi"]] for p in solved]).reshape(-1, 3)
+        for i, point in enumerate(solved):
+            # Dominated: another point is no worse on every objective and better on one
+            dominated = np.all(objectives <= objectives[i], axis=1) & np.any(objectives < objectives[i], axis=1)
+            point["pareto_optimal"] = not dominated.any()
+
+        return {
+            "material_id": material_id,
+            "demand": demand,
+            "points": points,
+            "pareto_front": [p for p in solved if p["pareto_optimal"]],
+            "failures": [p for p in points if "error" in p],
+            "total_time": time.perf_counter() - start
+        }
+
+    def _solve_hhi_grid(self, material_id: str, demand: float, max_suppliers: int,
+                        grid: List[float]) -> List[Dict]:
+        """
+        Build the allocation model once and solve it for every HHI limit of a grid.
+
+        Inputs that cannot be modelled, and solver errors, are reported as
+        failed grid points.
+        """
+        allocation_model = None
+        points = []
+        for max_hhi in grid:
+            start = time.perf_counter()
+            try:
+                if allocation_model is None:
+                    self._check_allocation_inputs(material_id, demand)
+                    allocation_model = self._build_allocation_model(material_id, demand, max_hhi, max_suppliers)
+                else:
+                    self._set_max_hhi(allocation_model, max_hhi)
+                allocation = self._solve_allocation_model(allocation_model)
+            except (ValueError, pl.PulpError) as e:
+                points.append({"max_hhi": max_hhi, "error": str(e), "solve_time": time.perf_counter() - start})
+                continue
+            solve_time = time.perf_counter() - start
+
+            # Calculate geographic dispersion
+            geo_dispersion = self.calculate_geographic_dispersion(list(allocation["allocation"].keys()))
+            points.append({
+                "max_hhi": max_hhi,
+                "allocation": allocation,
+                "geo_dispersion": geo_dispersion,
+                # Calculate a combined score (lower is better)
+                "score": 0.4 * allocation["hhi"] + 
+                       0.3 * allocation["average_risk"] + 
+                       0.3 * (1 - geo_dispersion),
+                "solve_time": solve_time
+            })
+        return points
+
+    def optimize_portfolio_allocation(self, material_ids: Optional[List[str]] = None,
+                                      max_hhi: float = 0.25, max_suppliers: int = 5,
+                                      supplier_capacity: Optional[Dict[str, float]] = None,
+                                      engagement_cost: Optional[Dict[str, float]] = None,
+                                      decompose: bool = True, max_workers: int = 1) -> Dict:
+        """
+        Allocate the demand of many materials jointly.
+
+        Each material gets the constraints of optimize_supplier_allocation.
+        The materials are coupled by a supplier's total capacity across all
+        materials and by a fixed cost for engaging a supplier at all, which
+        is paid once however many materials it supplies. Materials that
+        share no supplier are independent, so with decompose the portfolio
+        is split into supplier clusters solved as separate models.
+
+        Args:
+            material_ids: Materials to allocate (defaults to all with a demand)
+            max_hhi: Maximum acceptable HHI value per material
+            max_suppliers: Maximum number of suppliers per material
+            supplier_capacity: Dictionary of supplier_id -> total capacity
+                shared by all materials
+            engagement_cost: Dictionary of supplier_id -> fixed cost of using
+                the supplier for any material
+            decompose: Whether to solve independent supplier clusters separately
+            max_workers: Number of worker processes the clusters are spread over
+
+        Returns:
+            Dictionary with the allocation of each material (as returned by
+            optimize_supplier_allocation), purchase and engagement costs, the
+            engaged suppliers and their total orders, and the clusters that
+            could not be solved
+        """
+        material_ids = list(self.material_demands) if material_ids is None else list(material_ids)
+        if not material_ids:
+            raise ValueError("No materials to allocate")
+        for material_id in material_ids:
+            self._allocation_demand(material_id, None, check_inputs=False)
+
+        # Risk scores are computed once and shared by every material (and worker)
+        missing = list(dict.fromkeys(s for m in material_ids for s in self.materials[m] if s not in self.supplier_risks))
+        if missing:
+            self.calculate_supplier_risks(missing)
+
+        start = time.perf_counter()
+        clusters = self._supplier_clusters(material_ids) if decompose else [material_ids]
+        settings = (max_hhi, max_suppliers, supplier_capacity or {}, engagement_cost or {})
+        if max_workers <= 1 or len(clusters) <= 1:
+            results = [self._solve_portfolio_cluster(cluster, *settings) for cluster in clusters]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                     initargs=(self,)) as executor:
+                results = list(executor.map(_solve_portfolio_cluster, clusters,
+                                            *[[setting] * len(clusters) for setting in settings]))
+
+        allocations, engaged, failures = {}, set(), []
+        for result in results:
+            if "error" in result:
+                failures.append({"materials": result["materials"], "error": result["error"]})
+                continue
+            allocations.update(result["allocations"])
+            engaged.update(result["engaged_suppliers"])
+
+        supplier_orders = {}
+        for allocation in allocations.values():
+            for supplier_id, amount in allocation["allocation"].items():
+                supplier_orders[supplier_id] = supplier_orders.get(supplier_id, 0) + amount
+
+        return {
+            "allocations": {m: allocations[m] for m in material_ids if m in allocations},
+            "total_cost": sum(a["total_cost"] for a in allocations.values()),
+            "engagement_cost": sum((engagement_cost or {}).get(s, 0) for s in engaged),
+            "engaged_suppliers": [s for s in self.suppliers if s in engaged],
+            "supplier_orders": supplier_orders,
+            "num_clusters": len(clusters),
+            "failures": failures,
+            "solve_time": time.perf_counter() - start
+        }
+
+    def _supplier_clusters(self, material_ids: List[str]) -> List[List[str]]:
+        """Groups of materials connected by shared suppliers, largest first."""
+        graph = nx.Graph()
+        for material_id in material_ids:
+            graph.add_node(("material", material_id))
+            graph.add_edges_from((("material", material_id), ("supplier", s)) for s in self.materials[material_id])
+
+        position = {m: i for i, m in enumerate(material_ids)}
+        clusters = [sorted((key for kind, key in component if kind == "material"), key=position.get)
+                    for component in nx.connected_components(graph)]
+        clusters.sort(key=len, reverse=True)
+        return clusters
+
+    def _solve_portfolio_cluster(self, material_ids: List[str], max_hhi: float, max_suppliers: int,
+                                 supplier_capacity: Dict[str, float],
+                                 engagement_cost: Dict[str, float]) -> Dict:
+        """
+        Build and solve the joint allocation model for a group of materials.
+
+        Inputs that cannot be modelled, solver errors and models without an
+        optimal solution are returned as {"materials", "error"}.
+        """
+        try:
+            for m in material_ids:
+                self._check_allocation_inputs(m, self.material_demands[m])
+            return self._solve_portfolio_model(material_ids, max_hhi, max_suppliers,
+                                               supplier_capacity, engagement_cost)
+        except (ValueError, pl.PulpError) as e:
+            return {"materials": material_ids, "error": str(e)}
+
+    def _solve_portfolio_model(self, material_ids: List[str], max_hhi: float, max_suppliers: int,
+                               supplier_capacity: Dict[str, float],
+                               engagement_cost: Dict[str, float]) -> Dict:
+        """Build and solve the joint allocation model of _solve_portfolio_cluster."""
+        model = pl.LpProblem("Portfolio_Allocation", pl.LpMinimize)
+        suppliers = list(dict.fromkeys(s for m in material_ids for s in self.materials[m]))
+        supplier_index = {s: i for i, s in enumerate(suppliers)}
+
+        # Decision variables per (supplier, material) pair
+        orders, use_supplier = {}, {}
+        for j, m in enumerate(material_ids):
+            for s in self.materials[m]:
+                orders[s, m] = pl.LpVariable(f"Order_{supplier_index[s]}_{j}", 0, None)
+                use_supplier[s, m] = pl.LpVariable(f"Use_{supplier_index[s]}_{j}", 0, 1, pl.LpBinary)
+
+        # Binary variables: whether a supplier with a fixed cost is engaged for any material
+        engaged = {s: pl.LpVariable(f"Engage_{supplier_index[s]}", 0, 1, pl.LpBinary)
+                   for s in suppliers if engagement_cost.get(s, 0) > 0}
+
+        # Objective: the per-material objective summed over materials, plus
+        # engagement costs weighted like purchase costs of an average material
+        objective = []
+        spend = []
+        for m in material_ids:
+            demand = self.material_demands[m]
+            ms = self.materials[m]
+            avg_cost = sum(self.suppliers[s]["cost"].get(m, 0) for s in ms) / len(ms)
+            spend.append(avg_cost * demand)
+            objective += [orders[s, m] * (self.suppliers[s]["cost"].get(m, float('inf')) / (avg_cost * demand) * 0.7
+                                          + self.supplier_risks[s] / demand * 0.3) for s in ms]
+        average_spend = sum(spend) / len(spend)
+        objective += [engaged[s] * engagement_cost[s] / average_spend * 0.7 for s in engaged]
+        model += pl.lpSum(objective)
+
+        min_order_percent = (1.0 - max_hhi) / max_suppliers
+        for m in material_ids:
+            demand = self.material_demands[m]
+            ms = self.materials[m]
+            model += pl.lpSum([orders[s, m] for s in ms]) == demand
+            model += pl.lpSum([use_supplier[s, m] for s in ms]) <= max_suppliers
+            for s in ms:
+                model += orders[s, m] <= self.suppliers[s]["capacity"].get(m, 0) * use_supplier[s, m]
+                model += orders[s, m] >= min_order_percent * demand * use_supplier[s, m]
+                model += orders[s, m] <= demand * use_supplier[s, m]
+                if s in engaged:
+                    model += use_supplier[s, m] <= engaged[s]
+
+        # Constraint: capacity shared by all materials of a supplier
+        for s in suppliers:
+            if s in supplier_capacity:
+                model += pl.lpSum([orders[s, m] for m in material_ids if (s, m) in orders]) <= supplier_capacity[s]
+
+        model.solve(pl.PULP_CBC_CMD(msg=False))
+        status = pl.LpStatus[model.status]
+        if status != "Optimal":
+            return {"materials": material_ids, "error": f"Portfolio allocation is {status.lower()}"}
+
+        allocations = {}
+        for m in material_ids:
+            allocation = {s: orders[s, m].value() for s in self.materials[m] if orders[s, m].value() > 0.001}
+            allocations[m] = self._summarize_allocation(m, allocation, max_hhi)
+        used = {s for allocation in allocations.values() for s in allocation["allocation"]}
+        return {
+            "materials": material_ids,
+            "allocations": allocations,
+            "engaged_suppliers": [s for s in suppliers if s in used]
+        }
+
     def generate_recommended_strategy(self, material_id: str) -> Dict:
         """
         Generate a complete diversification strategy for a material.
@@ -276,36 +628,18 @@ class SupplierDiversityOptimizer:
             
         # Get current HHI
         current_hhi = self.calculate_hhi_index(material_id)
+        if material_id not in self.material_demands:
+            return {
+                "material_id": material_id,
+                "current_hhi": current_hhi,
+                "error": f"No demand specified for material: {material_id}"
+            }
         
         # Generate strategies with different max_hhi values
-        strategies = []
-        for max_hhi in [0.2, 0.25, 0.3, 0.4]:
-            try:
-                allocation = self.optimize_supplier_allocation(
-                    material_id, 
-                    max_hhi=max_hhi,
-                    max_suppliers=5
-                )
-                
-                # Calculate geographic dispersion
-                geo_dispersion = self.calculate_geographic_dispersion(list(allocation["allocation"].keys()))
-                
-                # Add to strategies
-                strategies.append({
-                    "max_hhi": max_hhi,
-                    "allocation": allocation,
-                    "geo_dispersion": geo_dispersion,
-                    # Calculate a combined score (lower is better)
-                    "score": 0.4 * allocation["hhi"] + 
-                           0.3 * allocation["average_risk"] + 
-                           0.3 * (1 - geo_dispersion)
-                })
-            except:
-                # Skip if optimization fails
-                continue
+        search = self.search_allocation_strategies(material_id, DEFAULT_HHI_GRID, max_suppliers=5)
         
         # Sort by score
-        strategies.sort(key=lambda x: x["score"])
+        strategies = sorted((p for p in search["points"] if "error" not in p), key=lambda x: x["score"])
         
         # Return best strategy
         if strategies:
@@ -314,10 +648,30 @@ class SupplierDiversityOptimizer:
                 "current_hhi": current_hhi,
                 "recommended_strategy": strategies[0],
                 "alternative_strategies": strategies[1:],
+                "failed_strategies": search["failures"]
             }
         else:
             return {
                 "material_id": material_id,
                 "current_hhi": current_hhi,
-                "error": "Could not generate valid strategies"
+                "error": "Could not generate valid strategies",
+                "failed_strategies": search["failures"]
             }
+
+
+def _init_worker(optimizer: SupplierDiversityOptimizer) -> None:
+    """Store the optimizer in a worker process, so it is sent once per worker."""
+    global _worker_optimizer
+    _worker_optimizer = optimizer
+
+
+def _solve_hhi_grid(material_id: str, demand: float, max_suppliers: int, grid: List[float]) -> List[Dict]:
+    """Solve the allocation model for a chunk of an HHI grid in a worker process."""
+    return _worker_optimizer._solve_hhi_grid(material_id, demand, max_suppliers, grid)
+
+
+def _solve_portfolio_cluster(material_ids: List[str], max_hhi: float, max_suppliers: int,
+                             supplier_capacity: Dict[str, float], engagement_cost: Dict[str, float]) -> Dict:
+    """Solve the joint allocation model of one supplier cluster in a worker process."""
+    return _worker_optimizer._solve_portfolio_cluster(material_ids, max_hhi, max_suppliers,
+                                                      supplier_capacity, engagement_cost)
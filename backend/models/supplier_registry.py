@@ -0,0 +1,280 @@
+"""
+Supplier Registry Module
+
+This module keeps the suppliers of the diversification model in arrays:
+reliability and location per supplier, and supplier x material matrices of
+capacity, lead time and cost. Risk scores, HHI indices and geographic
+dispersion are computed as vectorized operations over these arrays and
+memoized until the registry changes.
+"""
+
+import numpy as np
+from typing import Dict, List, Tuple, Any, Optional, Callable, Hashable
+
+# Lead time (days) at which the lead time risk reaches its maximum
+MAX_LEAD_TIME = 30.0
+
+# Lead time risk of suppliers without lead time data
+DEFAULT_LEAD_TIME_RISK = 0.5
+
+# Weights of unreliability and lead time risk in the supplier risk score
+RISK_WEIGHTS = (0.6, 0.4)
+
+# Average distance from the centroid (degrees) scored as full dispersion,
+# roughly the extent of Kenya in lat/lon space
+DISPERSION_SCALE = 1.0
+
+# Number of memoized results kept before the memo is cleared
+MEMO_SIZE = 10000
+
+
+class SupplierRegistry:
+    """
+    Array-backed store of suppliers and their per-material offers.
+
+    Missing values are stored as NaN: a supplier offers a material when
+    its capacity for that material is set. Every change made through
+    add_supplier and set_demand increments ``version`` and invalidates
+    the memoized results.
+    """
+
+    # Per supplier and material values tracked as matrices
+    MATERIAL_COLUMNS = ("capacity", "lead_time", "cost")
+
+    def __init__(self, initial_suppliers: int = 16, initial_materials: int = 16):
+        """
+        Initialize an empty registry.
+
+        Args:
+            initial_suppliers: Number of supplier rows to preallocate
+            initial_materials: Number of material columns to preallocate
+        """
+        self.supplier_ids: List[str] = []
+        self.supplier_index: Dict[str, int] = {}
+        self.material_ids: List[str] = []
+        self.material_index: Dict[str, int] = {}
+        self.num_suppliers = 0
+        self.num_materials = 0
+        self.version = 0
+
+        self._reliability = np.full(initial_suppliers, np.nan)
+        self._locations = np.full((initial_suppliers, 2), np.nan)
+        self._matrices = {c: np.full((initial_suppliers, initial_materials), np.nan)
+                          for c in self.MATERIAL_COLUMNS}
+        self._demand = np.full(initial_materials, np.nan)
+        self._memo: Dict[Hashable, Any] = {}
+        self._memo_version = 0
+
+    # ----- Construction and updates -----
+
+    def add_supplier(self, supplier_id: str, location: Tuple[float, float], reliability_score: float,
+                     capacity: Dict[str, float], lead_time: Dict[str, float], cost: Dict[str, float]) -> int:
+        """
+        Add a supplier or replace an existing supplier's data.
+
+        Args:
+            supplier_id: Unique identifier for the supplier
+            location: (latitude, longitude) coordinates
+            reliability_score: 0-1 score of supplier reliability
+            capacity: Dictionary of material_id -> capacity
+            lead_time: Dictionary of material_id -> lead time in days
+            cost: Dictionary of material_id -> unit cost
+
+        Returns:
+            Row index of the supplier
+        """
+        idx = self.supplier_index.get(supplier_id)
+        if idx is None:
+            idx = self.num_suppliers
+            self._reserve_suppliers(idx + 1)
+            self.supplier_ids.append(supplier_id)
+            self.supplier_index[supplier_id] = idx
+            self.num_suppliers += 1
+
+        # Register new materials first, as that may grow the matrices
+        columns = {m: self._material_column(m) for values in (capacity, lead_time, cost) for m in values}
+        self._reliability[idx] = reliability_score
+        self._locations[idx] = location
+        for name, values in (("capacity", capacity), ("lead_time", lead_time), ("cost", cost)):
+            row = self._matrices[name][idx]
+            row[:] = np.nan
+            row[np.array([columns[m] for m in values], dtype=np.int64)] = list(values.values())
+        self.version += 1
+        return idx
+
+    def set_demand(self, material_id: str, demand: float) -> int:
+        """
+        Set the demand for a material.
+
+        Args:
+            material_id: Material identifier
+            demand: Required quantity
+
+        Returns:
+            Column index of the material
+        """
+        column = self._material_column(material_id)
+        self._demand[column] = demand
+        self.version += 1
+        return column
+
+    def _material_column(self, material_id: str) -> int:
+        """Column index of a material, adding the material if it is new."""
+        column = self.material_index.get(material_id)
+        if column is None:
+            column = self.num_materials
+            self._reserve_materials(column + 1)
+            self.material_ids.append(material_id)
+            self.material_index[material_id] = column
+            self.num_materials += 1
+        return column
+
+    def _reserve_suppliers(self, size: int) -> None:
+        """Grow the supplier rows (at least doubling) so they hold `size` suppliers."""
+        if size <= len(self._reliability):
+            return
+        extra = max(len(self._reliability), size - len(self._reliability))
+        self._reliability = np.concatenate([self._reliability, np.full(extra, np.nan)])
+        self._locations = np.concatenate([self._locations, np.full((extra, 2), np.nan)])
+        for name, matrix in self._matrices.items():
+            self._matrices[name] = np.concatenate([matrix, np.full((extra, matrix.shape[1]), np.nan)])
+
+    def _reserve_materials(self, size: int) -> None:
+        """Grow the material columns (at least doubling) so they hold `size` materials."""
+        if size <= len(self._demand):
+            return
+        extra = max(len(self._demand), size - len(self._demand))
+        self._demand = np.concatenate([self._demand, np.full(extra, np.nan)])
+        for name, matrix in self._matrices.items():
+            self._matrices[name] = np.concatenate([matrix, np.full((matrix.shape[0], extra), np.nan)], axis=1)
+
+    # ----- Array views -----
+
+    @property
+    def reliability(self) -> np.ndarray:
+        """Reliability score per supplier."""
+        return self._reliability[:self.num_suppliers]
+
+    @property
+    def locations(self) -> np.ndarray:
+        """(latitude, longitude) per supplier as an (n, 2) array."""
+        return self._locations[:self.num_suppliers]
+
+    @property
+    def demand(self) -> np.ndarray:
+        """Demand per material (NaN where no demand is set)."""
+        return self._demand[:self.num_materials]
+
+    def matrix(self, name: str) -> np.ndarray:
+        """
+        Get a supplier x material matrix (NaN where the value is missing).
+
+        Args:
+            name: Matrix name from MATERIAL_COLUMNS
+
+        Returns:
+            View of the matrix for the current suppliers and materials
+        """
+        return self._matrices[name][:self.num_suppliers, :self.num_materials]
+
+    @property
+    def offers(self) -> np.ndarray:
+        """Boolean supplier x material matrix of the materials each supplier offers."""
+        return self._memoized("offers", lambda: ~np.isnan(self.matrix("capacity")))
+
+    # ----- Vectorized metrics -----
+
+    def _memoized(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return a memoized result, recomputing it after the registry changed."""
+        if self._memo_version != self.version or len(self._memo) >= MEMO_SIZE:
+            self._memo = {}
+            self._memo_version = self.version
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
+
+    def risk_scores(self) -> np.ndarray:
+        """
+        Risk score (0-1, higher is riskier) of every supplier.
+
+        The score combines unreliability with the average lead time over
+        the supplier's materials, relative to MAX_LEAD_TIME.
+
+        Returns:
+            Risk score per supplier row
+        """
+        return self._memoized("risk", self._compute_risk_scores)
+
+    def _compute_risk_scores(self) -> np.ndarray:
+        lead_time = self.matrix("lead_time")
+        counts = (~np.isnan(lead_time)).sum(axis=1)
+        totals = np.nansum(lead_time, axis=1)
+        lead_time_risk = np.full(self.num_suppliers, DEFAULT_LEAD_TIME_RISK)
+        has_lead_time = counts > 0
+        lead_time_risk[has_lead_time] = np.minimum(1.0, totals[has_lead_time] / counts[has_lead_time] / MAX_LEAD_TIME)
+        return RISK_WEIGHTS[0] * (1 - self.reliability) + RISK_WEIGHTS[1] * lead_time_risk
+
+    def hhi_indices(self) -> np.ndarray:
+        """
+        Herfindahl-Hirschman Index of every material's supply capacity.
+
+        Materials with at most one supplier or no capacity count as fully
+        concentrated (1.0).
+
+        Returns:
+            HHI (0-1, lower is more diverse) per material column
+        """
+        return self._memoized("hhi", self._compute_hhi_indices)
+
+    def _compute_hhi_indices(self) -> np.ndarray:
+        capacity = np.nan_to_num(self.matrix("capacity"))
+        totals = capacity.sum(axis=0)
+        squares = (capacity ** 2).sum(axis=0)
+        hhi = np.ones(self.num_materials)
+        diverse = (self.offers.sum(axis=0) > 1) & (totals != 0)
+        hhi[diverse] = squares[diverse] / totals[diverse] ** 2
+        return hhi
+
+    def dispersion(self, supplier_ids: List[str]) -> float:
+        """
+        Geographic dispersion of a set of suppliers.
+
+        Args:
+            supplier_ids: Supplier IDs; unknown IDs are ignored
+
+        Returns:
+            Dispersion score (0-1, higher is better), 0 for fewer than two suppliers
+        """
+        rows = tuple(sorted(self.supplier_index[s] for s in supplier_ids if s in self.supplier_index))
+        if len(supplier_ids) <= 1 or len(rows) <= 1:
+            return 0.0
+        return self._memoized(("dispersion", rows), lambda: float(self._dispersion(np.array(rows))))
+
+    def dispersion_many(self, groups: List[List[str]]) -> np.ndarray:
+        """
+        Geographic dispersion of many sets of suppliers at once.
+
+        Args:
+            groups: Supplier ID lists; unknown IDs are ignored
+
+        Returns:
+            Dispersion score per group
+        """
+        rows = [[self.supplier_index[s] for s in supplier_ids if s in self.supplier_index] for supplier_ids in groups]
+        counts = np.array([len(r) for r in rows], dtype=np.int64)
+        members = np.fromiter((i for r in rows for i in r), dtype=np.int64, count=int(counts.sum()))
+        group = np.repeat(np.arange(len(groups)), counts)
+
+        # Centroid of each group, then the members' average distance to it
+        locations = self.locations[members]
+        sizes = np.maximum(counts, 1)
+        centroids = np.stack([np.bincount(group, locations[:, k], len(groups)) / sizes for k in range(2)], axis=1)
+        distances = np.sqrt(((locations - centroids[group]) ** 2).sum(axis=1))
+        scores = np.minimum(1.0, np.bincount(group, distances, len(groups)) / sizes / DISPERSION_SCALE)
+        scores[(counts <= 1) | (np.array([len(g) for g in groups], dtype=np.int64) <= 1)] = 0.0
+        return scores
+
+    def _dispersion(self, rows: np.ndarray) -> float:
+        locations = self.locations[rows]
+        distances = np.sqrt(((locations - locations.mean(axis=0)) ** 2).sum(axis=1))
+        return min(1.0, distances.mean() / DISPERSION_SCALE)
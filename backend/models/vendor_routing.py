@@ -0,0 +1,432 @@
+"""
+Mobile Vendor Routing Module
+
+This module plans market visits for teams of mobile vendors as a team
+orienteering problem with time windows: each vendor leaves its start point
+at the beginning of the working day, travels between markets and trades at
+each for a while. Every market is visited by at most one vendor of a team,
+service must start while the market is open and end within the working day,
+and each vendor has a distance budget. The goal is the largest total
+expected profit.
+
+Visit durations and profits depend on the time of day a visit starts, so
+inserting a market changes the profit of every later visit of the route.
+Insertions are evaluated exactly by simulating the rest of the route for
+all candidate markets at once, stopping as soon as waiting for a market to
+open absorbs the delay. An iterated local search alternates this insertion
+heuristic with a shake step that removes consecutive visits from every
+route (Vansteenwegen et al., 2009).
+"""
+
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple, Any, Optional
+
+# Average travel speed between markets (km/h)
+TRAVEL_SPEED = 30.0
+
+# Earth radius used for haversine distances (km)
+EARTH_RADIUS = 6371.0
+
+# Default number of local search iterations, and iterations without an improvement before stopping
+DEFAULT_MAX_ITERATIONS = 100
+DEFAULT_MAX_NO_IMPROVEMENT = 10
+
+# Planner used by worker processes, set by _init_worker
+_worker_planner = None
+
+
+def haversine_matrix(origins: np.ndarray, destinations: np.ndarray) -> np.ndarray:
+    """
+    Haversine distances between two sets of points.
+
+    Args:
+        origins: (n, 2) array of (latitude, longitude)
+        destinations: (m, 2) array of (latitude, longitude)
+
+    Returns:
+        (n, m) array of distances in km
+    """
+    lat1, lon1 = np.radians(origins[:, 0])[:, None], np.radians(origins[:, 1])[:, None]
+    lat2, lon2 = np.radians(destinations[:, 0])[None, :], np.radians(destinations[:, 1])[None, :]
+    a = (np.sin((lat2 - lat1) / 2) ** 2 +
+         np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return EARTH_RADIUS * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+class VendorRoutePlanner:
+    """
+    Plans market visits for teams of mobile vendors.
+
+    Market data, distances between markets and the visit duration and
+    profit functions are prepared once and shared by every team planned.
+    """
+
+    def __init__(self, dynamics: Any, markets: List[Dict], max_distance: float = 50.0,
+                 time_window: Tuple[float, float] = (6, 19), max_iterations: int = DEFAULT_MAX_ITERATIONS,
+                 max_no_improvement: int = DEFAULT_MAX_NO_IMPROVEMENT):
+        """
+        Initialize the planner.
+
+        Args:
+            dynamics: InformalMarketDynamics providing visit durations and profits
+            markets: Markets with name, latitude and longitude, and optionally
+                opening_time, closing_time, size_factor and average_daily_profit
+            max_distance: Maximum travel distance per vendor in km
+            time_window: Working day (start hour, end hour)
+            max_iterations: Maximum number of local search iterations
+            max_no_improvement: Iterations without improvement before stopping
+        """
+        if time_window[0] >= time_window[1]:
+            raise ValueError(f"Time window must start before it ends, got {time_window}")
+        if max_distance < 0:
+            raise ValueError(f"Maximum distance must be non-negative, got {max_distance}")
+
+        self.dynamics = dynamics
+        self.markets = markets
+        self.max_distance = max_distance
+        self.time_window = (float(time_window[0]), float(time_window[1]))
+        self.max_iterations = max_iterations
+        self.max_no_improvement = max_no_improvement
+
+        self.names = [market['name'] for market in markets]
+        self.locations = np.array([(m['latitude'], m['longitude']) for m in markets], dtype=float).reshape(-1, 2)
+        self.opening = np.array([m.get('opening_time', 6) for m in markets], dtype=float)
+        self.closing = np.array([m.get('closing_time', 18) for m in markets], dtype=float)
+        self.size_factors = np.array([m.get('size_factor', 1.0) for m in markets], dtype=float)
+        self.base_profits = np.array([m.get('average_daily_profit', 1000) for m in markets], dtype=float)
+        self.distances = haversine_matrix(self.locations, self.locations)
+
+    def plan(self, vendor_locations: List[Tuple[float, float]]) -> Dict:
+        """
+        Plan the routes of one team of vendors.
+
+        Args:
+            vendor_locations: Start point (lat, lon) of every vendor in the team
+
+        Returns:
+            Dictionary with one route per vendor (list of visits with
+            arrival, start and duration in hours, leg distance in km and
+            expected profit), total profit and distance per vendor, the
+            unvisited markets and the number of iterations run
+        """
+        if not vendor_locations:
+            raise ValueError("At least one vendor location is required")
+        starts = np.array(vendor_locations, dtype=float).reshape(-1, 2)
+        search = _OrienteeringSearch(self, haversine_matrix(starts, self.locations))
+        routes, iterations = search.run()
+        return self._describe(starts, search, routes, iterations)
+
+    def plan_many(self, vendor_teams: List[List[Tuple[float, float]]], max_workers: int = 1) -> List[Dict]:
+        """
+        Plan the routes of many independent teams.
+
+        Args:
+            vendor_teams: Start points of each team's vendors; a single vendor
+                is a team of one
+            max_workers: Number of worker processes the teams are spread over
+
+        Returns:
+            Plan per team (see plan), in the order given
+        """
+        if max_workers <= 1 or len(vendor_teams) <= 1:
+            return [self.plan(team) for team in vendor_teams]
+        chunk_size = max(1, len(vendor_teams) // (4 * max_workers))
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(self,)) as executor:
+            return list(executor.map(_plan, vendor_teams, chunksize=chunk_size))
+
+    def _describe(self, starts: np.ndarray, search: '_OrienteeringSearch', routes: List[List[int]],
+                  iterations: int) -> Dict:
+        """Visit details of the best routes found."""
+        plans, profits, distances = [], [], []
+        for r, route in enumerate(routes):
+            profile = search.profile(r, route)
+            visits = []
+            position = (float(starts[r, 0]), float(starts[r, 1]))
+            for j, market in enumerate(route):
+                market_position = (float(self.locations[market, 0]), float(self.locations[market, 1]))
+                visits.append({
+                    'market': self.names[market],
+                    'arrival_time': profile['arrival'][j],
+                    'start_time': profile['start'][j],
+                    'duration': profile['end'][j] - profile['start'][j],
+                    'distance': profile['legs'][j],
+                    'expected_profit': profile['profit'][j],
+                    'route': self.dynamics._get_route_waypoints(position, market_position)
+                })
+                position = market_position
+            plans.append(visits)
+            profits.append(sum(profile['profit']))
+            distances.append(profile['distance'])
+
+        visited = {market for route in routes for market in route}
+        return {
+            'routes': plans,
+            'total_profit': sum(profits),
+            'profit_per_vendor': profits,
+            'distance_per_vendor': distances,
+            'unvisited': [name for i, name in enumerate(self.names) if i not in visited],
+            'iterations': iterations
+        }
+
+
+class _OrienteeringSearch:
+    """Iterated local search state for one team."""
+
+    def __init__(self, planner: VendorRoutePlanner, start_distances: np.ndarray):
+        self.planner = planner
+        self.start_distances = start_distances
+        self.num_routes = len(start_distances)
+        self.routes: List[List[int]] = [[] for _ in range(self.num_routes)]
+        self.profiles = [self.profile(r, []) for r in range(self.num_routes)]
+        self.visited = np.zeros(len(planner.names), dtype=bool)
+        # Markets removed by the last shake, kept out of the next insertions
+        self.tabu = np.zeros(len(planner.names), dtype=bool)
+        # Markets out of every vendor's distance budget are never candidates
+        self.unreachable = ~(start_distances <= planner.max_distance).any(axis=0)
+
+    def _leg(self, r: int, previous: Optional[int], market: Any) -> Any:
+        """Distance from the route's previous stop (None for its start) to one or more markets."""
+        if previous is None:
+            return self.start_distances[r, market]
+        return self.planner.distances[previous, market]
+
+    def profile(self, r: int, route: List[int]) -> Dict[str, Any]:
+        """
+        Times, legs and profits of a route's visits.
+
+        Visits that are no longer feasible (after their predecessors moved)
+        are dropped, so the profile always describes a feasible route.
+        """
+        planner = self.planner
+        dynamics = planner.dynamics
+        time, end_of_day = planner.time_window
+        kept, arrivals, starts, ends, legs, profits = [], [], [], [], [], []
+        distance = 0.0
+        previous = None
+        for market in route:
+            leg = float(self._leg(r, previous, market))
+            arrival = time + leg / TRAVEL_SPEED
+            start = max(arrival, planner.opening[market])
+            duration = dynamics._calculate_optimal_visit_duration(planner.markets[market], start)
+            if (start > planner.closing[market] or start + duration > end_of_day
+                    or distance + leg > planner.max_distance):
+                continue
+            kept.append(market)
+            arrivals.append(float(arrival))
+            starts.append(float(start))
+            ends.append(float(start + duration))
+            legs.append(leg)
+            profits.append(float(dynamics._estimate_market_profit(planner.markets[market], start, duration)))
+            distance += leg
+            time = start + duration
+            previous = market
+        route[:] = kept
+        return {'arrival': arrivals, 'start': starts, 'end': ends, 'legs': legs, 'profit': profits,
+                'distance': distance}
+
+    def _insertion_gains(self, r: int, route: List[int], profile: Dict[str, Any], p: int,
+                         candidates: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Evaluate inserting each candidate market at position p of a route.
+
+        All candidates are evaluated at once. The delay an insertion causes
+        is propagated through the rest of the route, updating the later
+        visits' profits and feasibility, until waiting for a market to open
+        absorbs it.
+
+        Returns:
+            Profit gain, added hours (travel and service) and feasibility
+            per candidate
+        """
+        planner = self.planner
+        dynamics = planner.dynamics
+        day_start, end_of_day = planner.time_window
+        previous = route[p - 1] if p else None
+        leg_in = self._leg(r, previous, candidates)
+        start = np.maximum((profile['end'][p - 1] if p else day_start) + leg_in / TRAVEL_SPEED,
+                           planner.opening[candidates])
+        duration = dynamics._visit_durations(planner.size_factors[candidates], start)
+        end = start + duration
+        if p < len(route):
+            extra = leg_in + planner.distances[candidates, route[p]] - profile['legs'][p]
+        else:
+            extra = leg_in
+        feasible = ((start <= planner.closing[candidates]) & (end <= end_of_day) &
+                    (profile['distance'] + extra <= planner.max_distance))
+        gain = dynamics._visit_profits(planner.base_profits[candidates], start, duration)
+
+        # Shift the later visits of the route
+        time = end
+        for j in range(p, len(route) if feasible.any() else p):
+            market = route[j]
+            leg = planner.distances[candidates, market] if j == p else profile['legs'][j]
+            shifted = np.maximum(time + leg / TRAVEL_SPEED, planner.opening[market])
+            shifted_duration = dynamics._visit_durations(planner.size_factors[market], shifted)
+            time = shifted + shifted_duration
+            feasible &= (shifted <= planner.closing[market]) & (time <= end_of_day)
+            gain = gain + dynamics._visit_profits(planner.base_profits[market], shifted,
+                                                  shifted_duration) - profile['profit'][j]
+            if np.all(shifted == profile['start'][j]):
+                break
+        return gain, np.maximum(extra / TRAVEL_SPEED + duration, 1e-9), feasible
+
+    def _best_insertion(self) -> Optional[Tuple[int, int, int]]:
+        """Best (route, position, market) insertion by squared profit gain per added hour."""
+        candidates = np.flatnonzero(~(self.visited | self.tabu | self.unreachable))
+        if not len(candidates):
+            return None
+        best_ratio, best = 0.0, None
+        for r, route in enumerate(self.routes):
+            for p in range(len(route) + 1):
+                gain, added, feasible = self._insertion_gains(r, route, self.profiles[r], p, candidates)
+                ratio = np.where(feasible & (gain > 0), gain ** 2 / added, 0.0)
+                k = int(np.argmax(ratio))
+                if ratio[k] > best_ratio:
+                    best_ratio, best = ratio[k], (r, p, int(candidates[k]))
+        return best
+
+    def _insert_all(self) -> None:
+        """Insert markets until no feasible, profitable insertion is left."""
+        while True:
+            insertion = self._best_insertion()
+            if insertion is None:
+                return
+            r, p, market = insertion
+            route = self.routes[r]
+            route.insert(p, market)
+            planned = list(route)
+            self.profiles[r] = self.profile(r, route)
+            # Repairing the route drops visits made infeasible by rounding; they become available again
+            self.visited[planned] = False
+            self.visited[route] = True
+
+    def _route_profit(self, r: int, route: List[int]) -> Optional[float]:
+        """Profit of a candidate route, or None if any of its visits is infeasible."""
+        candidate = list(route)
+        profile = self.profile(r, candidate)
+        return sum(profile['profit']) if len(candidate) == len(route) else None
+
+    def _improve(self) -> bool:
+        """
+        Apply the first improving replace or relocate move of any route.
+
+        A replace move swaps a visit for an unvisited market (evaluated for
+        all unvisited markets at once), a relocate move moves a visit to
+        another position of its route.
+
+        Returns:
+            Whether a move was applied
+        """
+        candidates = np.flatnonzero(~(self.visited | self.unreachable))
+        for r, route in enumerate(self.routes):
+            current = sum(self.profiles[r]['profit']) + 1e-9
+            for j in range(len(route) if len(candidates) else 0):
+                shortened = route[:j] + route[j + 1:]
+                kept = list(shortened)
+                profile = self.profile(r, kept)
+                if len(kept) != len(shortened):
+                    continue
+                gain, _, feasible = self._insertion_gains(r, shortened, profile, j, candidates)
+                profit = np.where(feasible, sum(profile['profit']) + gain, -np.inf)
+                k = int(np.argmax(profit))
+                if profit[k] > current:
+                    self._replace_route(r, shortened[:j] + [int(candidates[k])] + shortened[j:])
+                    return True
+
+            for j in range(len(route)):
+                for k in range(len(route) + 1):
+                    if k in (j, j + 1):
+                        continue
+                    moved = route[:j] + route[j + 1:]
+                    moved.insert(k if k < j else k - 1, route[j])
+                    profit = self._route_profit(r, moved)
+                    if profit is not None and profit > current:
+                        self._replace_route(r, moved)
+                        return True
+        return False
+
+    def _replace_route(self, r: int, route: List[int]) -> None:
+        """Replace a route and update the visited markets."""
+        self.visited[self.routes[r]] = False
+        self.routes[r] = route
+        self.profiles[r] = self.profile(r, route)
+        self.visited[route] = True
+
+    def _local_search(self) -> None:
+        """
+        Alternate insertions and improving moves until neither changes the routes.
+
+        Markets removed by the last shake are only considered again once
+        the routes have been refilled without them, so the search does not
+        simply restore the routes it shook.
+        """
+        self._insert_all()
+        self.tabu[:] = False
+        self._insert_all()
+        while self._improve():
+            self._insert_all()
+
+    def _shake(self, position: int, size: int) -> None:
+        """Remove `size` consecutive visits from every route, starting at `position`."""
+        for r, route in enumerate(self.routes):
+            if not route:
+                continue
+            removed = {route[(position + k) % len(route)] for k in range(min(size, len(route)))}
+            self.tabu[list(removed)] = True
+            self.routes[r] = [market for market in route if market not in removed]
+            self.profiles[r] = self.profile(r, self.routes[r])
+        self.visited[:] = False
+        for route in self.routes:
+            self.visited[route] = True
+
+    def total_profit(self) -> float:
+        """Expected profit of all current routes."""
+        return sum(sum(profile['profit']) for profile in self.profiles)
+
+    def run(self) -> Tuple[List[List[int]], int]:
+        """
+        Run the iterated local search.
+
+        Returns:
+            Best routes found (market indices per vendor) and the number of
+            iterations run
+        """
+        planner = self.planner
+        self._local_search()
+        best_profit, best_routes = self.total_profit(), [list(route) for route in self.routes]
+
+        # Shake position and size, adapted as in Vansteenwegen et al.
+        position, size = 0, 1
+        max_size = max(1, len(planner.names) // (3 * self.num_routes))
+        iterations, without_improvement = 0, 0
+        while iterations < planner.max_iterations and without_improvement < planner.max_no_improvement:
+            iterations += 1
+            self._shake(position, size)
+            self._local_search()
+            profit = self.total_profit()
+            if profit > best_profit + 1e-9:
+                best_profit, best_routes = profit, [list(route) for route in self.routes]
+                size, without_improvement = 1, 0
+            else:
+                without_improvement += 1
+                shortest = min(len(route) for route in self.routes)
+                position += size
+                size += 1
+                if shortest and position >= shortest:
+                    position %= shortest
+                if size > max_size:
+                    size = 1
+        return best_routes, iterations
+
+
+def _init_worker(planner: VendorRoutePlanner) -> None:
+    """Store the planner in a worker process, so it is sent once per worker."""
+    global _worker_planner
+    _worker_planner = planner
+
+
+def _plan(vendor_locations: List[Tuple[float, float]]) -> Dict:
+    """Plan the routes of one team in a worker process."""
+    return _worker_planner.plan(vendor_locations)
@@ -177,11 +177,13 @@ class ScenarioCache:
                     )
                     
                     # Apply to network
-                    disrupted_network = disruption_simulator.apply_disruption_to_network(disruption)
+                    disrupted_network = disruption_simulator.apply_disruption_to_network(
+                        disruption, materialize=False
+                    )
                     
                     # Calculate metrics using resilience calculator
                     from models.resilience_metrics import ResilienceCalculator
-                    calculator = ResilienceCalculator(network_optimizer)
+                    calculator = ResilienceCalculator(network_optimizer, scenario_cache=self)
                     impact = calculator.calculate_disruption_impact(disrupted_network)
                     
                     # Combine results
@@ -230,11 +232,13 @@ class ScenarioCache:
             )
             
             # Apply to network
-            disrupted_network = disruption_simulator.apply_disruption_to_network(disruption)
+            disrupted_network = disruption_simulator.apply_disruption_to_network(
+                disruption, materialize=False
+            )
             
             # Calculate metrics using resilience calculator
             from models.resilience_metrics import ResilienceCalculator
-            calculator = ResilienceCalculator(network_optimizer)
+            calculator = ResilienceCalculator(network_optimizer, scenario_cache=self)
             impact = calculator.calculate_disruption_impact(disrupted_network)
             
             # Combine results
@@ -0,0 +1,28 @@
+"""
+Synthetic networks shared by the resilience, contingency and recovery tests
+"""
+
+import numpy as np
+from backend.models.network_optimizer import SupplyChainNetworkOptimizer
+
+
+def build_ring_network(num_facilities, num_demand_points, num_shortcuts, seed, suppliers_per_demand_point=1):
+    """Strongly connected network: a two-way ring of facilities with demand points and shortcuts"""
+    rng = np.random.default_rng(seed)
+    optimizer = SupplyChainNetworkOptimizer()
+    for i in range(num_facilities):
+        optimizer.add_facility(f"F{i}", (rng.uniform(-4, 4), rng.uniform(34, 41)), 500, 1000)
+    for i in range(num_facilities):
+        j = (i + 1) % num_facilities
+        optimizer.add_route(f"RF{i}", f"F{i}", f"F{j}", 100, 2.0)
+        optimizer.add_route(f"RB{i}", f"F{j}", f"F{i}", 100, 2.0)
+    for i in range(num_demand_points):
+        optimizer.add_demand_point(f"D{i}", (rng.uniform(-4, 4), rng.uniform(34, 41)), 50, 10)
+        for k, facility in enumerate(rng.choice(num_facilities, size=suppliers_per_demand_point, replace=False)):
+            optimizer.add_route(f"RD{i}_{k}", f"F{facility}", f"D{i}", 20, 0.5)
+            optimizer.add_route(f"RR{i}_{k}", f"D{i}", f"F{facility}", 20, 0.5)
+    for i in range(num_shortcuts):
+        u, v = rng.integers(num_facilities, size=2)
+        if u != v:
+            optimizer.add_route(f"RS{i}", f"F{u}", f"F{v}", 300, 5.0)
+    return optimizer
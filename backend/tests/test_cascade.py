@@ -0,0 +1,110 @@
+"""
+Unit tests for cascading failure simulation
+"""
+
+import unittest
+import networkx as nx
+from backend.models.cascade import CascadeEngine
+from backend.models.disruption import DisruptionSimulator, DisruptionOverlay
+
+
+class TestCascadeEngine(unittest.TestCase):
+    """Test cases for flow redistribution after failures"""
+
+    def setUp(self):
+        """Set up a port feeding a retailer through two warehouses"""
+        self.graph = nx.DiGraph()
+        self.graph.add_node("Mombasa_Port", pos=(-4.0435, 39.6682))
+        self.graph.add_node("Nairobi_WH", pos=(-1.2921, 36.8219))
+        self.graph.add_node("Thika_WH", pos=(-1.0333, 37.0693))
+        self.graph.add_node("Nyeri_Retail", pos=(-0.4201, 36.9476))
+        self.graph.add_edge("Mombasa_Port", "Nairobi_WH", route_id="R1", flow=50)
+        self.graph.add_edge("Mombasa_Port", "Thika_WH", route_id="R2", flow=50)
+        self.graph.add_edge("Nairobi_WH", "Nyeri_Retail", route_id="R3", flow=50)
+        self.graph.add_edge("Thika_WH", "Nyeri_Retail", route_id="R4", flow=50)
+
+    def _fail(self, node_id):
+        """Overlay in which a node has no capacity left"""
+        overlay = DisruptionOverlay(self.graph)
+        overlay.node_changes[node_id] = {"disruption_impact": 1.0}
+        return overlay
+
+    def test_no_disruption_keeps_flows(self):
+        """Test that an undisrupted network stays balanced"""
+        result = CascadeEngine(self.graph).run()
+
+        self.assertTrue(result["converged"])
+        self.assertEqual(result["failed_nodes"], [])
+        self.assertEqual(result["failed_edges"], [])
+        self.assertAlmostEqual(result["demand_served_fraction"], 1.0)
+        self.assertAlmostEqual(result["edge_flows"][("Mombasa_Port", "Thika_WH")], 50)
+
+    def test_rerouted_flow_overloads_neighbour(self):
+        """Test that a failure cascades onto the overloaded alternative path"""
+        result = CascadeEngine(self.graph, tolerance=0.2).run(self._fail("Nairobi_WH"))
+
+        self.assertTrue(result["converged"])
+        self.assertCountEqual(result["failed_nodes"], ["Nairobi_WH", "Thika_WH"])
+        self.assertAlmostEqual(result["demand_served_fraction"], 0.0)
+        self.assertEqual(result["steps"][0]["failed_nodes"], 1)
+        self.assertEqual(result["steps"][1]["failed_nodes"], 1)
+
+    def test_spare_capacity_absorbs_rerouted_flow(self):
+        """Test that enough spare capacity stops the cascade"""
+        result = CascadeEngine(self.graph, tolerance=1.5).run(self._fail("Nairobi_WH"))
+
+        self.assertEqual(result["failed_nodes"], ["Nairobi_WH"])
+        self.assertAlmostEqual(result["demand_served_fraction"], 1.0)
+        self.assertAlmostEqual(result["edge_flows"][("Thika_WH", "Nyeri_Retail")], 100)
+        self.assertEqual(len(result["steps"]), 1)
+
+    def test_declared_capacity_limits_routes(self):
+        """Test that declared route capacities override the tolerance"""
+        self.graph.edges["Mombasa_Port", "Thika_WH"]["capacity"] = 80
+        result = CascadeEngine(self.graph, tolerance=1.5).run(self._fail("Nairobi_WH"))
+
+        self.assertIn(("Mombasa_Port", "Thika_WH"), result["failed_edges"])
+        self.assertAlmostEqual(result["demand_served_fraction"], 0.0)
+
+    def test_flows_by_route_id(self):
+        """Test that initial flows can be passed by route ID"""
+        for _, _, data in self.graph.edges(data=True):
+            del data["flow"]
+        flows = {"R1": 30, "R2": 70, "R3": 30, "R4": 70}
+        engine = CascadeEngine(self.graph, flows=flows)
+
+        self.assertAlmostEqual(engine.demand.sum(), 100)
+        result = engine.run(self._fail("Thika_WH"))
+        self.assertAlmostEqual(result["demand_served_fraction"], 0.0)
+        self.assertIn("Nairobi_WH", result["failed_nodes"])
+
+
+class TestSimulateCascade(unittest.TestCase):
+    """Test cases for cascades driven by disruption scenarios"""
+
+    def test_simulator_runs_cascade(self):
+        """Test that a local disruption reduces served demand"""
+        graph = nx.DiGraph()
+        graph.add_node("Port", pos=(0.0, 0.0))
+        graph.add_node("Hub_A", pos=(1.0, 1.0))
+        graph.add_node("Hub_B", pos=(10.0, 10.0))
+        graph.add_node("Market", pos=(5.0, 5.0))
+        graph.add_edge("Port", "Hub_A", flow=50)
+        graph.add_edge("Port", "Hub_B", flow=50)
+        graph.add_edge("Hub_A", "Market", flow=50)
+        graph.add_edge("Hub_B", "Market", flow=50)
+
+        simulator = DisruptionSimulator(graph)
+        result = simulator.simulate_cascade({
+            "epicenter": (1.0, 1.0),
+            "severity": 1.0,
+            "geographical_spread": 0.5
+        })
+
+        self.assertIn("Hub_A", result["failed_nodes"])
+        self.assertLess(result["demand_served_fraction"], 1.0)
+        self.assertNotIn("disruption_impact", graph.nodes["Hub_A"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+"""
+Unit tests for the compact graph representation
+"""
+
+import unittest
+import numpy as np
+import networkx as nx
+from backend.models.compact_graph import CompactGraph
+from backend.models.network_optimizer import SupplyChainNetworkOptimizer
+
+
+class TestCompactGraph(unittest.TestCase):
+    """Test cases for CompactGraph class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.optimizer = SupplyChainNetworkOptimizer()
+        self.optimizer.add_facility("F1", (-1.29, 36.82), 1000, 5000, 3)
+        self.optimizer.add_facility("F2", (-0.30, 36.08), 600, 3000, 2)
+        self.optimizer.add_demand_point("D1", (-1.31, 36.85), 300, 60)
+        self.optimizer.add_route("R1", "F1", "F2", 160, 3.0, "road")
+        self.optimizer.add_route("R2", "F1", "D1", 10, 0.5, "road")
+        self.optimizer.add_route("R3", "F2", "D1", 120, 2.0, "rail")
+
+    def test_kept_in_sync_with_network_graph(self):
+        """Test that the compact view mirrors nodes, edges and attributes"""
+        compact = self.optimizer.compact_graph
+
+        self.assertEqual(compact.node_ids, list(self.optimizer.network_graph.nodes))
+        self.assertEqual(compact.num_edges, self.optimizer.network_graph.number_of_edges())
+        np.testing.assert_array_equal(compact.node_column("capacity")[:2], [1000, 600])
+        self.assertTrue(np.isnan(compact.node_column("capacity")[2]))
+        np.testing.assert_array_equal(compact.edge_column("transit_time"), [3.0, 0.5, 2.0])
+        self.assertEqual(compact.edge_route_ids, ["R1", "R2", "R3"])
+
+    def test_csr_adjacency(self):
+        """Test CSR adjacency against NetworkX successors"""
+        compact = self.optimizer.compact_graph
+        indptr, indices, edge_ids = compact.csr()
+
+        for node_id, idx in compact.node_index.items():
+            successors = {compact.node_ids[j] for j in indices[indptr[idx]:indptr[idx + 1]]}
+            self.assertEqual(successors, set(self.optimizer.network_graph.successors(node_id)))
+
+        weights = compact.to_sparse("distance")
+        self.assertEqual(weights[compact.node_index["F1"], compact.node_index["D1"]], 10)
+
+    def test_growth_and_from_networkx(self):
+        """Test that columns grow past the initial capacity and match a converted graph"""
+        graph = nx.DiGraph()
+        for i in range(200):
+            graph.add_node(i, capacity=float(i), pos=(0.0, float(i)))
+        for i in range(199):
+            graph.add_edge(i, i + 1, cost=2.0 * i)
+
+        incremental = CompactGraph(initial_capacity=4)
+        for node_id, data in graph.nodes(data=True):
+            incremental.add_node(node_id, **data)
+        for u, v, data in graph.edges(data=True):
+            incremental.add_edge(u, v, **data)
+        converted = CompactGraph.from_networkx(graph)
+
+        for compact in (incremental, converted):
+            np.testing.assert_array_equal(compact.node_column("capacity"), np.arange(200.0))
+            np.testing.assert_array_equal(compact.node_column("lon"), np.arange(200.0))
+            np.testing.assert_array_equal(compact.degree()[[0, 100, 199]], [1, 2, 1])
+
+    def test_state_metrics_use_updated_attributes(self):
+        """Test that state helpers reflect attribute updates made through the optimizer"""
+        self.optimizer.update_node_attributes("F1", utilization=0.95)
+        self.optimizer.update_node_attributes("F2", utilization=0.5)
+        self.optimizer.update_node_attributes("D1", demand=100, fulfilled=80)
+        self.optimizer.update_edge_attributes("F1", "F2", flow=40)
+        self.optimizer.update_edge_attributes("F1", "D1", flow=60)
+
+        self.assertEqual(self.optimizer._identify_bottlenecks(), ["F1"])
+        self.assertAlmostEqual(self.optimizer._calculate_throughput(), 100.0)
+        self.assertAlmostEqual(self.optimizer._calculate_resource_utilization(), 1.45 / 3)
+        self.assertAlmostEqual(self.optimizer._calculate_stockout_rate(), 0.2)
+        self.assertAlmostEqual(self.optimizer._calculate_cost_per_unit(), (240 + 15 + 180) / 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,196 @@
+"""
+Unit tests for N-k contingency analysis
+"""
+
+import itertools
+import json
+import os
+import tempfile
+import unittest
+import networkx as nx
+from backend.models.network_optimizer import SupplyChainNetworkOptimizer
+from backend.models.resilience_metrics import ResilienceCalculator
+from backend.models.contingency import ContingencyAnalyzer
+from backend.tests.network_builders import build_ring_network
+
+
+class InterruptedAnalyzer(ContingencyAnalyzer):
+    """Analyzer that stops after a number of evaluated blocks"""
+
+    def __init__(self, *args, blocks_before_stop=0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.blocks_left = blocks_before_stop
+
+    def evaluate_block(self, block):
+        if self.blocks_left == 0:
+            raise KeyboardInterrupt
+        self.blocks_left -= 1
+        return super().evaluate_block(block)
+
+
+class TestContingencyAnalyzer(unittest.TestCase):
+    """Test cases for facility and route outage sets"""
+
+    def setUp(self):
+        """Set up two facilities sharing one of three demand points"""
+        self.optimizer = SupplyChainNetworkOptimizer()
+        self.optimizer.add_facility("Mombasa_Port", (-4.0435, 39.6682), 200, 8000)
+        self.optimizer.add_facility("Nairobi_DC", (-1.2921, 36.8219), 100, 5000)
+        self.optimizer.add_demand_point("Malindi_D1", (-3.2192, 40.1169), 100, 20)
+        self.optimizer.add_demand_point("Nakuru_D1", (-0.3031, 36.0800), 100, 20)
+        self.optimizer.add_demand_point("Thika_D1", (-1.0333, 37.0693), 100, 20)
+        self.optimizer.add_route("R1", "Mombasa_Port", "Malindi_D1", 120, 2.0)
+        self.optimizer.add_route("R2", "Nairobi_DC", "Nakuru_D1", 160, 3.0)
+        self.optimizer.add_route("R3", "Mombasa_Port", "Thika_D1", 440, 7.0)
+        self.optimizer.add_route("R4", "Nairobi_DC", "Thika_D1", 45, 1.0)
+        self.calculator = ResilienceCalculator(self.optimizer)
+
+    def test_single_outages(self):
+        """Test that outages cutting off a demand point break service"""
+        result = self.calculator.analyze_contingencies(max_k=1)
+
+        self.assertAlmostEqual(result["baseline_served"], 300)
+        failing = sorted(tuple(s["facilities"] + s["routes"]) for s in result["failing_sets"])
+        self.assertEqual(failing, [("Mombasa_Port",), ("Nairobi_DC",), ("R1",), ("R2",)])
+        self.assertAlmostEqual(result["worst"][0]["demand_lost"], 100)
+        self.assertEqual(result["levels"][0]["evaluated"], 6)
+
+    def test_supersets_of_failing_sets_are_pruned(self):
+        """Test that only minimal outage sets are reported"""
+        result = self.calculator.analyze_contingencies(max_k=3)
+
+        failing = [set(s["facilities"] + s["routes"]) for s in result["failing_sets"]]
+        self.assertIn({"R3", "R4"}, failing)
+        for first, second in itertools.permutations(failing, 2):
+            self.assertFalse(first < second)
+
+        # Only R3 and R4 remain as candidates, so no 3-element set exists
+        self.assertEqual(result["levels"][1]["evaluated"], 1)
+        self.assertEqual(result["levels"][2]["candidates"], 0)
+
+    def test_capacitated_served_demand(self):
+        """Test that facility capacities limit the served demand"""
+        analyzer = ContingencyAnalyzer(self.optimizer.compact_graph, list(self.optimizer.facilities),
+                                       capacitated=True)
+        self.assertAlmostEqual(analyzer.baseline_served, 300)
+
+        # Without R3, Nairobi_DC must serve two demand points with capacity 100
+        r3 = analyzer.num_facilities + 2
+        self.assertAlmostEqual(analyzer.served_demand((r3,)), 200)
+        self.assertEqual(analyzer.describe((r3,)), {"facilities": [], "routes": ["R3"]})
+
+        reachability = ContingencyAnalyzer(self.optimizer.compact_graph, list(self.optimizer.facilities))
+        self.assertAlmostEqual(reachability.served_demand((r3,)), 300)
+
+    def test_resume_within_first_level(self):
+        """Test that single outages found before an interruption do not shrink their own level"""
+        facilities = list(self.optimizer.facilities)
+        analyzer = ContingencyAnalyzer(self.optimizer.compact_graph, facilities)
+        expected = analyzer.run(max_k=2, block_size=2)
+
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint = os.path.join(directory, "contingency.json")
+            interrupted = InterruptedAnalyzer(self.optimizer.compact_graph, facilities, blocks_before_stop=1)
+            with self.assertRaises(KeyboardInterrupt):
+                interrupted.run(max_k=2, block_size=2, checkpoint_file=checkpoint)
+            with open(checkpoint, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            self.assertEqual((state["level"], state["blocks_done"]), (1, 1))
+            self.assertTrue(state["failing"])
+
+            resumed = analyzer.run(max_k=2, block_size=2, checkpoint_file=checkpoint)
+        self.assertEqual(resumed, expected)
+        self.assertEqual(resumed["levels"][0]["candidates"], 6)
+
+    def test_invalid_arguments(self):
+        """Test that invalid settings are rejected"""
+        with self.assertRaises(ValueError):
+            self.calculator.analyze_contingencies(max_k=0)
+        with self.assertRaises(ValueError):
+            self.calculator.analyze_contingencies(loss_threshold=1.0)
+
+
+class TestContingencyRuns(unittest.TestCase):
+    """Test cases for enumeration, sampling, parallelism and checkpointing"""
+
+    def setUp(self):
+        """Set up a ring network where demand points have two suppliers"""
+        self.optimizer = build_ring_network(8, 10, 3, seed=3, suppliers_per_demand_point=2)
+        self.facilities = list(self.optimizer.facilities)
+        self.analyzer = ContingencyAnalyzer(self.optimizer.compact_graph, self.facilities)
+        self.directory = tempfile.TemporaryDirectory()
+        self.checkpoint = os.path.join(self.directory.name, "contingency.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_served_demand_matches_networkx(self):
+        """Test the reachability kernel against graph copies"""
+        graph = self.optimizer.network_graph
+        route_edges = {data["route_id"]: (u, v) for u, v, data in graph.edges(data=True)}
+        for elements in itertools.combinations(range(self.analyzer.num_elements), 2):
+            outage = self.analyzer.describe(elements)
+            copy = graph.copy()
+            copy.remove_edges_from(route_edges[r] for r in outage["routes"])
+            copy.remove_nodes_from(outage["facilities"])
+            reached = set()
+            for facility in self.facilities:
+                if facility in copy:
+                    reached |= nx.descendants(copy, facility)
+            expected = sum(d["demand_mean"] for d_id, d in self.optimizer.demand_points.items()
+                           if d_id in reached)
+            self.assertAlmostEqual(self.analyzer.served_demand(elements), expected)
+
+    def test_worst_sets_ranked(self):
+        """Test that the worst list is ordered by lost demand"""
+        result = self.analyzer.run(max_k=2, top_n=10)
+        lost = [entry["demand_lost"] for entry in result["worst"]]
+        self.assertEqual(len(lost), 10)
+        self.assertEqual(lost, sorted(lost, reverse=True))
+        self.assertEqual(result["levels"][1]["evaluated"] + result["levels"][1]["pruned"],
+                         result["levels"][1]["candidates"])
+
+    def test_sampled_levels_are_reproducible(self):
+        """Test that large levels are sampled deterministically"""
+        first = self.analyzer.run(max_k=3, sample_size=500, seed=11)
+        second = self.analyzer.run(max_k=3, sample_size=500, seed=11)
+
+        self.assertFalse(first["levels"][0]["sampled"])
+        self.assertTrue(first["levels"][2]["sampled"])
+        self.assertLessEqual(first["levels"][2]["evaluated"], 500)
+        self.assertEqual(first, second)
+
+    def test_parallel_matches_serial(self):
+        """Test that a process pool gives the same result"""
+        serial = self.analyzer.run(max_k=2, block_size=200)
+        parallel = self.analyzer.run(max_k=2, block_size=200, max_workers=2)
+        self.assertEqual(parallel, serial)
+
+    def test_resume_from_checkpoint(self):
+        """Test that an interrupted run resumes to the same result"""
+        expected = self.analyzer.run(max_k=2, block_size=200)
+
+        interrupted = InterruptedAnalyzer(self.optimizer.compact_graph, self.facilities,
+                                          blocks_before_stop=3)
+        with self.assertRaises(KeyboardInterrupt):
+            interrupted.run(max_k=2, block_size=200, checkpoint_file=self.checkpoint)
+        with open(self.checkpoint, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        self.assertEqual((state["level"], state["blocks_done"]), (2, 2))
+
+        resumed = self.analyzer.run(max_k=2, block_size=200, checkpoint_file=self.checkpoint)
+        self.assertEqual(resumed, expected)
+
+        # Finished checkpoints are returned without evaluating anything
+        finished = InterruptedAnalyzer(self.optimizer.compact_graph, self.facilities)
+        self.assertEqual(finished.run(max_k=2, block_size=200, checkpoint_file=self.checkpoint), expected)
+
+    def test_checkpoint_for_other_settings_rejected(self):
+        """Test that a checkpoint is only resumed by the same run"""
+        self.analyzer.run(max_k=1, checkpoint_file=self.checkpoint)
+        with self.assertRaises(ValueError):
+            self.analyzer.run(max_k=2, checkpoint_file=self.checkpoint)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,363 @@
+"""
+Unit tests for disruption simulation
+"""
+
+import os
+import tempfile
+import time
+import unittest
+import numpy as np
+import networkx as nx
+from backend.models.disruption import DisruptionSimulator, DisruptionOverlay, read_monte_carlo_spill
+
+
+class TestDisruptionOverlay(unittest.TestCase):
+    """Test cases for applying disruptions without copying the network"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.graph = nx.DiGraph()
+        self.graph.add_node("Nairobi_DC", pos=(-1.2921, 36.8219), capacity=1000, fixed_cost=5000)
+        self.graph.add_node("Thika_WH", pos=(-1.0333, 37.0693), capacity=400, fixed_cost=2000)
+        self.graph.add_node("Mombasa_Port", pos=(-4.0435, 39.6682), capacity=2000, fixed_cost=8000)
+        self.graph.add_node("Nairobi_D1", pos=(-1.3098, 36.8537))
+        self.graph.add_edge("Nairobi_DC", "Nairobi_D1", transit_time=0.5, capacity=300)
+        self.graph.add_edge("Mombasa_Port", "Nairobi_DC", transit_time=8.0)
+        self.graph.add_edge("Mombasa_Port", "Thika_WH", transit_time=7.0)
+
+        self.simulator = DisruptionSimulator(self.graph)
+        self.scenario = {
+            "epicenter": (-1.2921, 36.8219),
+            "severity": 0.8,
+            "geographical_spread": 0.3
+        }
+
+    def test_overlay_stores_only_changes(self):
+        """Test that the overlay leaves the base graph untouched"""
+        overlay = self.simulator.apply_disruption_to_network(self.scenario, materialize=False)
+
+        self.assertIsInstance(overlay, DisruptionOverlay)
+        self.assertIs(overlay.base_graph, self.graph)
+        self.assertEqual(set(overlay.node_changes), {"Nairobi_DC", "Thika_WH", "Nairobi_D1"})
+        self.assertEqual(set(overlay.node_changes["Nairobi_DC"]),
+                         {"capacity", "fixed_cost", "disruption_impact"})
+        self.assertNotIn("Mombasa_Port", overlay.node_changes)
+        self.assertEqual(self.graph.nodes["Nairobi_DC"]["capacity"], 1000)
+        self.assertNotIn("disruption_impact", self.graph.nodes["Nairobi_DC"])
+
+        self.assertAlmostEqual(overlay.node_attributes("Nairobi_DC")["capacity"], 200)
+        self.assertAlmostEqual(overlay.edge_attributes("Nairobi_DC", "Nairobi_D1")["transit_time"], 0.5 * 1.96)
+        self.assertEqual(overlay.node_attributes("Mombasa_Port"), self.graph.nodes["Mombasa_Port"])
+
+        thika_impact = overlay.node_impact("Thika_WH")
+        self.assertAlmostEqual(overlay.total_node_capacity(), 2000 + 200 + 400 * (1 - thika_impact))
+
+    def test_materialize_matches_graph_copy(self):
+        """Test that the materialized network records original values"""
+        graph = self.simulator.apply_disruption_to_network(self.scenario)
+
+        self.assertIsNot(graph, self.graph)
+        node = graph.nodes["Nairobi_DC"]
+        self.assertEqual(node["original_capacity"], 1000)
+        self.assertAlmostEqual(node["capacity"], 200)
+        self.assertEqual(node["original_fixed_cost"], 5000)
+        self.assertAlmostEqual(node["fixed_cost"], 7000)
+        self.assertAlmostEqual(node["disruption_impact"], 0.8)
+
+        edge = graph.edges["Nairobi_DC", "Nairobi_D1"]
+        self.assertEqual(edge["original_transit_time"], 0.5)
+        self.assertEqual(edge["original_capacity"], 300)
+        self.assertAlmostEqual(edge["capacity"], 300 * (1 - 0.96))
+        self.assertEqual(graph.nodes["Mombasa_Port"], self.graph.nodes["Mombasa_Port"])
+
+        affected_edges = dict(self.scenario["affected_edges"])
+        self.assertAlmostEqual(affected_edges[("Mombasa_Port", "Nairobi_DC")], 0.96)
+        self.assertEqual(len(self.scenario["affected_nodes"]), 3)
+
+
+class TestNodePositions(unittest.TestCase):
+    """Test cases for nodes placed by 'location' instead of 'pos'"""
+
+    def setUp(self):
+        """Set up nodes with 'pos', 'location', both, and neither"""
+        self.graph = nx.DiGraph()
+        self.graph.add_node("Nairobi_DC", location=(-1.2921, 36.8219), capacity=1000)
+        self.graph.add_node("Thika_WH", pos=(-1.0333, 37.0693), capacity=400)
+        self.graph.add_node("Mombasa_Port", pos=(-4.0435, 39.6682), location=(-1.3, 36.8), capacity=2000)
+        self.graph.add_node("Unplaced", capacity=500)
+        self.graph.add_edge("Mombasa_Port", "Nairobi_DC", transit_time=8.0)
+        self.graph.add_edge("Nairobi_DC", "Unplaced", transit_time=1.0)
+        self.simulator = DisruptionSimulator(self.graph)
+        self.scenario = {"epicenter": (-1.2921, 36.8219), "severity": 0.8, "geographical_spread": 0.3}
+
+    def test_position_fallback(self):
+        """Test that 'pos' takes precedence over 'location'"""
+        nodes = self.graph.nodes
+        self.assertEqual(DisruptionSimulator.node_position(nodes["Nairobi_DC"]), (-1.2921, 36.8219))
+        self.assertEqual(DisruptionSimulator.node_position(nodes["Mombasa_Port"]), (-4.0435, 39.6682))
+        self.assertIsNone(DisruptionSimulator.node_position(nodes["Unplaced"]))
+
+    def test_disruptions_reach_located_nodes(self):
+        """Test that single and batched disruptions affect nodes placed by 'location'"""
+        overlay = self.simulator.apply_disruption_to_network(self.scenario, materialize=False)
+        self.assertAlmostEqual(overlay.node_impact("Nairobi_DC"), 0.8)
+        self.assertNotIn("Mombasa_Port", overlay.node_changes)
+        self.assertNotIn("Unplaced", overlay.node_changes)
+
+        batch = self.simulator.batch_disruption_impact([self.scenario["epicenter"]], 0.8, 0.3)
+        impacts = dict(zip(batch["node_ids"], batch["node_impact"][0]))
+        self.assertEqual(impacts, {node_id: overlay.node_impact(node_id) for node_id in self.graph})
+
+    def test_generated_epicenters_use_located_nodes(self):
+        """Test that random epicenters come from 'location' when 'pos' is missing"""
+        positions = {(-1.2921, 36.8219), (-1.0333, 37.0693), (-4.0435, 39.6682),
+                     DisruptionSimulator.DEFAULT_EPICENTER}
+        epicenters = {tuple(self.simulator.generate_disruption_scenario("pandemic")["epicenter"])
+                      for _ in range(50)}
+        self.assertLessEqual(epicenters, positions)
+        self.assertIn((-1.2921, 36.8219), epicenters)
+
+        scenarios = self.simulator.monte_carlo_simulation(200, 365, 0.02, seed=3)
+        epicenters = {tuple(d["epicenter"]) for s in scenarios for d in s["disruptions"]}
+        self.assertLessEqual(epicenters, positions)
+        self.assertIn((-1.2921, 36.8219), epicenters)
+
+
+class TestBatchDisruptionImpact(unittest.TestCase):
+    """Test cases for vectorized multi-scenario impact computation"""
+
+    def setUp(self):
+        """Set up a random network with positions"""
+        rng = np.random.default_rng(11)
+        self.graph = nx.DiGraph()
+        for i in range(200):
+            pos = (rng.uniform(-4, 4), rng.uniform(34, 41))
+            if i % 10 == 0:
+                self.graph.add_node(f"N{i}")
+            else:
+                self.graph.add_node(f"N{i}", pos=pos, capacity=rng.uniform(100, 1000))
+        for _ in range(600):
+            u, v = rng.integers(0, 200, size=2)
+            if u != v:
+                self.graph.add_edge(f"N{u}", f"N{v}", transit_time=1.0)
+        self.simulator = DisruptionSimulator(self.graph)
+        self.rng = rng
+
+    def test_matches_single_scenario(self):
+        """Test that batch impacts equal apply_disruption_to_network results"""
+        epicenters = np.column_stack([self.rng.uniform(-4, 4, 20), self.rng.uniform(34, 41, 20)])
+        severities = self.rng.uniform(0.2, 1.0, 20)
+        spreads = self.rng.choice([0.2, 0.5, 0.8], 20)
+
+        batch = self.simulator.batch_disruption_impact(epicenters, severities, spreads, chunk_size=7)
+        node_index = {n: i for i, n in enumerate(batch["node_ids"])}
+        edge_index = {e: i for i, e in enumerate(batch["edges"])}
+
+        for s in range(20):
+            scenario = {"epicenter": tuple(epicenters[s]), "severity": severities[s],
+                        "geographical_spread": spreads[s]}
+            overlay = self.simulator.apply_disruption_to_network(scenario, materialize=False)
+
+            expected_nodes = np.zeros(len(node_index))
+            for node_id, impact in overlay.node_impacts().items():
+                expected_nodes[node_index[node_id]] = impact
+            expected_edges = np.zeros(len(edge_index))
+            for edge, impact in overlay.edge_impacts().items():
+                expected_edges[edge_index[edge]] = impact
+
+            np.testing.assert_allclose(batch["node_impact"][s], expected_nodes)
+            np.testing.assert_allclose(batch["edge_impact"][s], expected_edges)
+            capacity = self.simulator._node_arrays()[2]
+            self.assertAlmostEqual(batch["capacity_loss"][s],
+                                   capacity.sum() - overlay.total_node_capacity())
+
+    def test_ten_thousand_scenarios(self):
+        """Test that 10k scenarios evaluate in one call"""
+        epicenters = np.column_stack([self.rng.uniform(-4, 4, 10000), self.rng.uniform(34, 41, 10000)])
+
+        start_time = time.perf_counter()
+        batch = self.simulator.batch_disruption_impact(epicenters, 0.7, 0.5)
+        elapsed = time.perf_counter() - start_time
+
+        self.assertEqual(batch["node_impact"].shape, (10000, 200))
+        self.assertEqual(batch["edge_impact"].shape, (10000, len(batch["edges"])))
+        self.assertTrue((batch["node_impact"][:, ::10] == 0).all())
+        self.assertLess(elapsed, 2.0)
+
+    def test_sweep_matches_batch_capacity_loss(self):
+        """Test that the pruned sweep equals the dense batch capacity loss"""
+        epicenters = np.column_stack([self.rng.uniform(-5, 5, 500), self.rng.uniform(33, 42, 500)])
+
+        batch = self.simulator.batch_disruption_impact(epicenters, 0.9, 0.3)
+        sweep = self.simulator.sweep_capacity_loss(epicenters, 0.9, 0.3, chunk_size=64)
+
+        np.testing.assert_allclose(sweep, batch["capacity_loss"])
+
+    def test_parallel_sweep_matches_serial(self):
+        """Test that spreading the sweep over processes gives the same result"""
+        epicenters = np.column_stack([self.rng.uniform(-4, 4, 300), self.rng.uniform(34, 41, 300)])
+
+        serial = self.simulator.sweep_capacity_loss(epicenters, 0.6, 0.5, chunk_size=100)
+        parallel = self.simulator.sweep_capacity_loss(epicenters, 0.6, 0.5, chunk_size=100, max_workers=2)
+
+        np.testing.assert_allclose(parallel, serial)
+
+
+class TestNetworkResilienceEvaluation(unittest.TestCase):
+    """Test cases for path and connectivity degradation metrics"""
+
+    def setUp(self):
+        """Set up a small grid network with positions"""
+        self.graph = nx.DiGraph()
+        for i in range(4):
+            for j in range(4):
+                self.graph.add_node((i, j), pos=(-1.0 + i, 36.0 + j), capacity=100)
+        for i in range(4):
+            for j in range(4):
+                for di, dj in ((1, 0), (0, 1)):
+                    if i + di < 4 and j + dj < 4:
+                        self.graph.add_edge((i, j), (i + di, j + dj), transit_time=1.0 + i)
+                        self.graph.add_edge((i + di, j + dj), (i, j), transit_time=1.0 + j)
+        self.simulator = DisruptionSimulator(self.graph)
+
+    def test_matches_networkx(self):
+        """Test path increases against per-pair NetworkX shortest paths"""
+        scenario = {"epicenter": (0.0, 37.0), "severity": 0.6, "geographical_spread": 0.3}
+        result = self.simulator.evaluate_network_resilience(self.graph, scenario)
+        disrupted = self.simulator.apply_disruption_to_network(dict(scenario))
+
+        increases = []
+        for u in self.graph:
+            lengths = nx.single_source_dijkstra_path_length(self.graph, u, weight="transit_time")
+            disrupted_lengths = nx.single_source_dijkstra_path_length(disrupted, u, weight="transit_time")
+            increases.extend((disrupted_lengths[v] - d) / d for v, d in lengths.items() if v != u)
+
+        self.assertAlmostEqual(result["avg_path_length_increase"], np.mean(increases))
+        self.assertEqual(result["avg_path_length_increase_error"], 0.0)
+        self.assertEqual(result["connectivity_reduction"], 0.0)
+        self.assertEqual(result["sources_evaluated"], 16)
+        capacities = [disrupted.nodes[n]["capacity"] for n in disrupted]
+        self.assertAlmostEqual(result["avg_capacity_reduction"], 1 - np.mean(capacities) / 100)
+
+    def test_failures_reduce_connectivity(self):
+        """Test sampled connectivity with failed elements and engine reuse"""
+        scenario = {"epicenter": (0.0, 37.0), "severity": 1.0, "geographical_spread": 0.3}
+        exact = self.simulator.evaluate_network_resilience(self.graph, scenario, connectivity_samples=240)
+        engine = self.simulator._path_engine[1]
+
+        disrupted = self.simulator.apply_disruption_to_network(dict(scenario))
+        failed = [(u, v) for u, v, d in disrupted.edges(data=True) if d.get("disruption_impact", 0) >= 1]
+        remaining = nx.restricted_view(self.graph, [], failed)
+        expected = 1 - nx.average_node_connectivity(remaining) / nx.average_node_connectivity(self.graph)
+        self.assertAlmostEqual(exact["connectivity_reduction"], expected)
+        self.assertEqual(exact["connectivity_reduction_error"], 0.0)
+        self.assertGreater(exact["disconnected_pair_fraction"], 0)
+
+        self.simulator.evaluate_network_resilience(self.graph, scenario, connectivity_samples=240)
+        self.assertIs(self.simulator._path_engine[1], engine)
+
+        sampled = self.simulator.evaluate_network_resilience(self.graph, scenario, num_sources=8,
+                                                             connectivity_samples=60, seed=3)
+        self.assertEqual(sampled["sources_evaluated"], 8)
+        self.assertEqual(sampled["connectivity_pairs_evaluated"], 60)
+        self.assertGreater(sampled["connectivity_reduction_error"], 0)
+        self.assertLess(abs(sampled["connectivity_reduction"] - expected),
+                        3 * sampled["connectivity_reduction_error"] + 1e-9)
+
+    def test_engine_rebuilt_after_attribute_changes(self):
+        """Test that in-place transit time and capacity changes refresh the baseline"""
+        scenario = {"epicenter": (0.0, 37.0), "severity": 0.6, "geographical_spread": 0.3}
+        self.simulator.evaluate_network_resilience(self.graph, scenario)
+        engine = self.simulator._path_engine[1]
+
+        self.graph.edges[(0, 0), (1, 0)]["transit_time"] = 10.0
+        self.simulator.evaluate_network_resilience(self.graph, scenario)
+        rebuilt = self.simulator._path_engine[1]
+        self.assertIsNot(rebuilt, engine)
+        expected = nx.single_source_dijkstra_path_length(self.graph, (0, 0), weight="transit_time")
+        self.assertAlmostEqual(rebuilt.original_distances[0][rebuilt.node_index[(1, 0)]], expected[(1, 0)])
+
+        self.graph.nodes[(3, 3)]["capacity"] = 50
+        self.simulator.evaluate_network_resilience(self.graph, scenario)
+        self.assertIsNot(self.simulator._path_engine[1], rebuilt)
+        self.assertEqual(self.simulator._path_engine[1].capacity[-1], 50)
+
+
+class TestMonteCarloSimulation(unittest.TestCase):
+    """Test cases for Monte Carlo disruption simulation"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        graph = nx.DiGraph()
+        graph.add_node("Nairobi_DC", pos=(-1.2921, 36.8219))
+        graph.add_node("Mombasa_Port", pos=(-4.0435, 39.6682))
+        graph.add_node("Unplaced")
+        self.simulator = DisruptionSimulator(graph)
+
+    def test_reproducible_across_worker_counts(self):
+        """Test that a seed gives identical results for any number of workers"""
+        serial = self.simulator.monte_carlo_simulation(2500, 365, 0.02, seed=42)
+        parallel = self.simulator.monte_carlo_simulation(2500, 365, 0.02, seed=42, max_workers=3)
+        other_seed = self.simulator.monte_carlo_simulation(2500, 365, 0.02, seed=43)
+
+        self.assertEqual(serial, parallel)
+        self.assertNotEqual(serial, other_seed)
+        self.assertEqual([s["scenario_id"] for s in serial[:2]], ["montecarlo_0", "montecarlo_1"])
+
+    def test_sampled_disruptions(self):
+        """Test arrival rates, parameter ranges and per-scenario metrics"""
+        scenarios = self.simulator.monte_carlo_simulation(3000, 365, 0.01, seed=7)
+
+        counts = np.array([s["metrics"]["total_disruptions"] for s in scenarios])
+        self.assertAlmostEqual(counts.mean(), 3.65, delta=0.15)
+
+        epicenters = {(-1.2921, 36.8219), (-4.0435, 39.6682), DisruptionSimulator.DEFAULT_EPICENTER}
+        for scenario in scenarios[:200]:
+            disruptions = scenario["disruptions"]
+            metrics = scenario["metrics"]
+            self.assertEqual(metrics["total_disruptions"], len(disruptions))
+            self.assertEqual(metrics["total_duration"], sum(d["duration"] for d in disruptions))
+            self.assertEqual(sum(metrics["disruption_types"].values()), len(disruptions))
+            days = [d["start_day"] for d in disruptions]
+            self.assertEqual(days, sorted(set(days)))
+            for d in disruptions:
+                params = DisruptionSimulator.DISRUPTION_TYPES[d["type"]]
+                self.assertTrue(params["duration_range"][0] <= d["duration"] <= params["duration_range"][1])
+                self.assertTrue(params["severity_range"][0] <= d["severity"] <= params["severity_range"][1])
+                self.assertIn(d["epicenter"], epicenters)
+                self.assertTrue(0 <= d["start_day"] < 365)
+
+        self.assertEqual(self.simulator.current_disruptions, {})
+
+    def test_streaming_with_statistics_and_spill(self):
+        """Test that streaming matches the batch run and aggregates online"""
+        scenarios = self.simulator.monte_carlo_simulation(2500, 365, 0.02, seed=5)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            spill_file = os.path.join(tmp_dir, "scenarios.jsonl.gz")
+            stream = self.simulator.iter_monte_carlo(2500, 365, 0.02, seed=5, spill_file=spill_file)
+            summaries = list(stream)
+            spilled = list(read_monte_carlo_spill(spill_file))
+
+        self.assertEqual(summaries, [{"scenario_id": s["scenario_id"], "metrics": s["metrics"]}
+                                     for s in scenarios])
+        self.assertEqual(len(spilled), 2500)
+        self.assertEqual([s["metrics"] for s in spilled], [s["metrics"] for s in scenarios])
+        self.assertEqual([d["severity"] for s in spilled for d in s["disruptions"]],
+                         [d["severity"] for s in scenarios for d in s["disruptions"]])
+
+        summary = self.simulator.summarize_monte_carlo(2500, 365, 0.02, seed=5, max_workers=2)
+        durations = np.array([s["metrics"]["total_duration"] for s in scenarios], dtype=float)
+        stats = summary["metrics"]["total_duration"]
+
+        self.assertEqual(summary["num_scenarios"], 2500)
+        self.assertAlmostEqual(stats["mean"], durations.mean())
+        self.assertAlmostEqual(stats["variance"], durations.var(ddof=1))
+        self.assertEqual(stats["max"], durations.max())
+        self.assertAlmostEqual(stats["p90"], np.quantile(durations, 0.9), delta=0.02 * durations.max())
+        self.assertEqual(sum(summary["disruption_type_counts"].values()),
+                         sum(s["metrics"]["total_disruptions"] for s in scenarios))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+"""
+Unit tests for informal market demand multipliers and pricing
+"""
+
+import unittest
+import numpy as np
+from datetime import datetime
+from backend.models.informal_market import InformalMarketDynamics
+
+
+class TestDemandMultiplierTables(unittest.TestCase):
+    """Test cases for precomputed demand multipliers"""
+
+    def setUp(self):
+        self.dynamics = InformalMarketDynamics()
+        rng = np.random.default_rng(0)
+        names = list(self.dynamics.market_days) + ["Gikomba", "Unknown_Market"]
+        self.markets = rng.choice(names, 3000)
+        # Three years including the leap year 2024, at minute resolution
+        self.timestamps = (np.datetime64("2023-01-01T00:00") +
+                           rng.integers(0, 3 * 366 * 24 * 60, 3000).astype("timedelta64[m]"))
+
+    def test_matches_scalar_multiplier(self):
+        """Test table lookups against get_demand_multiplier for both market types"""
+        for market_type in ("agricultural", "urban"):
+            multipliers = self.dynamics.get_demand_multipliers(self.markets, self.timestamps, market_type)
+            expected = [self.dynamics.get_demand_multiplier(m, t.astype(datetime), market_type)
+                        for m, t in zip(self.markets, self.timestamps)]
+            np.testing.assert_array_equal(multipliers, expected)
+
+    def test_inputs_broadcast(self):
+        """Test scalars, Python datetimes, integer codes and broadcasting"""
+        monday_peak = datetime(2024, 3, 4, 9, 30)
+        self.assertEqual(self.dynamics.get_demand_multipliers("Gikomba", monday_peak),
+                         self.dynamics.get_demand_multiplier("gikomba", monday_peak))
+
+        grid = self.dynamics.get_demand_multipliers(["kitale", "machakos", "kibuye"],
+                                                    [[monday_peak], [datetime(2024, 12, 31, 23)]])
+        self.assertEqual(grid.shape, (2, 3))
+
+        codes = self.dynamics.market_codes(self.markets)
+        np.testing.assert_array_equal(self.dynamics.get_demand_multipliers(codes, self.timestamps),
+                                      self.dynamics.get_demand_multipliers(self.markets, self.timestamps))
+        self.assertEqual(codes[self.markets == "Unknown_Market"][0], len(self.dynamics.market_days))
+
+    def test_tables_cached_per_schedule(self):
+        """Test that tables are reused until the market days change"""
+        names, table = self.dynamics.demand_multiplier_table(2024)
+        self.assertEqual(table.shape, (len(names) + 1, 366, 24))
+        self.assertIs(self.dynamics.demand_multiplier_table(2024)[1], table)
+
+        self.dynamics.market_days["gikomba"] = [0, 1, 2, 3, 4, 5, 6]
+        tuesday = datetime(2024, 3, 5, 9)
+        self.assertIsNot(self.dynamics.demand_multiplier_table(2024)[1], table)
+        self.assertEqual(self.dynamics.get_demand_multipliers("gikomba", tuesday),
+                         self.dynamics.get_demand_multiplier("gikomba", tuesday))
+
+        # Peak hours and seasons are baked into the tables as well
+        monday = datetime(2024, 3, 4, 9)
+        for change in (lambda: self.dynamics.peak_hours.update(mid_morning=(10, 12)),
+                       lambda: self.dynamics.seasonal_factors["agricultural"]["peak"].remove(3)):
+            table = self.dynamics.demand_multiplier_table(2024)[1]
+            change()
+            self.assertIsNot(self.dynamics.demand_multiplier_table(2024)[1], table)
+            self.assertEqual(self.dynamics.get_demand_multipliers("gikomba", monday),
+                             self.dynamics.get_demand_multiplier("gikomba", monday))
+
+    def test_invalid_market_type(self):
+        """Test that unknown market types are rejected"""
+        with self.assertRaises(ValueError):
+            self.dynamics.get_demand_multipliers("gikomba", datetime(2024, 1, 1), "wholesale")
+
+
+class TestBatchPricing(unittest.TestCase):
+    """Test cases for vectorized catalogue pricing"""
+
+    def setUp(self):
+        self.dynamics = InformalMarketDynamics()
+        rng = np.random.default_rng(1)
+        size = 2000
+        self.categories = rng.choice(list(self.dynamics.product_categories), size)
+        self.markets = rng.choice(list(self.dynamics.market_days) + ["Nyamakima"], size)
+        self.timestamps = (np.datetime64("2023-06-01T00:00") +
+                           rng.integers(0, 800 * 24 * 60, size).astype("timedelta64[m]"))
+        self.base_prices = np.round(rng.uniform(5, 500, size), 2)
+        self.competition = rng.uniform(0, 1, size)
+        self.storage = np.where(rng.random(size) < 0.3, rng.uniform(0, 5, size), 0.0)
+
+    def test_matches_scalar_pricing(self):
+        """Test batch prices against calculate_flexible_pricing item by item"""
+        result = self.dynamics.calculate_flexible_prices(self.base_prices, self.categories, self.markets,
+                                                         self.timestamps, self.competition, self.storage)
+        expected = []
+        for i in range(len(self.base_prices)):
+            category = self.dynamics.product_categories[self.categories[i]]
+            timestamp = self.timestamps[i].astype(datetime)
+            multiplier = self.dynamics.get_demand_multiplier(self.markets[i], timestamp, category["market_type"])
+            expected.append(self.dynamics.calculate_flexible_pricing(
+                self.base_prices[i], multiplier, self.competition[i], category["perishable"],
+                self.storage[i], timestamp.hour))
+        np.testing.assert_array_equal(result["price"], expected)
+        self.assertTrue(result["price_floor"].any())
+        self.assertTrue((result["perishable_discount"] > 0).any())
+
+    def test_discount_breakdown(self):
+        """Test the breakdown of a single late-day perishable item"""
+        result = self.dynamics.calculate_flexible_prices(100.0, ["dairy", "grains"], "gikomba",
+                                                         datetime(2024, 3, 4, 18, 10), 0.5, [0.0, 2.0])
+        np.testing.assert_array_equal(result["perishable_discount"], [0.3, 0.0])
+        np.testing.assert_array_equal(result["storage_cost"], [0.0, 2.0])
+        np.testing.assert_allclose(result["competition_discount"], 0.5 ** 0.7 * 0.3)
+        multiplier = self.dynamics.get_demand_multiplier("gikomba", datetime(2024, 3, 4, 18))
+        np.testing.assert_array_equal(result["demand_multiplier"], multiplier)
+
+    def test_invalid_inputs(self):
+        """Test that invalid prices, competition and categories are rejected"""
+        now = datetime(2024, 3, 4, 9)
+        with self.assertRaises(ValueError):
+            self.dynamics.calculate_flexible_prices([10.0, 0.0], "grains", "gikomba", now)
+        with self.assertRaises(ValueError):
+            self.dynamics.calculate_flexible_prices(10.0, "grains", "gikomba", now, competition_factors=1.5)
+        with self.assertRaises(ValueError):
+            self.dynamics.calculate_flexible_prices(10.0, "electronics", "gikomba", now)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+Unit tests for network flow optimization module
+"""
+
+import unittest
+import numpy as np
+from backend.models.network_flow import NetworkFlowEngine
+
+
+class TestNetworkFlowEngine(unittest.TestCase):
+    """Test cases for NetworkFlowEngine class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        # Warehouse W feeds distributor F, which serves D2; W also serves D1 directly
+        self.facilities = {
+            "W": {"capacity": 500},
+            "F": {"capacity": 150},
+        }
+        self.demand_points = {
+            "D1": {"demand_mean": 200},
+            "D2": {"demand_mean": 300},
+        }
+        self.routes = {
+            "R1": {"origin": "W", "destination": "D1", "cost": 5.0},
+            "R2": {"origin": "W", "destination": "F", "cost": 1.0, "capacity": 100},
+            "R3": {"origin": "F", "destination": "D2", "cost": 1.0},
+            "R4": {"origin": "W", "destination": "D1", "cost": 2.0, "capacity": 120},
+        }
+        self.engine = NetworkFlowEngine(self.facilities, self.demand_points, self.routes)
+
+    def test_throughput_respects_facility_capacity(self):
+        """Test that throughput is limited by demand and facility capacity"""
+        result = self.engine.optimize(solver="ortools")
+
+        # D1 is fully served, D2 only through F's 150 units of capacity
+        self.assertEqual(result["status"], "optimal")
+        self.assertAlmostEqual(result["throughput"], 350.0, places=6)
+        self.assertAlmostEqual(result["demand_fulfilled"]["D1"], 200.0, places=6)
+        self.assertAlmostEqual(result["demand_fulfilled"]["D2"], 150.0, places=6)
+        self.assertAlmostEqual(result["facility_utilization"]["F"], 1.0, places=6)
+
+    def test_minimum_cost_routing(self):
+        """Test that the cheaper parallel route is filled first"""
+        result = self.engine.optimize(solver="ortools")
+
+        self.assertAlmostEqual(result["route_flows"]["R4"], 120.0, places=6)
+        self.assertAlmostEqual(result["route_flows"]["R1"], 80.0, places=6)
+        self.assertIn("F", result["bottleneck_ids"])
+        self.assertIn("R4", result["bottleneck_ids"])
+        self.assertEqual(result["bottlenecks"], len(result["bottleneck_ids"]))
+
+    def test_solvers_agree(self):
+        """Test that the SciPy fallback matches the OR-Tools solution"""
+        ortools_result = self.engine.optimize(solver="ortools")
+        scipy_result = self.engine.optimize(solver="scipy")
+
+        self.assertAlmostEqual(ortools_result["throughput"], scipy_result["throughput"], places=4)
+        self.assertAlmostEqual(ortools_result["total_cost"], scipy_result["total_cost"], places=4)
+
+    def test_large_network_timing(self):
+        """Test that a network with thousands of arcs solves quickly"""
+        rng = np.random.default_rng(42)
+        facilities = {f"F{i}": {"capacity": float(rng.uniform(100, 1000))} for i in range(50)}
+        demand_points = {f"D{i}": {"demand_mean": float(rng.uniform(10, 100))} for i in range(500)}
+        routes = {
+            f"R{k}": {
+                "origin": f"F{rng.integers(50)}",
+                "destination": f"D{rng.integers(500)}",
+                "cost": float(rng.uniform(1, 10)),
+            }
+            for k in range(10000)
+        }
+
+        result = NetworkFlowEngine(facilities, demand_points, routes).optimize()
+
+        self.assertLess(result["execution_time"], 5.0)
+        self.assertLessEqual(result["throughput"], result["total_demand"] + 1e-6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+"""
+Unit tests for bulk network loading
+"""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from backend.models.network_optimizer import SupplyChainNetworkOptimizer
+
+
+class TestNetworkLoader(unittest.TestCase):
+    """Test cases for the bulk loaders on SupplyChainNetworkOptimizer"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.facilities = pd.DataFrame({
+            "facility_id": ["Nairobi_DC", "Nakuru_WH"],
+            "latitude": [-1.2921, -0.3031],
+            "longitude": [36.8219, 36.0800],
+            "capacity": [1000, 600],
+            "fixed_cost": [5000, 3000],
+            "echelon": [3, 2],
+        })
+        self.demand_points = pd.DataFrame({
+            "demand_id": ["Nairobi_D1", "Nakuru_D1"],
+            "latitude": [-1.3098, -0.2833],
+            "longitude": [36.8537, 36.0667],
+            "demand_mean": [300, 200],
+            "demand_std": [60, None],
+        })
+        self.routes = pd.DataFrame({
+            "route_id": ["R1", "R2", "R3"],
+            "origin": ["Nairobi_DC", "Nairobi_DC", "Nakuru_WH"],
+            "destination": ["Nakuru_WH", "Nairobi_D1", "Nakuru_D1"],
+            "distance": [160, 10, 5],
+            "transit_time": [3.0, 0.5, 0.3],
+            "mode": ["rail", None, "road"],
+        })
+
+    def _build_row_by_row(self) -> SupplyChainNetworkOptimizer:
+        """Build the same network with the per-row add methods"""
+        optimizer = SupplyChainNetworkOptimizer()
+        optimizer.add_facility("Nairobi_DC", (-1.2921, 36.8219), 1000, 5000, 3)
+        optimizer.add_facility("Nakuru_WH", (-0.3031, 36.0800), 600, 3000, 2)
+        optimizer.add_demand_point("Nairobi_D1", (-1.3098, 36.8537), 300, 60)
+        optimizer.add_demand_point("Nakuru_D1", (-0.2833, 36.0667), 200)
+        optimizer.add_route("R1", "Nairobi_DC", "Nakuru_WH", 160, 3.0, "rail")
+        optimizer.add_route("R2", "Nairobi_DC", "Nairobi_D1", 10, 0.5)
+        optimizer.add_route("R3", "Nakuru_WH", "Nakuru_D1", 5, 0.3, "road")
+        return optimizer
+
+    def test_bulk_load_matches_add_calls(self):
+        """Test that bulk loading builds the same structures as per-row calls"""
+        bulk = SupplyChainNetworkOptimizer.from_tables(self.facilities, self.demand_points, self.routes)
+        expected = self._build_row_by_row()
+
+        self.assertEqual(bulk.facilities, expected.facilities)
+        self.assertEqual(bulk.demand_points, expected.demand_points)
+        self.assertEqual(bulk.routes, expected.routes)
+        self.assertEqual(dict(bulk.network_graph.nodes(data=True)),
+                         dict(expected.network_graph.nodes(data=True)))
+        self.assertEqual(list(bulk.network_graph.edges(data=True)),
+                         list(expected.network_graph.edges(data=True)))
+
+        self.assertEqual(bulk.compact_graph.node_ids, expected.compact_graph.node_ids)
+        for column in ("capacity", "lat", "lon", "demand_mean"):
+            np.testing.assert_array_equal(bulk.compact_graph.node_column(column),
+                                          expected.compact_graph.node_column(column))
+        np.testing.assert_array_equal(bulk.compact_graph.edge_column("cost"),
+                                      expected.compact_graph.edge_column("cost"))
+
+    def test_load_from_csv(self):
+        """Test loading tables from CSV files"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            paths = {}
+            for name, table in (("facilities", self.facilities),
+                                ("demand_points", self.demand_points),
+                                ("routes", self.routes)):
+                paths[name] = os.path.join(tmp_dir, f"{name}.csv")
+                table.to_csv(paths[name], index=False)
+
+            optimizer = SupplyChainNetworkOptimizer.from_tables(**paths)
+
+        self.assertEqual(optimizer.routes, self._build_row_by_row().routes)
+
+    def test_load_from_parquet(self):
+        """Test loading tables from Parquet files"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            paths = {}
+            for name, table in (("facilities", self.facilities),
+                                ("demand_points", self.demand_points),
+                                ("routes", self.routes)):
+                paths[name] = os.path.join(tmp_dir, f"{name}.parquet")
+                table.to_parquet(paths[name], index=False)
+
+            optimizer = SupplyChainNetworkOptimizer.from_tables(**paths)
+
+        expected = self._build_row_by_row()
+        self.assertEqual(optimizer.facilities, expected.facilities)
+        self.assertEqual(optimizer.demand_points, expected.demand_points)
+        self.assertEqual(optimizer.routes, expected.routes)
+
+    def test_validation_errors(self):
+        """Test that invalid tables are rejected with a descriptive error"""
+        optimizer = SupplyChainNetworkOptimizer()
+
+        with self.assertRaisesRegex(ValueError, "missing required columns"):
+            optimizer.load_facilities(self.facilities.drop(columns=["capacity"]))
+
+        bad_capacity = self.facilities.assign(capacity=[1000, "lots"])
+        with self.assertRaisesRegex(ValueError, "non-numeric"):
+            optimizer.load_facilities(bad_capacity)
+
+        duplicated = pd.concat([self.facilities, self.facilities])
+        with self.assertRaisesRegex(ValueError, "duplicate facility_id"):
+            optimizer.load_facilities(duplicated)
+
+        optimizer.load_facilities(self.facilities)
+        with self.assertRaisesRegex(ValueError, "unknown destination"):
+            optimizer.load_routes(self.routes)
+
+
+if __name__ == "__main__":
+    unittest.main()
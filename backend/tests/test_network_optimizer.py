@@ -0,0 +1,132 @@
+"""
+Unit tests for the supply chain network optimizer
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+import numpy as np
+from backend.models.network_optimizer import SupplyChainNetworkOptimizer, _get_model_pool
+
+
+class SlowInventoryOptimizer(SupplyChainNetworkOptimizer):
+    """Optimizer whose inventory model records its process and never finishes in time"""
+
+    pid_file = None
+
+    def _run_inventory_optimization(self):
+        with open(self.pid_file, "w") as f:
+            f.write(str(os.getpid()))
+        time.sleep(60)
+        return {}
+
+
+class TestSupplyChainNetworkOptimizer(unittest.TestCase):
+    """Test cases for SupplyChainNetworkOptimizer class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.optimizer = SupplyChainNetworkOptimizer()
+        self.optimizer.add_facility("F1", (-1.2921, 36.8219), 1000, 5000, 3)
+        self.optimizer.add_facility("F2", (-0.3031, 36.0800), 600, 3000, 2)
+        self.optimizer.add_demand_point("D1", (-1.3098, 36.8537), 300, 60)
+        self.optimizer.add_demand_point("D2", (-0.2833, 36.0667), 200, 40)
+        self.optimizer.add_route("R1", "F1", "F2", 160, 3.0, "road")
+        self.optimizer.add_route("R2", "F1", "D1", 10, 0.5, "road")
+        self.optimizer.add_route("R3", "F2", "D2", 5, 0.3, "road")
+        self.optimizer.add_inventory_params("F1", 10, 7, 800, 160, 2.0, 20.0)
+        self.optimizer.add_inventory_params("F2", 5, 7, 400, 80, 2.0, 20.0)
+
+    def test_optimize_all_reports_every_model(self):
+        """Test that optimize_all reports status and wall time for each sub-model"""
+        results = asyncio.run(self.optimizer.optimize_all({}, timeout=60))
+
+        execution = results["model_execution"]
+        self.assertEqual(
+            set(execution),
+            {"route-optimization", "inventory-management", "network-optimization"}
+        )
+        for status in execution.values():
+            self.assertIn(status["status"], ("completed", "failed", "timeout"))
+            self.assertGreaterEqual(status["wall_time"], 0)
+
+    def test_optimize_all_returns_partial_results(self):
+        """Test that a failing sub-model does not discard the others"""
+        results = asyncio.run(self.optimizer.optimize_all({}, timeout=60))
+
+        self.assertEqual(results["model_execution"]["inventory-management"]["status"], "completed")
+        self.assertIn("inventory-management", results)
+        self.assertIn("estimated_stockout_rate", results["inventory-management"])
+
+        for model_name, status in results["model_execution"].items():
+            if status["status"] != "completed":
+                self.assertNotIn(model_name, results)
+
+    def test_timed_out_models_are_terminated(self):
+        """Test that a timeout stops the model's process instead of leaving it running"""
+        with tempfile.TemporaryDirectory() as directory:
+            optimizer = SlowInventoryOptimizer()
+            optimizer.__dict__.update(self.optimizer.__dict__)
+            optimizer.pid_file = os.path.join(directory, "pid")
+
+            start_time = time.perf_counter()
+            results = asyncio.run(optimizer.optimize_all({}, timeout=2))
+            self.assertLess(time.perf_counter() - start_time, 30)
+            self.assertEqual(results["model_execution"]["inventory-management"]["status"], "timeout")
+            self.assertNotIn("inventory-management", results)
+
+            with open(optimizer.pid_file) as f:
+                pid = int(f.read())
+        with self.assertRaises(ProcessLookupError):
+            os.kill(pid, 0)
+
+    def test_worker_processes_are_reused(self):
+        """Test that consecutive calls run on the same worker processes"""
+        asyncio.run(self.optimizer.optimize_all({}, timeout=60, max_workers=1))
+        pids = {worker.process.pid for worker in _get_model_pool().idle}
+        asyncio.run(self.optimizer.optimize_all({}, timeout=60, max_workers=1))
+        self.assertTrue(pids)
+        self.assertEqual({worker.process.pid for worker in _get_model_pool().idle}, pids)
+
+    def test_state_snapshot_tracks_attribute_changes(self):
+        """Test that the cached state snapshot is refreshed when attributes change"""
+        state = asyncio.run(self.optimizer.get_current_state())
+        self.assertEqual(state["bottlenecks"], [])
+        self.assertEqual(state["daily_throughput"], 0)
+
+        self.optimizer.update_node_attributes("F2", utilization=0.95)
+        self.optimizer.update_edge_attributes("F1", "D1", flow=250)
+        state = asyncio.run(self.optimizer.get_current_state())
+
+        self.assertEqual(state["bottlenecks"], ["F2"])
+        self.assertEqual(state["daily_throughput"], 250)
+        self.assertAlmostEqual(state["cost_per_unit"], (240 + 15 + 7.5) / 250)
+
+    def test_state_snapshot_timing_at_50k_edges(self):
+        """Benchmark the state metrics on a network with 50,000 routes"""
+        rng = np.random.default_rng(7)
+        optimizer = SupplyChainNetworkOptimizer()
+        for i in range(1000):
+            optimizer.add_facility(f"F{i}", (rng.uniform(-4, 4), rng.uniform(34, 41)), 1000, 5000)
+        for i in range(5000):
+            optimizer.add_demand_point(f"D{i}", (rng.uniform(-4, 4), rng.uniform(34, 41)), 100)
+        for k in range(50000):
+            optimizer.add_route(f"R{k}", f"F{k % 1000}", f"D{k // 10}", 100, 2.0)
+        self.assertEqual(optimizer.compact_graph.num_edges, 50000)
+
+        start_time = time.perf_counter()
+        metrics = optimizer._get_state_metrics()
+        first_pass = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        self.assertIs(optimizer._get_state_metrics(), metrics)
+        cached_pass = time.perf_counter() - start_time
+
+        self.assertLess(first_pass, 0.5)
+        self.assertLess(cached_pass, 0.01)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+Unit tests for scalable network map rendering
+"""
+
+import unittest
+import folium
+import numpy as np
+from backend.models.network_optimizer import SupplyChainNetworkOptimizer
+from backend.models.network_rendering import build_render_layers, heatmap_layer
+from backend.models.resilience_metrics import ResilienceCalculator
+
+
+class TestNetworkRendering(unittest.TestCase):
+    """Test cases for GeoJSON map layers"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.optimizer = SupplyChainNetworkOptimizer()
+        self.optimizer.add_facility("Nairobi_DC", (-1.2921, 36.8219), 1000, 5000, 1)
+        self.optimizer.add_facility("Nakuru_WH", (-0.3031, 36.0800), 600, 3000, 2)
+        self.optimizer.add_demand_point("Nairobi_D1", (-1.3098, 36.8537), 300, 60)
+        self.optimizer.add_demand_point("Nairobi_D2", (-1.2800, 36.8100), 100)
+        self.optimizer.add_route("R1", "Nairobi_DC", "Nakuru_WH", 160, 3.0, "rail")
+        self.optimizer.add_route("R2", "Nakuru_WH", "Nairobi_D1", 150, 2.5)
+        self.optimizer.add_route("R3", "Nakuru_WH", "Nairobi_D2", 150, 2.5)
+        self.optimizer.add_route("R4", "Nairobi_DC", "Nairobi_D1", 5, 0.2)
+        for route, flow in (("R1", 500), ("R2", 300), ("R3", 100), ("R4", 50)):
+            origin, destination = self.optimizer.routes[route]["origin"], self.optimizer.routes[route]["destination"]
+            self.optimizer.update_edge_attributes(origin, destination, flow=flow)
+
+    def test_layers_merge_and_decimate_routes(self):
+        """Test grid snapping at low zoom and flow-based decimation"""
+        layers = build_render_layers(self.optimizer.compact_graph, self.optimizer.network_graph,
+                                     max_routes=2, zoom_bands=((0, 6, 0.5), (7, 18, None)))
+
+        self.assertEqual(len(layers["facilities"]), 2)
+        self.assertEqual(layers["facilities"][0][3], 'red')
+        self.assertEqual(len(layers["demand_points"]), 2)
+
+        coarse, detailed = (band["geojson"]["features"] for band in layers["routes"])
+        # R2 and R3 merge into one line; R4 collapses to a point and is dropped
+        self.assertEqual([f["properties"]["flow"] for f in coarse], [500, 400])
+        self.assertEqual(coarse[1]["properties"]["label"], "2 routes")
+        self.assertEqual(coarse[0]["properties"]["color"], 'red')
+
+        # Detailed band keeps the two heaviest routes, in (lon, lat) order
+        self.assertEqual([f["properties"]["label"] for f in detailed], ["Route: R1", "Route: R2"])
+        self.assertEqual(detailed[0]["geometry"]["coordinates"][0], [36.8219, -1.2921])
+        self.assertEqual(detailed[0]["properties"]["weight"], 5.0)
+
+    def test_render_cache_keyed_by_version(self):
+        """Test that layers are reused until the network changes"""
+        m = self.optimizer.visualize_network(map_type='geojson')
+        self.assertIsInstance(m, folium.Map)
+        self.assertIn("markerClusterGroup", m.get_root().render())
+
+        layers = self.optimizer._get_render_layers(2000)
+        self.assertIs(self.optimizer._get_render_layers(2000), layers)
+
+        self.optimizer.add_demand_point("Nakuru_D1", (-0.2833, 36.0667), 200)
+        self.assertEqual(len(self.optimizer._get_render_layers(2000)["demand_points"]), 3)
+
+    def test_large_networks_switch_to_layers(self):
+        """Test that large networks are not drawn one marker per element"""
+        rng = np.random.default_rng(5)
+        optimizer = SupplyChainNetworkOptimizer()
+        for i in range(1500):
+            optimizer.add_demand_point(f"D{i}", (rng.uniform(-4, 4), rng.uniform(34, 41)), 10.0)
+
+        html = optimizer.visualize_network().get_root().render()
+        self.assertIn("markerClusterGroup", html)
+        self.assertNotIn("L.marker(", html)
+
+    def test_heatmap_overlay(self):
+        """Test that a vulnerability heatmap renders as one image overlay"""
+        heatmap = ResilienceCalculator(self.optimizer).vulnerability_heatmap(resolution=0.5)
+        m = folium.Map(location=[0.0, 37.9], zoom_start=6)
+        heatmap_layer(heatmap, metric="resilience_score").add_to(m)
+
+        html = m.get_root().render()
+        self.assertIn("L.imageOverlay", html)
+        self.assertIn("data:image/png;base64", html)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+"""
+Unit tests for the binary network snapshot format
+"""
+
+import os
+import tempfile
+import time
+import unittest
+import numpy as np
+from backend.models.network_optimizer import SupplyChainNetworkOptimizer
+from backend.models.network_snapshot import NetworkSnapshot
+
+
+class TestNetworkSnapshot(unittest.TestCase):
+    """Test cases for snapshot saving and loading"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmp_dir.name, "network.snap")
+
+        self.optimizer = SupplyChainNetworkOptimizer()
+        self.optimizer.add_facility("Nairobi_DC", (-1.2921, 36.8219), 1000, 5000, 3)
+        self.optimizer.add_facility("Nakuru_WH", (-0.3031, 36.0800), 600, 3000, 2)
+        self.optimizer.add_demand_point("Nairobi_D1", (-1.3098, 36.8537), 300, 60)
+        self.optimizer.add_route("R1", "Nairobi_DC", "Nakuru_WH", 160, 3.0, "rail")
+        self.optimizer.add_route("R2", "Nakuru_WH", "Nairobi_D1", 150, 2.5, "road", cost=99.0)
+        self.optimizer.add_route("R3", "Nairobi_DC", "Mombasa_Port", 480, 8.0, "road")
+        self.optimizer.add_inventory_params("Nairobi_DC", 10, 7, 800, 160, 2.0, 20.0)
+        self.optimizer.facilities["Nakuru_WH"]["inventory_value"] = 1200.0
+
+    def tearDown(self):
+        """Remove temporary files"""
+        self.tmp_dir.cleanup()
+
+    def test_round_trip(self):
+        """Test that a saved snapshot restores the same network model"""
+        self.optimizer.save_snapshot(self.filename)
+        restored = SupplyChainNetworkOptimizer.from_snapshot(self.filename)
+
+        self.assertEqual(restored.facilities, self.optimizer.facilities)
+        self.assertEqual(restored.demand_points, self.optimizer.demand_points)
+        self.assertEqual(restored.routes, self.optimizer.routes)
+        self.assertEqual(restored.inventory_params, self.optimizer.inventory_params)
+        self.assertEqual(set(restored.network_graph.edges), set(self.optimizer.network_graph.edges))
+        self.assertEqual(restored.network_graph.nodes["Nairobi_DC"]["lead_time"], 10)
+
+    def test_lazy_columns_and_compact_graph(self):
+        """Test memory-mapped column access and direct compact graph construction"""
+        self.optimizer.save_snapshot(self.filename)
+        snapshot = NetworkSnapshot(self.filename)
+
+        self.assertEqual(snapshot.counts["routes"], 3)
+        self.assertIsInstance(snapshot.column("route.distance"), np.memmap)
+        np.testing.assert_array_equal(snapshot.column("route.distance"), [160, 150, 480])
+        self.assertEqual(snapshot.strings("facility.id"), ["Nairobi_DC", "Nakuru_WH"])
+
+        compact = snapshot.to_compact_graph()
+        expected = self.optimizer.compact_graph
+        self.assertEqual(compact.node_ids, expected.node_ids)
+        np.testing.assert_array_equal(compact.node_column("capacity"), expected.node_column("capacity"))
+        np.testing.assert_array_equal(compact.edge_column("cost"), expected.edge_column("cost"))
+        np.testing.assert_array_equal(compact.edge_sources, expected.edge_sources)
+
+    def test_rejects_unknown_files(self):
+        """Test that non-snapshot files and newer format versions are rejected"""
+        with open(self.filename, "wb") as f:
+            f.write(b"{\"facilities\": {}}")
+        with self.assertRaisesRegex(ValueError, "not a network snapshot"):
+            NetworkSnapshot(self.filename)
+
+        self.optimizer.save_snapshot(self.filename)
+        with open(self.filename, "r+b") as f:
+            f.seek(8)
+            f.write((99).to_bytes(4, "little"))
+        with self.assertRaisesRegex(ValueError, "newer than the supported version"):
+            NetworkSnapshot(self.filename)
+
+    def test_large_snapshot_opens_quickly(self):
+        """Test that opening a 100k-node snapshot only costs header parsing"""
+        optimizer = SupplyChainNetworkOptimizer()
+        rng = np.random.default_rng(3)
+        optimizer.add_facility("F0", (0.0, 37.0), 1e6, 1.0)
+        for i in range(100000):
+            optimizer.add_demand_point(f"D{i}", (rng.uniform(-4, 4), rng.uniform(34, 41)), 10.0)
+        optimizer.save_snapshot(self.filename)
+
+        start_time = time.perf_counter()
+        snapshot = NetworkSnapshot(self.filename)
+        demand = snapshot.column("demand.demand_mean")
+        elapsed = time.perf_counter() - start_time
+
+        self.assertEqual(len(demand), 100000)
+        self.assertLess(elapsed, 0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
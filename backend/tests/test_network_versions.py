@@ -0,0 +1,104 @@
+"""
+Unit tests for network versioning
+"""
+
+import unittest
+import networkx as nx
+from backend.models.network_optimizer import SupplyChainNetworkOptimizer
+
+
+class TestNetworkVersions(unittest.TestCase):
+    """Test cases for branching, diffing and materializing network versions"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.optimizer = SupplyChainNetworkOptimizer()
+        self.optimizer.add_facility("Nairobi_DC", (-1.2921, 36.8219), 1000, 5000, 3)
+        self.optimizer.add_facility("Nakuru_WH", (-0.3031, 36.0800), 600, 3000, 2)
+        self.optimizer.add_demand_point("Nairobi_D1", (-1.3098, 36.8537), 300, 60)
+        self.optimizer.add_route("R1", "Nairobi_DC", "Nakuru_WH", 160, 3.0, "rail")
+        self.optimizer.add_route("R2", "Nakuru_WH", "Nairobi_D1", 150, 2.5)
+        self.optimizer.add_route("R3", "Nairobi_DC", "Nairobi_D1", 10, 0.5)
+        self.base = self.optimizer.create_version()
+
+    def test_branches_share_base_and_layer_changes(self):
+        """Test that branches only store their own changes on the shared base"""
+        closure = self.base.branch("nakuru-closure")
+        closure.remove_node("Nakuru_WH")
+        closure.set_edge_attributes("Nairobi_DC", "Nairobi_D1", transit_time=1.5)
+
+        recovery = closure.branch("recovery")
+        recovery.add_node("Naivasha_WH", type="facility", location=(-0.7167, 36.4333),
+                          capacity=400, fixed_cost=2000)
+        recovery.add_edge("Naivasha_WH", "Nairobi_D1", route_id="R4", distance=90,
+                          transit_time=1.8, mode="road", cost=135.0)
+
+        self.assertIs(closure.base_graph, recovery.base_graph)
+        self.assertTrue(nx.is_frozen(self.base.base_graph))
+        self.assertEqual(len(recovery.node_changes), 1)
+        self.assertEqual(len(closure.edge_changes), 3)
+
+        self.assertFalse(recovery.has_node("Nakuru_WH"))
+        self.assertFalse(recovery.has_edge("Nairobi_DC", "Nakuru_WH"))
+        self.assertEqual(recovery.edge_attributes("Nairobi_DC", "Nairobi_D1")["transit_time"], 1.5)
+        self.assertTrue(self.base.has_node("Nakuru_WH"))
+        self.assertEqual(self.optimizer.network_graph.edges["Nairobi_DC", "Nairobi_D1"]["transit_time"], 0.5)
+
+        with self.assertRaisesRegex(ValueError, "frozen"):
+            closure.remove_edge("Nairobi_DC", "Nairobi_D1")
+        with self.assertRaisesRegex(ValueError, "not found"):
+            recovery.set_node_attributes("Mombasa_Port", capacity=10)
+
+    def test_diff(self):
+        """Test diffing two versions"""
+        scenario = self.base.branch("scenario")
+        scenario.set_node_attributes("Nakuru_WH", capacity=300)
+        scenario.remove_edge("Nakuru_WH", "Nairobi_D1")
+        scenario.add_node("Eldoret_D1", type="demand", location=(0.5143, 35.2698), demand_mean=150)
+
+        diff = self.base.diff(scenario)
+        self.assertEqual(list(diff["nodes"]["added"]), ["Eldoret_D1"])
+        self.assertEqual(diff["nodes"]["modified"], {"Nakuru_WH": {"capacity": (600, 300)}})
+        self.assertEqual(diff["edges"]["removed"], [("Nakuru_WH", "Nairobi_D1")])
+        self.assertEqual(scenario.diff(self.base)["nodes"]["removed"], ["Eldoret_D1"])
+
+        # A change reverted in a child does not show up as a difference
+        reverted = scenario.branch()
+        reverted.set_node_attributes("Nakuru_WH", capacity=600)
+        self.assertEqual(self.base.diff(reverted)["nodes"]["modified"], {})
+
+    def test_materialize_and_to_optimizer(self):
+        """Test building the full graph and an optimizer for a version"""
+        scenario = self.base.branch()
+        scenario.remove_node("Nakuru_WH")
+        scenario.add_edge("Nairobi_DC", "Kisumu_D1", route_id="R5", distance=350, transit_time=6.0)
+
+        graph = scenario.materialize()
+        self.assertIs(graph, scenario.materialize())
+        self.assertEqual(set(graph.edges), {("Nairobi_DC", "Nairobi_D1"), ("Nairobi_DC", "Kisumu_D1")})
+        self.assertEqual(graph.nodes["Nairobi_DC"]["capacity"], 1000)
+
+        scenario.set_node_attributes("Nairobi_DC", capacity=800)
+        self.assertEqual(scenario.materialize().nodes["Nairobi_DC"]["capacity"], 800)
+
+        optimizer = scenario.to_optimizer()
+        self.assertEqual(set(optimizer.facilities), {"Nairobi_DC"})
+        self.assertEqual(optimizer.facilities["Nairobi_DC"]["capacity"], 800)
+        self.assertEqual(set(optimizer.routes), {"R3", "R5"})
+        self.assertEqual(optimizer.routes["R5"]["cost"], 525.0)
+
+    def test_many_branches_are_cheap(self):
+        """Test that hundreds of variants do not copy the base graph"""
+        variants = []
+        for i in range(500):
+            variant = self.base.branch(f"variant-{i}")
+            variant.set_node_attributes("Nairobi_DC", capacity=1000 - i)
+            variants.append(variant)
+
+        self.assertTrue(all(v.base_graph is self.base.base_graph for v in variants))
+        self.assertEqual(variants[-1].node_attributes("Nairobi_DC")["capacity"], 501)
+        self.assertEqual(self.base.node_attributes("Nairobi_DC")["capacity"], 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+"""
+Unit tests for online statistics
+"""
+
+import unittest
+import numpy as np
+from backend.models.online_statistics import RunningStats, TDigest
+
+
+class TestOnlineStatistics(unittest.TestCase):
+    """Test cases for running moments and quantile sketches"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        rng = np.random.default_rng(21)
+        self.values = np.concatenate([rng.exponential(5.0, 60000), rng.normal(50, 3, 40000)])
+        rng.shuffle(self.values)
+
+    def test_running_stats_match_numpy(self):
+        """Test batch-merged Welford moments"""
+        stats = RunningStats()
+        for batch in np.array_split(self.values, 137):
+            stats.update(batch)
+
+        self.assertEqual(stats.count, len(self.values))
+        self.assertAlmostEqual(stats.mean, self.values.mean(), places=9)
+        self.assertAlmostEqual(stats.variance, self.values.var(ddof=1), places=6)
+        self.assertEqual(stats.max, self.values.max())
+
+    def test_tdigest_quantiles(self):
+        """Test quantile estimates against exact quantiles"""
+        digest = TDigest()
+        for batch in np.array_split(self.values, 137):
+            digest.update(batch)
+
+        self.assertLess(len(digest.means), 200)
+        for q in (0.01, 0.25, 0.5, 0.9, 0.99):
+            exact = np.quantile(self.values, q)
+            self.assertAlmostEqual(digest.quantile(q), exact, delta=0.01 * (self.values.max() - self.values.min()))
+        self.assertEqual(digest.quantile(0.0), self.values.min())
+        self.assertIsNone(TDigest().quantile(0.5))
+
+
+if __name__ == "__main__":
+    unittest.main()
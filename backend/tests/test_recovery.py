@@ -0,0 +1,139 @@
+"""
+Unit tests for recovery simulation
+"""
+
+import unittest
+import numpy as np
+from backend.models.network_optimizer import SupplyChainNetworkOptimizer
+from backend.models.resilience_metrics import ResilienceCalculator
+from backend.models.disruption import DisruptionSimulator, DisruptionOverlay
+from backend.models.recovery import RecoverySimulator
+from backend.tests.network_builders import build_ring_network
+
+
+class TestRecoverySimulator(unittest.TestCase):
+    """Test cases for restoration crew scheduling"""
+
+    def setUp(self):
+        """Set up a port serving one demand point directly and one through a DC"""
+        self.optimizer = SupplyChainNetworkOptimizer()
+        self.optimizer.add_facility("Mombasa_Port", (-4.0435, 39.6682), 2000, 8000)
+        self.optimizer.add_facility("Nairobi_DC", (-1.2921, 36.8219), 1000, 5000)
+        self.optimizer.add_demand_point("Nakuru_D1", (-0.3031, 36.0800), 300, 60)
+        self.optimizer.add_demand_point("Thika_D1", (-1.0333, 37.0693), 100, 20)
+        self.optimizer.add_route("R1", "Mombasa_Port", "Nairobi_DC", 480, 8.0, "rail")
+        self.optimizer.add_route("R3", "Nairobi_DC", "Nakuru_D1", 160, 3.0)
+        self.optimizer.add_route("R5", "Mombasa_Port", "Thika_D1", 440, 7.0)
+
+        self.overlay = DisruptionOverlay(self.optimizer.network_graph)
+        self.overlay.node_changes["Nairobi_DC"] = {"disruption_impact": 1.0}
+        self.overlay.edge_changes[("Mombasa_Port", "Thika_D1")] = {"disruption_impact": 0.5}
+
+    def _simulator(self, **kwargs):
+        return RecoverySimulator(self.optimizer.compact_graph, list(self.optimizer.facilities), **kwargs)
+
+    def test_single_crew_schedule(self):
+        """Test the served demand curve of one crew repairing the shortest job first"""
+        simulator = self._simulator(num_crews=1)
+        result = simulator.simulate(simulator.damage_from_network(self.overlay))
+
+        self.assertEqual(result["times"], [0.0, 7.0, 67.0])
+        self.assertEqual(result["demand_served"], [0.0, 100.0, 400.0])
+        self.assertEqual([r["element"] for r in result["restoration_order"]], ["R5", "Nairobi_DC"])
+        self.assertAlmostEqual(result["time_to_recovery"], 67.0)
+        self.assertAlmostEqual(result["lost_demand_days"], 400 * 7 + 300 * 60)
+        self.assertAlmostEqual(result["resilience"], (0.25 * 60 + 113) / 180)
+
+    def test_more_crews_recover_sooner(self):
+        """Test that crews working in parallel shorten the recovery"""
+        simulator = self._simulator(num_crews=2)
+        result = simulator.simulate(simulator.damage_from_network(self.overlay))
+        self.assertAlmostEqual(result["time_to_recovery"], 60.0)
+
+        longest_first = self._simulator(num_crews=1, priority="longest")
+        result = longest_first.simulate(longest_first.damage_from_network(self.overlay))
+        self.assertEqual(result["demand_served"], [0.0, 300.0, 400.0])
+        self.assertAlmostEqual(result["time_to_recovery"], 67.0)
+
+    def test_light_damage_keeps_elements_open(self):
+        """Test the closure threshold and the capacitated kernel"""
+        self.overlay.edge_changes[("Mombasa_Port", "Thika_D1")] = {"disruption_impact": 0.2}
+        simulator = self._simulator(num_crews=2)
+        result = simulator.simulate(simulator.damage_from_network(self.overlay))
+        self.assertEqual(result["demand_served"][0], 100.0)
+
+        # Remaining facility capacities (100 + 200) limit the served demand
+        self.overlay.node_changes["Mombasa_Port"] = {"disruption_impact": 0.95}
+        self.overlay.node_changes["Nairobi_DC"] = {"disruption_impact": 0.8}
+        capacitated = self._simulator(capacitated=True)
+        result = capacitated.simulate(capacitated.damage_from_network(self.overlay))
+        self.assertAlmostEqual(result["demand_served"][0], 300.0)
+        self.assertAlmostEqual(result["demand_served"][-1], 400.0)
+
+    def test_materialized_graph_matches_overlay(self):
+        """Test that damage is read the same from graphs and overlays"""
+        simulator = self._simulator()
+        self.assertEqual(simulator.damage_from_network(self.overlay.materialize()),
+                         simulator.damage_from_network(self.overlay))
+
+        result = ResilienceCalculator(self.optimizer).simulate_recovery(self.overlay, num_crews=1)
+        self.assertAlmostEqual(result["time_to_recovery"], 67.0)
+
+    def test_invalid_arguments(self):
+        """Test that invalid settings are rejected"""
+        with self.assertRaises(ValueError):
+            self._simulator(num_crews=0)
+        with self.assertRaises(ValueError):
+            self._simulator(priority="random")
+        with self.assertRaises(ValueError):
+            self._simulator().simulate({}, horizon=0)
+
+
+class TestRecoverySweeps(unittest.TestCase):
+    """Test cases for simulating many disruption scenarios"""
+
+    def setUp(self):
+        """Set up random disruptions of a ring network"""
+        self.optimizer = build_ring_network(40, 40, 10, seed=5)
+        simulator = DisruptionSimulator(self.optimizer.network_graph)
+        rng = np.random.default_rng(5)
+        self.overlays = [
+            simulator.apply_disruption_to_network({
+                "epicenter": (rng.uniform(-4, 4), rng.uniform(34, 41)),
+                "severity": 0.9,
+                "geographical_spread": 0.3
+            }, materialize=False)
+            for _ in range(20)
+        ]
+
+    def test_curve_matches_direct_evaluation(self):
+        """Test the bisection-evaluated curve against evaluating every state"""
+        for capacitated in (False, True):
+            simulator = RecoverySimulator(self.optimizer.compact_graph, list(self.optimizer.facilities),
+                                          num_crews=3, capacitated=capacitated)
+            for overlay in self.overlays:
+                damage = simulator.damage_from_network(overlay)
+                result = simulator.simulate(damage)
+
+                # Served demand after all repairs completed by each event time
+                remaining = dict(damage)
+                expected = []
+                for time in result["times"]:
+                    for entry in result["restoration_order"]:
+                        element = simulator.element_ids.index(entry["element"])
+                        if entry["time"] <= time:
+                            remaining.pop(element, None)
+                    expected.append(simulator.analyzer.degraded_served_demand(simulator._residual(remaining)))
+                np.testing.assert_allclose(result["demand_served"], expected)
+
+    def test_parallel_matches_serial(self):
+        """Test that spreading scenarios over processes gives the same results"""
+        simulator = RecoverySimulator(self.optimizer.compact_graph, list(self.optimizer.facilities))
+        damages = [simulator.damage_from_network(overlay) for overlay in self.overlays]
+        serial = simulator.simulate_many(damages)
+        self.assertEqual(simulator.simulate_many(damages, max_workers=2), serial)
+        self.assertTrue(all(0 <= r["resilience"] <= 1 for r in serial))
+
+
+if __name__ == '__main__':
+    unittest.main()
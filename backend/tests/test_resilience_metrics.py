@@ -0,0 +1,260 @@
+"""
+Unit tests for supply chain resilience metrics
+"""
+
+import time
+import tempfile
+import unittest
+import numpy as np
+import networkx as nx
+from backend.models.network_optimizer import SupplyChainNetworkOptimizer
+from backend.models.resilience_metrics import ResilienceCalculator
+from backend.models.disruption import DisruptionSimulator
+from backend.models.critical_paths import CriticalPathEngine, average_shortest_path_length
+from backend.services.scenario_cache import ScenarioCache
+from backend.tests.network_builders import build_ring_network
+
+
+class TestVulnerabilityHeatmap(unittest.TestCase):
+    """Test cases for epicenter grid sweeps"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.optimizer = SupplyChainNetworkOptimizer()
+        self.optimizer.add_facility("Nairobi_DC", (-1.2921, 36.8219), 1000, 5000)
+        self.optimizer.add_facility("Mombasa_Port", (-4.0435, 39.6682), 2000, 8000)
+        self.optimizer.add_facility("Kisumu_WH", (-0.0917, 34.7680), 400, 2000)
+        self.optimizer.add_demand_point("Nakuru_D1", (-0.3031, 36.0800), 300, 60)
+        self.optimizer.add_route("R1", "Mombasa_Port", "Nairobi_DC", 480, 8.0, "rail")
+        self.optimizer.add_route("R2", "Nairobi_DC", "Kisumu_WH", 350, 6.0, "road")
+        self.optimizer.add_route("R3", "Nairobi_DC", "Nakuru_D1", 160, 3.0, "road")
+        self.calculator = ResilienceCalculator(self.optimizer)
+
+    def test_raster_covers_grid(self):
+        """Test that the raster has one cell per grid point within the bounds"""
+        heatmap = self.calculator.vulnerability_heatmap(resolution=0.5)
+
+        self.assertEqual(heatmap["capacity_loss"].shape, (len(heatmap["lats"]), len(heatmap["lons"])))
+        self.assertEqual(heatmap["resilience_score"].shape, heatmap["capacity_loss"].shape)
+        self.assertTrue((heatmap["resilience_score"] >= 0).all())
+        self.assertTrue((heatmap["resilience_score"] <= 1).all())
+
+        # The port holds most of the capacity, so the worst epicenter is near it
+        worst = heatmap["worst_epicenter"]["epicenter"]
+        self.assertLess(np.hypot(worst[0] + 4.0435, worst[1] - 39.6682), 0.5)
+
+    def test_matches_single_scenario_impact(self):
+        """Test that each cell equals the impact of applying its disruption"""
+        heatmap = self.calculator.vulnerability_heatmap(resolution=1.0, severity=0.9,
+                                                        geographical_spread=0.3)
+        simulator = DisruptionSimulator(self.optimizer.network_graph)
+
+        for row in range(0, len(heatmap["lats"]), 3):
+            for col in range(0, len(heatmap["lons"]), 2):
+                scenario = {
+                    "epicenter": (heatmap["lats"][row], heatmap["lons"][col]),
+                    "severity": 0.9,
+                    "geographical_spread": 0.3
+                }
+                overlay = simulator.apply_disruption_to_network(scenario, materialize=False)
+                impact = self.calculator.calculate_disruption_impact(overlay)
+                self.assertAlmostEqual(heatmap["capacity_loss"][row, col], impact["capacity_loss"])
+                self.assertAlmostEqual(heatmap["resilience_score"][row, col], impact["resilience_score"])
+
+    def test_results_cached_per_network_version(self):
+        """Test that sweeps are reused until the network changes"""
+        first = self.calculator.vulnerability_heatmap(resolution=0.5)
+        self.assertIs(self.calculator.vulnerability_heatmap(resolution=0.5), first)
+        self.assertIsNot(self.calculator.vulnerability_heatmap(resolution=0.5, severity=0.5), first)
+
+        self.optimizer.add_facility("Eldoret_WH", (0.5143, 35.2698), 800, 3000)
+        second = self.calculator.vulnerability_heatmap(resolution=0.5)
+        self.assertIsNot(second, first)
+        self.assertGreater(second["capacity_loss"].max(), 0)
+
+    def test_invalid_grid(self):
+        """Test that empty grids are rejected"""
+        with self.assertRaises(ValueError):
+            self.calculator.vulnerability_heatmap(bounds=(1.0, 36.0, 0.0, 37.0))
+        with self.assertRaises(ValueError):
+            self.calculator.vulnerability_heatmap(resolution=0)
+
+
+class CountingCalculator(ResilienceCalculator):
+    """Calculator that counts baseline computations"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.computations = 0
+
+    def _compute_baseline_metrics(self):
+        self.computations += 1
+        return super()._compute_baseline_metrics()
+
+
+class TestBaselineCache(unittest.TestCase):
+    """Test cases for versioned baseline metrics"""
+
+    def setUp(self):
+        """Set up a small network"""
+        self.optimizer = build_network()
+        self.calculator = CountingCalculator(self.optimizer)
+
+    def test_fingerprint_tracks_content(self):
+        """Test that equal networks share a fingerprint and changes alter it"""
+        fingerprint = self.optimizer.network_fingerprint()
+        self.assertEqual(build_network().network_fingerprint(), fingerprint)
+
+        version = self.optimizer.network_version
+        self.optimizer.update_node_attributes("Nairobi_DC", capacity=1000)
+        self.assertGreater(self.optimizer.network_version, version)
+        self.assertEqual(self.optimizer.network_fingerprint(), fingerprint)
+
+        self.optimizer.add_route("R4", "Nakuru_D1", "Nairobi_DC", 160, 3.0)
+        self.assertNotEqual(self.optimizer.network_fingerprint(), fingerprint)
+
+    def test_baseline_recomputed_only_when_network_changes(self):
+        """Test that baselines are reused until the network content changes"""
+        first = self.calculator.calculate_baseline_metrics()
+        self.assertIs(self.calculator.calculate_baseline_metrics(), first)
+        self.calculator.calculate_disruption_impact(self.optimizer.network_graph)
+        self.assertEqual(self.calculator.computations, 1)
+
+        # A new version with the same content keeps the baseline
+        self.optimizer.update_node_attributes("Nairobi_DC", capacity=1000)
+        self.assertIs(self.calculator.calculate_baseline_metrics(), first)
+        self.assertEqual(self.calculator.computations, 1)
+
+        self.optimizer.add_facility("Eldoret_WH", (0.5143, 35.2698), 800, 3000)
+        second = self.calculator.calculate_baseline_metrics()
+        self.assertEqual(self.calculator.computations, 2)
+        self.assertAlmostEqual(second["total_capacity"], first["total_capacity"] + 800)
+
+        self.calculator.calculate_baseline_metrics(force=True)
+        self.assertEqual(self.calculator.computations, 3)
+
+    def test_baseline_shared_through_scenario_cache(self):
+        """Test that calculators with the same scenario cache share baselines"""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = ScenarioCache(cache_dir)
+            first = CountingCalculator(self.optimizer, scenario_cache=cache)
+            expected = first.calculate_baseline_metrics()
+
+            second = CountingCalculator(build_network(), scenario_cache=cache)
+            self.assertEqual(second.calculate_baseline_metrics(), expected)
+            self.assertEqual((first.computations, second.computations), (1, 0))
+
+
+def build_network():
+    """Port supplying a distribution center and a warehouse with one demand point"""
+    optimizer = SupplyChainNetworkOptimizer()
+    optimizer.add_facility("Nairobi_DC", (-1.2921, 36.8219), 1000, 5000)
+    optimizer.add_facility("Mombasa_Port", (-4.0435, 39.6682), 2000, 8000)
+    optimizer.add_facility("Kisumu_WH", (-0.0917, 34.7680), 400, 2000)
+    optimizer.add_demand_point("Nakuru_D1", (-0.3031, 36.0800), 300, 60)
+    optimizer.add_route("R1", "Mombasa_Port", "Nairobi_DC", 480, 8.0, "rail")
+    optimizer.add_route("R2", "Nairobi_DC", "Kisumu_WH", 350, 6.0, "road")
+    optimizer.add_route("R3", "Nairobi_DC", "Nakuru_D1", 160, 3.0, "road")
+    return optimizer
+
+
+class TestCriticalPaths(unittest.TestCase):
+    """Test cases for incremental critical path analysis"""
+
+    def setUp(self):
+        """Set up a small strongly connected network"""
+        self.optimizer = build_ring_network(12, 8, 6, seed=3)
+        self.network = self.optimizer.network_graph
+
+    def test_average_path_length_matches_networkx(self):
+        """Test the hop-distance average against NetworkX"""
+        compact = self.optimizer.compact_graph
+        self.assertAlmostEqual(average_shortest_path_length(compact),
+                               nx.average_shortest_path_length(self.network))
+
+        self.optimizer.add_demand_point("Sink", (0.0, 37.0), 10)
+        self.optimizer.add_route("RSink", "F0", "Sink", 10, 0.5)
+        self.assertEqual(average_shortest_path_length(self.optimizer.compact_graph), float('inf'))
+
+    def test_removals_match_graph_copies(self):
+        """Test incremental removals against recomputing on a copied graph"""
+        engine = CriticalPathEngine(self.optimizer.compact_graph, list(self.optimizer.facilities),
+                                    list(self.optimizer.demand_points))
+        self.assertGreater(len(engine.paths), 0)
+
+        node_ids = engine.node_ids
+        for nodes, edges in engine.paths:
+            copy = self.network.copy()
+            for u, v in zip(nodes[:-1], nodes[1:]):
+                copy.remove_edge(node_ids[u], node_ids[v])
+            try:
+                expected = nx.average_shortest_path_length(copy)
+            except nx.NetworkXError:
+                expected = float('inf')
+
+            metrics = engine.evaluate_removal(edges)
+            self.assertAlmostEqual(metrics["avg_shortest_path"], expected)
+            self.assertAlmostEqual(metrics["avg_degree"], np.mean([d for _, d in copy.degree()]))
+
+    def test_removals_off_key_paths(self):
+        """Test removals of routes without stored source sets, and the reduced tree storage"""
+        engine = CriticalPathEngine(self.optimizer.compact_graph, list(self.optimizer.facilities),
+                                    list(self.optimizer.demand_points))
+        untracked = np.flatnonzero(engine.tracked_edges < 0)
+        self.assertGreater(len(untracked), 0)
+        self.assertEqual(engine.tree_sources.shape, (engine.num_edges - len(untracked), (engine.num_nodes + 7) // 8))
+
+        for e in untracked[:10].tolist():
+            u, v = engine.node_ids[engine.src[e]], engine.node_ids[engine.dst[e]]
+            copy = self.network.copy()
+            copy.remove_edge(u, v)
+            try:
+                expected = nx.average_shortest_path_length(copy)
+            except nx.NetworkXError:
+                expected = float('inf')
+            self.assertAlmostEqual(engine.evaluate_removal([e])["avg_shortest_path"], expected)
+            self.assertGreaterEqual(engine.removal_bound([e])["avg_shortest_path"], expected - 1e-12)
+
+    def test_critical_paths_match_full_impact(self):
+        """Test that path criticality equals the impact of removing the path"""
+        calculator = ResilienceCalculator(self.optimizer)
+        critical_paths = calculator.analyze_critical_paths(disruption_threshold=0.0)
+        self.assertGreater(len(critical_paths), 0)
+
+        for entry in critical_paths:
+            copy = self.network.copy()
+            path = entry["path"]
+            copy.remove_edges_from(zip(path[:-1], path[1:]))
+            expected = calculator.calculate_disruption_impact(copy)
+            self.assertAlmostEqual(entry["criticality"], 1.0 - expected["resilience_score"])
+            self.assertLessEqual(len(path), 4)
+
+        criticality = [entry["criticality"] for entry in critical_paths]
+        self.assertEqual(criticality, sorted(criticality, reverse=True))
+
+    def test_parallel_matches_serial(self):
+        """Test that spreading paths over processes gives the same result"""
+        calculator = ResilienceCalculator(self.optimizer)
+        serial = calculator.analyze_critical_paths(disruption_threshold=0.0)
+        parallel = calculator.analyze_critical_paths(disruption_threshold=0.0, max_workers=2)
+        self.assertEqual([p["path"] for p in parallel], [p["path"] for p in serial])
+
+    def test_ranked_edges(self):
+        """Test that edges are ranked by the number of key paths using them"""
+        engine = CriticalPathEngine(self.optimizer.compact_graph, list(self.optimizer.facilities),
+                                    list(self.optimizer.demand_points))
+        ranked = engine.ranked_edges()
+        usage = [count for _, count in ranked]
+        self.assertEqual(usage, sorted(usage, reverse=True))
+        self.assertEqual(sum(usage), sum(len(edges) for _, edges in engine.paths))
+
+    def test_thousands_of_nodes(self):
+        """Test that a network with thousands of nodes is analyzed in seconds"""
+        optimizer = build_ring_network(1500, 1500, 500, seed=7)
+        start_time = time.perf_counter()
+        ResilienceCalculator(optimizer).analyze_critical_paths()
+        self.assertLess(time.perf_counter() - start_time, 30.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,211 @@
+"""
+Unit tests for supplier diversification
+"""
+
+import unittest
+import numpy as np
+from backend.models.supplier_diversity import SupplierDiversityOptimizer
+
+
+def build_suppliers(num_suppliers=10, seed=1, demand=1000.0):
+    """Build an optimizer with random suppliers of steel"""
+    rng = np.random.default_rng(seed)
+    optimizer = SupplierDiversityOptimizer()
+    for i in range(num_suppliers):
+        optimizer.add_supplier(
+            f"S{i}", (rng.uniform(-4, 4), rng.uniform(34, 41)), rng.uniform(0.6, 0.99),
+            {"steel": rng.uniform(100, 600)}, {"steel": rng.uniform(2, 30)}, {"steel": rng.uniform(5, 15)}
+        )
+    optimizer.set_material_demand("steel", demand)
+    return optimizer
+
+
+def build_portfolio(num_materials=12, num_suppliers=20, suppliers_per_material=5, seed=2, clusters=1):
+    """Build an optimizer where each material is offered by a few random suppliers"""
+    rng = np.random.default_rng(seed)
+    optimizer = SupplierDiversityOptimizer()
+    offers = {}
+    for j in range(num_materials):
+        # Clusters draw their suppliers from disjoint ranges
+        cluster = j % clusters
+        size = num_suppliers // clusters
+        for i in rng.choice(size, suppliers_per_material, replace=False):
+            offers.setdefault(f"S{cluster * size + i}", []).append(f"M{j}")
+    for supplier_id, materials in offers.items():
+        optimizer.add_supplier(
+            supplier_id, (rng.uniform(-4, 4), rng.uniform(34, 41)), rng.uniform(0.6, 0.99),
+            {m: rng.uniform(100, 600) for m in materials}, {m: rng.uniform(2, 30) for m in materials},
+            {m: rng.uniform(5, 15) for m in materials}
+        )
+    for j in range(num_materials):
+        optimizer.set_material_demand(f"M{j}", 600.0)
+    return optimizer
+
+
+class TestAllocationSearch(unittest.TestCase):
+    """Test cases for searching allocations over HHI limits"""
+
+    def setUp(self):
+        self.optimizer = build_suppliers()
+        self.grid = [0.1 + 0.02 * i for i in range(20)]
+
+    def test_grid_matches_separate_solves(self):
+        """Test that re-solving one model gives the same allocations as building each"""
+        search = self.optimizer.search_allocation_strategies("steel", self.grid)
+
+        self.assertEqual([p["max_hhi"] for p in search["points"]], self.grid)
+        for point in search["points"][::5]:
+            expected = self.optimizer.optimize_supplier_allocation("steel", max_hhi=point["max_hhi"])
+            self.assertEqual(point["allocation"], expected)
+            self.assertGreaterEqual(point["solve_time"], 0)
+
+    def test_pareto_front(self):
+        """Test that no strategy on the front is dominated by another"""
+        search = self.optimizer.search_allocation_strategies("steel", self.grid)
+        front = search["pareto_front"]
+        self.assertTrue(front)
+
+        objectives = lambda p: np.array([p["allocation"]["total_cost"], p["allocation"]["average_risk"],
+                                         p["allocation"]["hhi"]])
+        for point in front:
+            for other in search["points"]:
+                self.assertFalse(np.all(objectives(other) <= objectives(point)) and
+                                 np.any(objectives(other) < objectives(point)))
+
+    def test_failures_are_reported(self):
+        """Test that infeasible grid points are reported instead of skipped"""
+        optimizer = build_suppliers(demand=100000.0)
+        search = optimizer.search_allocation_strategies("steel", [0.2, 0.3])
+        self.assertEqual(len(search["failures"]), 2)
+        self.assertIn("infeasible", search["failures"][0]["error"])
+        self.assertEqual(search["pareto_front"], [])
+
+        strategy = optimizer.generate_recommended_strategy("steel")
+        self.assertIn("error", strategy)
+        self.assertEqual(len(strategy["failed_strategies"]), 4)
+
+    def test_unmodellable_inputs_are_reported(self):
+        """Test that a missing supplier cost or zero demand fails grid points instead of raising"""
+        missing_cost = build_suppliers()
+        supplier = missing_cost.suppliers["S2"]
+        missing_cost.add_supplier("S2", supplier["location"], supplier["reliability_score"],
+                                  supplier["capacity"], supplier["lead_time"], {})
+        zero_demand = build_suppliers(demand=0.0)
+
+        for optimizer, message in ((missing_cost, "No cost"), (zero_demand, "must be positive")):
+            search = optimizer.search_allocation_strategies("steel", [0.2, 0.3])
+            self.assertEqual(len(search["failures"]), 2)
+            self.assertIn(message, search["failures"][0]["error"])
+
+            strategy = optimizer.generate_recommended_strategy("steel")
+            self.assertEqual(strategy["error"], "Could not generate valid strategies")
+            self.assertEqual(len(strategy["failed_strategies"]), 4)
+            with self.assertRaises(ValueError):
+                optimizer.optimize_supplier_allocation("steel")
+
+    def test_parallel_matches_serial(self):
+        """Test that splitting the grid over processes gives the same strategies"""
+        serial = self.optimizer.search_allocation_strategies("steel", self.grid)
+        parallel = self.optimizer.search_allocation_strategies("steel", self.grid, max_workers=2)
+        strip = lambda points: [{k: v for k, v in p.items() if k != "solve_time"} for p in points]
+        self.assertEqual(strip(parallel["points"]), strip(serial["points"]))
+
+    def test_recommended_strategy(self):
+        """Test that the recommended strategy has the lowest score"""
+        strategy = self.optimizer.generate_recommended_strategy("steel")
+        scores = [s["score"] for s in [strategy["recommended_strategy"]] + strategy["alternative_strategies"]]
+        self.assertEqual(scores, sorted(scores))
+        self.assertEqual(strategy["failed_strategies"], [])
+
+    def test_invalid_arguments(self):
+        """Test that invalid grids and unknown materials are rejected"""
+        with self.assertRaises(ValueError):
+            self.optimizer.search_allocation_strategies("steel", [])
+        with self.assertRaises(ValueError):
+            self.optimizer.search_allocation_strategies("steel", [0.0, 0.5])
+        with self.assertRaises(ValueError):
+            self.optimizer.search_allocation_strategies("copper")
+
+
+class TestPortfolioAllocation(unittest.TestCase):
+    """Test cases for allocating many materials jointly"""
+
+    def setUp(self):
+        self.optimizer = build_portfolio()
+
+    def test_uncoupled_portfolio_matches_single_materials(self):
+        """Test that without shared limits the joint model allocates like separate models"""
+        result = self.optimizer.optimize_portfolio_allocation()
+
+        self.assertEqual(result["failures"], [])
+        self.assertEqual(list(result["allocations"]), list(self.optimizer.material_demands))
+        for material_id, allocation in result["allocations"].items():
+            expected = self.optimizer.optimize_supplier_allocation(material_id)
+            self.assertAlmostEqual(allocation["total_cost"], expected["total_cost"], places=4)
+            self.assertEqual(set(allocation["allocation"]), set(expected["allocation"]))
+
+    def test_shared_capacity(self):
+        """Test that a supplier's total orders stay within its shared capacity"""
+        result = self.optimizer.optimize_portfolio_allocation(
+            supplier_capacity={s: 500.0 for s in self.optimizer.suppliers})
+
+        self.assertEqual(result["failures"], [])
+        self.assertLessEqual(max(result["supplier_orders"].values()), 500.0 + 1e-4)
+        for material_id, allocation in result["allocations"].items():
+            self.assertAlmostEqual(sum(allocation["allocation"].values()), 600.0, places=4)
+
+    def test_engagement_cost_consolidates_suppliers(self):
+        """Test that fixed engagement costs reduce the number of suppliers used"""
+        free = self.optimizer.optimize_portfolio_allocation()
+        fixed = self.optimizer.optimize_portfolio_allocation(
+            engagement_cost={s: 20000.0 for s in self.optimizer.suppliers})
+
+        self.assertLess(len(fixed["engaged_suppliers"]), len(free["engaged_suppliers"]))
+        self.assertAlmostEqual(fixed["engagement_cost"], 20000.0 * len(fixed["engaged_suppliers"]))
+
+    def test_clusters_solved_separately(self):
+        """Test that independent clusters give the same allocation, also in parallel"""
+        optimizer = build_portfolio(clusters=3)
+        settings = {"engagement_cost": {s: 5000.0 for s in optimizer.suppliers}}
+        joint = optimizer.optimize_portfolio_allocation(decompose=False, **settings)
+        split = optimizer.optimize_portfolio_allocation(**settings)
+        parallel = optimizer.optimize_portfolio_allocation(max_workers=2, **settings)
+
+        self.assertEqual((joint["num_clusters"], split["num_clusters"]), (1, 3))
+        self.assertAlmostEqual(split["total_cost"] + split["engagement_cost"],
+                               joint["total_cost"] + joint["engagement_cost"], places=3)
+        self.assertEqual(parallel["allocations"], split["allocations"])
+
+    def test_infeasible_cluster_reported(self):
+        """Test that a cluster without enough shared capacity is reported as a failure"""
+        result = self.optimizer.optimize_portfolio_allocation(
+            supplier_capacity={s: 10.0 for s in self.optimizer.suppliers})
+        self.assertEqual(result["allocations"], {})
+        self.assertEqual(len(result["failures"]), 1)
+        self.assertIn("infeasible", result["failures"][0]["error"])
+
+        with self.assertRaises(ValueError):
+            self.optimizer.optimize_portfolio_allocation(["M0", "steel"])
+
+    def test_unmodellable_cluster_reported(self):
+        """Test that a missing cost or zero demand fails only its own cluster"""
+        for max_workers in (1, 2):
+            optimizer = build_portfolio(clusters=3)
+            optimizer.set_material_demand("M0", 0.0)
+            supplier_id = optimizer.materials["M1"][0]
+            supplier = optimizer.suppliers[supplier_id]
+            optimizer.add_supplier(supplier_id, supplier["location"], supplier["reliability_score"],
+                                   supplier["capacity"], supplier["lead_time"],
+                                   {m: c for m, c in supplier["cost"].items() if m != "M1"})
+
+            result = optimizer.optimize_portfolio_allocation(max_workers=max_workers)
+            errors = {m: f["error"] for f in result["failures"] for m in f["materials"]}
+            self.assertIn("must be positive", errors["M0"])
+            self.assertIn("No cost", errors["M1"])
+            self.assertEqual(len(result["failures"]), 2)
+            self.assertTrue(result["allocations"])
+            self.assertFalse(set(result["allocations"]) & set(errors))
+
+
+if __name__ == '__main__':
+    unittest.main()
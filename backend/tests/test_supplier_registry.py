@@ -0,0 +1,130 @@
+"""
+Unit tests for the array-backed supplier registry
+"""
+
+import unittest
+import numpy as np
+from math import sqrt
+from backend.models.supplier_registry import SupplierRegistry
+from backend.models.supplier_diversity import SupplierDiversityOptimizer
+
+
+class TestSupplierRegistry(unittest.TestCase):
+    """Test cases for supplier matrices and vectorized metrics"""
+
+    def setUp(self):
+        """Set up suppliers of steel and cement"""
+        self.registry = SupplierRegistry(initial_suppliers=2, initial_materials=1)
+        self.registry.add_supplier("Nairobi_Steel", (-1.29, 36.82), 0.9, {"steel": 300},
+                                   {"steel": 6, "cement": 12}, {"steel": 10})
+        self.registry.add_supplier("Mombasa_Steel", (-4.04, 39.67), 0.8, {"steel": 100, "cement": 200},
+                                   {"steel": 18}, {"steel": 9, "cement": 4})
+        self.registry.add_supplier("Kisumu_Cement", (-0.09, 34.77), 0.7, {"cement": 0}, {}, {"cement": 5})
+
+    def test_matrices_grow(self):
+        """Test that rows and columns grow past the preallocated size"""
+        self.assertEqual(self.registry.material_ids, ["steel", "cement"])
+        capacity = self.registry.matrix("capacity")
+        self.assertEqual(capacity.shape, (3, 2))
+        np.testing.assert_array_equal(capacity[:, 0], [300, 100, np.nan])
+        np.testing.assert_array_equal(self.registry.offers[:, 1], [False, True, True])
+
+    def test_risk_scores(self):
+        """Test risk scores from reliability and average lead time"""
+        expected = [0.6 * 0.1 + 0.4 * 9 / 30, 0.6 * 0.2 + 0.4 * 18 / 30, 0.6 * 0.3 + 0.4 * 0.5]
+        np.testing.assert_allclose(self.registry.risk_scores(), expected)
+
+    def test_hhi_indices(self):
+        """Test capacity concentration, with a supplier without capacity"""
+        np.testing.assert_allclose(self.registry.hhi_indices(), [(0.75 ** 2 + 0.25 ** 2), 1.0])
+
+    def test_dispersion(self):
+        """Test single and batched dispersion against the centroid distance"""
+        locations = [(-1.29, 36.82), (-4.04, 39.67)]
+        centroid = (sum(l[0] for l in locations) / 2, sum(l[1] for l in locations) / 2)
+        distance = sqrt((locations[0][0] - centroid[0]) ** 2 + (locations[0][1] - centroid[1]) ** 2)
+        expected = min(1.0, distance)
+
+        self.assertAlmostEqual(self.registry.dispersion(["Nairobi_Steel", "Mombasa_Steel"]), expected)
+        groups = [["Nairobi_Steel", "Mombasa_Steel"], ["Nairobi_Steel"], ["Nairobi_Steel", "Unknown"], [],
+                  ["Nairobi_Steel", "Kisumu_Cement", "Mombasa_Steel"]]
+        scores = self.registry.dispersion_many(groups)
+        np.testing.assert_allclose(scores, [self.registry.dispersion(g) for g in groups])
+        self.assertEqual(scores[2], 0.0)
+
+    def test_memo_invalidated_by_updates(self):
+        """Test that updates recompute memoized metrics"""
+        risk = self.registry.risk_scores()
+        self.assertIs(self.registry.risk_scores(), risk)
+
+        self.registry.add_supplier("Kisumu_Cement", (-0.09, 34.77), 0.95, {"cement": 400}, {}, {"cement": 5})
+        self.assertEqual(self.registry.num_suppliers, 3)
+        self.assertLess(self.registry.risk_scores()[2], risk[2])
+        self.assertLess(self.registry.hhi_indices()[1], 1.0)
+
+        version = self.registry.version
+        self.registry.set_demand("steel", 500)
+        self.assertEqual(self.registry.version, version + 1)
+        self.assertEqual(self.registry.demand[0], 500)
+
+
+class TestOptimizerRegistry(unittest.TestCase):
+    """Test cases for the optimizer metrics backed by the registry"""
+
+    def setUp(self):
+        rng = np.random.default_rng(4)
+        self.optimizer = SupplierDiversityOptimizer()
+        materials = ["steel", "cement", "fuel", "maize"]
+        for i in range(30):
+            offered = rng.choice(materials, rng.integers(1, 4), replace=False)
+            self.optimizer.add_supplier(f"S{i}", (rng.uniform(-4, 4), rng.uniform(34, 41)), rng.uniform(0.5, 1),
+                                        {m: rng.uniform(0, 500) for m in offered},
+                                        {m: rng.uniform(1, 40) for m in offered}, {m: rng.uniform(5, 15) for m in offered})
+
+    def test_metrics_match_definitions(self):
+        """Test risk and HHI against their per-supplier definitions"""
+        risks = self.optimizer.calculate_supplier_risks()
+        for supplier_id, supplier in self.optimizer.suppliers.items():
+            lead_times = list(supplier["lead_time"].values())
+            expected = 0.6 * (1 - supplier["reliability_score"]) + 0.4 * min(1.0, sum(lead_times) / len(lead_times) / 30)
+            self.assertAlmostEqual(risks[supplier_id], expected)
+            self.assertAlmostEqual(self.optimizer.calculate_supplier_risk(supplier_id), expected)
+
+        for material_id, suppliers in self.optimizer.materials.items():
+            capacities = [self.optimizer.suppliers[s]["capacity"][material_id] for s in suppliers]
+            expected = sum((c / sum(capacities)) ** 2 for c in capacities)
+            self.assertAlmostEqual(self.optimizer.calculate_hhi_index(material_id), expected)
+
+    def test_replacing_supplier(self):
+        """Test that re-adding a supplier replaces its offers and risk"""
+        self.optimizer.calculate_supplier_risks()
+        self.optimizer.add_supplier("S0", (0.0, 37.0), 1.0, {"salt": 100}, {"salt": 0}, {"salt": 1})
+
+        self.assertEqual(self.optimizer.materials["salt"], ["S0"])
+        self.assertEqual(sum(s == "S0" for suppliers in self.optimizer.materials.values() for s in suppliers), 1)
+        self.assertNotIn("S0", self.optimizer.supplier_risks)
+        self.assertAlmostEqual(self.optimizer.calculate_supplier_risk("S0"), 0.0)
+        with self.assertRaises(ValueError):
+            self.optimizer.calculate_supplier_risks(["S0", "Unknown"])
+
+    def test_replacing_only_supplier_of_material(self):
+        """Test that a material loses its entry when its only supplier stops offering it"""
+        optimizer = SupplierDiversityOptimizer()
+        optimizer.add_supplier("S1", (-1.29, 36.82), 0.9, {"steel": 300}, {"steel": 6}, {"steel": 10})
+        optimizer.add_supplier("S2", (-4.04, 39.67), 0.8, {"cement": 200}, {"cement": 4}, {"cement": 9})
+        optimizer.set_material_demand("steel", 100)
+        optimizer.add_supplier("S1", (-1.29, 36.82), 0.9, {"cement": 300}, {"cement": 6}, {"cement": 10})
+
+        self.assertNotIn("steel", optimizer.materials)
+        self.assertEqual(optimizer.materials["cement"], ["S2", "S1"])
+        for method in (optimizer.calculate_hhi_index, optimizer.optimize_supplier_allocation,
+                       optimizer.generate_recommended_strategy):
+            with self.assertRaises(ValueError):
+                method("steel")
+        with self.assertRaises(ValueError):
+            optimizer.optimize_portfolio_allocation(["steel"])
+        self.assertLess(optimizer.calculate_hhi_index("cement"), 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
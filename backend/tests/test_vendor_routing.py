@@ -0,0 +1,149 @@
+"""
+Unit tests for mobile vendor routing
+"""
+
+import itertools
+import unittest
+import numpy as np
+from backend.models.informal_market import InformalMarketDynamics
+from backend.models.vendor_routing import VendorRoutePlanner, TRAVEL_SPEED, haversine_matrix
+
+
+def build_markets(num_markets, seed):
+    """Build random markets around Nairobi"""
+    rng = np.random.default_rng(seed)
+    return [{
+        "name": f"Market_{i}",
+        "latitude": -1.28 + rng.uniform(-0.15, 0.15),
+        "longitude": 36.82 + rng.uniform(-0.15, 0.15),
+        "opening_time": float(rng.choice([5, 6, 7, 9])),
+        "closing_time": float(rng.choice([12, 15, 18])),
+        "size_factor": rng.uniform(0.5, 1.5),
+        "average_daily_profit": rng.uniform(500, 3000)
+    } for i in range(num_markets)]
+
+
+class TestVendorRoutePlanner(unittest.TestCase):
+    """Test cases for the team orienteering search"""
+
+    def setUp(self):
+        self.dynamics = InformalMarketDynamics()
+        self.start = (-1.28, 36.82)
+
+    def assert_feasible(self, planner, plan, vendor_locations):
+        """Check time windows, the working day and distance budgets of a plan"""
+        markets = {m["name"]: m for m in planner.markets}
+        for location, visits in zip(vendor_locations, plan["routes"]):
+            time, position, distance = planner.time_window[0], location, 0.0
+            for visit in visits:
+                market = markets[visit["market"]]
+                leg = self.dynamics._calculate_distance(position, (market["latitude"], market["longitude"]))
+                self.assertAlmostEqual(visit["arrival_time"], time + leg / TRAVEL_SPEED)
+                self.assertAlmostEqual(visit["start_time"], max(visit["arrival_time"], market["opening_time"]))
+                self.assertLessEqual(visit["start_time"], market["closing_time"])
+                time = visit["start_time"] + visit["duration"]
+                position = (market["latitude"], market["longitude"])
+                distance += leg
+            self.assertLessEqual(time, planner.time_window[1])
+            self.assertLessEqual(distance, planner.max_distance + 1e-9)
+
+    def test_matches_exhaustive_search(self):
+        """Test single vendor routes against enumerating every visit order"""
+        for seed in (0, 1, 2):
+            planner = VendorRoutePlanner(self.dynamics, build_markets(6, seed), max_distance=40)
+            plan = planner.plan([self.start])
+            self.assert_feasible(planner, plan, [self.start])
+
+            best = 0.0
+            for k in range(1, 6):
+                for order in itertools.permutations(range(6), k):
+                    best = max(best, self._order_profit(planner, order))
+            self.assertAlmostEqual(plan["total_profit"], best)
+
+    def _order_profit(self, planner, order):
+        """Profit of visiting markets in a fixed order, 0 if infeasible"""
+        time, position, distance, profit = planner.time_window[0], self.start, 0.0, 0.0
+        for i in order:
+            market = planner.markets[i]
+            leg = self.dynamics._calculate_distance(position, (market["latitude"], market["longitude"]))
+            start = max(time + leg / TRAVEL_SPEED, market["opening_time"])
+            duration = self.dynamics._calculate_optimal_visit_duration(market, start)
+            distance += leg
+            if start > market["closing_time"] or start + duration > planner.time_window[1] \
+                    or distance > planner.max_distance:
+                return 0.0
+            profit += self.dynamics._estimate_market_profit(market, start, duration)
+            time, position = start + duration, (market["latitude"], market["longitude"])
+        return profit
+
+    def test_team_visits_markets_once(self):
+        """Test that vendors of a team share out the markets"""
+        vendors = [(-1.2, 36.75), (-1.35, 36.9), (-1.28, 36.82)]
+        planner = VendorRoutePlanner(self.dynamics, build_markets(30, 4))
+        plan = planner.plan(vendors)
+
+        visited = [visit["market"] for route in plan["routes"] for visit in route]
+        self.assertEqual(len(visited), len(set(visited)))
+        self.assertEqual(len(visited) + len(plan["unvisited"]), 30)
+        self.assertAlmostEqual(plan["total_profit"], sum(v["expected_profit"] for r in plan["routes"] for v in r))
+        self.assert_feasible(planner, plan, vendors)
+
+        # A team earns at least as much as its best vendor alone
+        alone = max(planner.plan([vendor])["total_profit"] for vendor in vendors)
+        self.assertGreaterEqual(plan["total_profit"], alone)
+
+    def test_batch_parallel_matches_serial(self):
+        """Test that teams planned in worker processes get the same routes"""
+        rng = np.random.default_rng(5)
+        teams = [[(-1.28 + rng.uniform(-0.1, 0.1), 36.82 + rng.uniform(-0.1, 0.1))] for _ in range(6)]
+        markets = build_markets(15, 6)
+        serial = self.dynamics.plan_vendor_routes_batch(teams, markets)
+        parallel = self.dynamics.plan_vendor_routes_batch(teams, markets, max_workers=2)
+        self.assertEqual(parallel, serial)
+
+        # Search limits are forwarded to every team
+        limited = self.dynamics.plan_vendor_routes_batch(teams, markets, max_iterations=0)
+        self.assertEqual(limited, [self.dynamics.plan_vendor_routes(team, markets, max_iterations=0)
+                                   for team in teams])
+
+    def test_optimize_mobile_vendor_routing(self):
+        """Test the single vendor entry point"""
+        markets = build_markets(10, 7)
+        routes = self.dynamics.optimize_mobile_vendor_routing(self.start, markets)
+        self.assertTrue(routes)
+        self.assertEqual(routes, self.dynamics.plan_vendor_routes([self.start], markets)["routes"][0])
+        self.assertEqual(routes[0]["route"][0], self.start)
+
+        # Markets out of reach are left out
+        far = [dict(m, latitude=m["latitude"] + 5) for m in markets]
+        self.assertEqual(self.dynamics.optimize_mobile_vendor_routing(self.start, far), [])
+
+    def test_vectorized_helpers_match_scalar(self):
+        """Test the vectorized duration, profit and distance helpers"""
+        hours = np.arange(0, 24, 0.25)
+        sizes = np.linspace(0.2, 2.5, len(hours))
+        np.testing.assert_array_equal(self.dynamics._time_factors(hours),
+                                      [self.dynamics._get_time_factor(h) for h in hours])
+        durations = self.dynamics._visit_durations(sizes, hours)
+        np.testing.assert_array_equal(durations, [
+            self.dynamics._calculate_optimal_visit_duration({"size_factor": s}, h) for s, h in zip(sizes, hours)])
+        np.testing.assert_allclose(self.dynamics._visit_profits(np.full(len(hours), 1200.0), hours, durations), [
+            self.dynamics._estimate_market_profit({"average_daily_profit": 1200.0}, h, d)
+            for h, d in zip(hours, durations)])
+
+        points = np.array([(-1.28, 36.82), (-4.04, 39.67), (0.52, 35.27)])
+        np.testing.assert_allclose(haversine_matrix(points, points)[0, 1],
+                                   self.dynamics._calculate_distance(points[0], points[1]))
+
+    def test_invalid_arguments(self):
+        """Test that invalid settings are rejected"""
+        with self.assertRaises(ValueError):
+            VendorRoutePlanner(self.dynamics, build_markets(3, 0), time_window=(19, 6))
+        with self.assertRaises(ValueError):
+            VendorRoutePlanner(self.dynamics, build_markets(3, 0), max_distance=-1)
+        with self.assertRaises(ValueError):
+            VendorRoutePlanner(self.dynamics, build_markets(3, 0)).plan([])
+
+
+if __name__ == '__main__':
+    unittest.main()